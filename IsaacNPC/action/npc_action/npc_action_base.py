@@ -1,6 +1,10 @@
 from __future__ import annotations
 
+import math
+import threading
+import time
 import torch
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import MISSING
 from typing import TYPE_CHECKING
 
@@ -17,12 +21,32 @@ from isaaclab.managers import SceneEntityCfg
 from isaaclab.envs import mdp
 from isaaclab.managers import ObservationTermCfg as ObsTerm
 from ..null_action import NullAction, NullActionCfg
+from .npc_obs_assembler import NPCObsAssembler
+from .npc_obs_history import NPCObsHistory
 
+from IsaacNPC.motion.rollout import RolloutRecorder
 from IsaacNPC.utils.func_tools import has_param
+from IsaacNPC.utils.policy_precision import compare_policy_precisions, format_precision_report
+from IsaacNPC.utils.policy_registry import load_policy
+from IsaacNPC.utils.stage_timer import StageTimer
 
 if TYPE_CHECKING:
     from isaaclab.envs import ManagerBasedRLEnv
 
+LOD_FAR_MODES = ("hold", "kinematic")
+
+# one policy worker per process, pipelined terms queue their forwards behind each other
+_PIPELINE_EXECUTOR: ThreadPoolExecutor | None = None
+_PIPELINE_EXECUTOR_LOCK = threading.Lock()
+
+
+def _pipeline_executor() -> ThreadPoolExecutor:
+    global _PIPELINE_EXECUTOR
+    with _PIPELINE_EXECUTOR_LOCK:
+        if _PIPELINE_EXECUTOR is None:
+            _PIPELINE_EXECUTOR = ThreadPoolExecutor(max_workers=1, thread_name_prefix="npc-policy")
+        return _PIPELINE_EXECUTOR
+
 class NPCActionBase(NullAction):
     """
     This action is responsible for env movement where at each apply action the env will move at the same time.
@@ -39,12 +63,27 @@ class NPCActionBase(NullAction):
                     term.params["asset_cfg"] = SceneEntityCfg(cfg.asset_name)
         
         self.robot: Articulation = env.scene[cfg.asset_name]
+        # per-stage timings, a disabled timer only hands out a no-op context
+        self.timer = StageTimer(self.device, cfg.profile_capacity, enabled=cfg.profile, name=cfg.asset_name)
         self.load_policy(cfg)
 
         # prepare low level actions
         self._low_level_action_term: ActionTerm = cfg.low_level_actions.class_type(cfg.low_level_actions, env)
         self.low_level_actions = torch.zeros(self.num_envs, self._low_level_action_term.action_dim, device=self.device)
         self._counter = 0
+        # static buffers assemble the observations into the persistent buffer of the fused assembler
+        self._fused_obs = cfg.fused_low_level_obs or cfg.static_buffers
+        # built with the observation manager, see _make_low_level_obs_manager
+        self._obs_history = None
+        if cfg.lod:
+            self._init_lod(cfg)
+        if cfg.staggered_phases:
+            self._init_phases(cfg)
+        if cfg.pipelined_inference:
+            self._init_pipeline(cfg)
+        self.recorder = None
+        if cfg.record_dir is not None:
+            self._init_recorder(cfg)
 
     def replace_obsterm_with_dummy_func(self, name, func:callable):
         if getattr(self.cfg.low_level_observations, name, None) is not None:
@@ -54,31 +93,372 @@ class NPCActionBase(NullAction):
         else:
             print(f"Skip term {name} setup for term not found.")
 
-    def last_action(self):
-        # reset the low level actions if the episode was reset
-        if hasattr(self._env, "episode_length_buf"):
+    def last_action(self, env_ids=None):
+        """Last low level actions of all envs, or of the ``env_ids`` rows."""
+        # with static buffers the reset envs are zeroed in reset() instead of masking every call
+        if not self.cfg.static_buffers and hasattr(self._env, "episode_length_buf"):
+            # reset the low level actions if the episode was reset
             self.low_level_actions[self._env.episode_length_buf == 0, :] = 0
-        return self.low_level_actions
+        return self.low_level_actions if env_ids is None else self.low_level_actions[env_ids]
 
     def load_policy(self, cfg):
-        if not check_file_path(cfg.policy_path):
-            raise FileNotFoundError(f"Policy file '{cfg.policy_path}' does not exist.")
-        self.policy = torch.jit.load(cfg.policy_path).to(self._env.device).eval()
+        self.policy = load_policy(cfg.policy_path, self._env.device, cfg.policy_precision)
+        if cfg.precision_check_obs is not None:
+            report = compare_policy_precisions(
+                cfg.policy_path, cfg.precision_check_obs, self._env.device, (cfg.policy_precision,)
+            )
+            print(f"[IsaacNPC] Policy precision check for '{cfg.policy_path}':\n{format_precision_report(report)}")
         
+    def reset(self, env_ids=None):
+        if self.cfg.lod:
+            # run the policy on the first tick after a reset, whatever the tier
+            if env_ids is None:
+                self._lod_ticks[:] = self._lod_max_interval
+            else:
+                self._lod_ticks[env_ids] = self._lod_max_interval
+        if self.cfg.staggered_phases:
+            # infer on the next tick with fresh observations, then back to the env's own phase
+            if env_ids is None:
+                self._phase_pending[:] = True
+            else:
+                self._phase_pending[env_ids] = True
+            self._phase_command_due = True
+        if self.cfg.pipelined_inference:
+            # the in-flight actions were computed before the reset, drop them for these envs
+            if env_ids is None:
+                self._pipeline_reset[:] = True
+            else:
+                self._pipeline_reset[env_ids] = True
+        if self.cfg.static_buffers:
+            if env_ids is None:
+                self.low_level_actions.zero_()
+            else:
+                self.low_level_actions[env_ids] = 0
+        if self._obs_history is not None:
+            self._obs_history.reset(env_ids)
+        return super().reset(env_ids)
+
+    def _make_low_level_obs_manager(self, obs_cfg: ObservationGroupCfg):
+        if self._fused_obs:
+            manager = NPCObsAssembler(obs_cfg, self._env)
+            term_dims = [term_slice.stop - term_slice.start for term_slice in manager.term_slices.values()]
+            obs_dim = manager.obs_dim
+        else:
+            manager = ObservationManager({"ll_policy": obs_cfg}, self._env)
+            term_dims = [math.prod(shape) for shape in manager.group_obs_term_dim["ll_policy"]]
+            obs_dim = manager.group_obs_dim["ll_policy"][0]
+        if self.cfg.low_level_history_length > 0:
+            self._obs_history = NPCObsHistory(
+                self.num_envs, obs_dim, self.cfg.low_level_history_length, self.device,
+                self.cfg.low_level_history_layout, term_dims,
+            )
+        return manager
+
+    def _compute_low_level_obs(self, env_ids: torch.Tensor | None = None) -> torch.Tensor:
+        """Low level observations of all envs, or of the ``env_ids`` rows only (no history)."""
+        with self.timer.stage("obs"):
+            if self._fused_obs:
+                low_level_obs = self._low_level_obs_manager.compute(env_ids)
+            else:
+                low_level_obs = self._low_level_obs_manager.compute_group("ll_policy")
+                if env_ids is not None:
+                    low_level_obs = low_level_obs[env_ids]
+            if self._obs_history is not None:
+                return self._obs_history.push(low_level_obs)
+            return low_level_obs
+
+    def _policy_forward(self, low_level_obs: torch.Tensor) -> torch.Tensor:
+        with self.timer.stage("policy"):
+            if self.cfg.static_buffers:
+                with torch.inference_mode():
+                    return self.policy(low_level_obs)
+            return self.policy(low_level_obs)
+
+    def _process_low_level_actions(self):
+        with self.timer.stage("process_actions"):
+            self._low_level_action_term.process_actions(self.low_level_actions)
+
+    def _apply_low_level_actions(self):
+        with self.timer.stage("apply_actions"):
+            self._low_level_action_term.apply_actions()
+
     def _render_action(self):
-        raise NotImplementedError("Not implemented for rendering actions.")
+        return self._policy_forward(self._compute_low_level_obs())
         
     def apply_actions(self):
+        if self.recorder is not None:
+            self._record_state()
+        if self.cfg.staggered_phases:
+            self._render_staggered_actions()
+            self._apply_low_level_actions()
+            return
         if self._counter % self.cfg.low_level_decimation == 0:
-            self.low_level_actions[:] = self._render_action()
-            self._low_level_action_term.process_actions(self.low_level_actions)
+            if self.cfg.lod:
+                self._render_lod_actions()
+            elif self.cfg.pipelined_inference:
+                self._render_pipelined_actions()
+            else:
+                self.low_level_actions.copy_(self._render_action())
+            self._process_low_level_actions()
             self._counter = 0
-        self._low_level_action_term.apply_actions()
+        self._apply_low_level_actions()
         self._counter += 1
         
     def root_pos_env(self) -> torch.Tensor:
         return self.robot.data.root_pos_w - self._env.scene.env_origins
-        
+
+    """
+    Pipelined inference.
+    """
+
+    def _init_pipeline(self, cfg: NPCActionBaseCfg):
+        if cfg.lod or cfg.staggered_phases:
+            raise ValueError("'pipelined_inference' cannot be combined with 'lod' or 'staggered_phases'.")
+        self._pipeline = _pipeline_executor()
+        self._pipeline_future = None
+        # double buffered policy inputs: the worker may still read one while the next is written
+        self._pipeline_obs = [None, None]
+        self._pipeline_slot = 0
+        self._pipeline_reset = torch.zeros(self.num_envs, dtype=torch.bool, device=self.device)
+        self._pipeline_stream = torch.cuda.Stream(self.device) if torch.device(self.device).type == "cuda" else None
+
+    def _pipelined_forward(self, low_level_obs: torch.Tensor, ready):
+        """
+        Worker side forward, returns (actions, done event, (start ns, duration ns or start event)).
+
+        The worker never enters the timer stages (they belong to the main thread) nor synchronizes:
+        the main thread records the ``"policy"`` sample once the actions are collected, on CUDA
+        from timing events around the forward on the side stream.
+        """
+        # inference mode is thread local, enter it on the worker
+        with torch.inference_mode():
+            start_ns = time.perf_counter_ns()
+            if self._pipeline_stream is None:
+                actions = self.policy(low_level_obs)
+                return actions, None, (start_ns, time.perf_counter_ns() - start_ns)
+            self._pipeline_stream.wait_event(ready)
+            with torch.cuda.stream(self._pipeline_stream):
+                start = torch.cuda.Event(enable_timing=True) if self.timer.enabled else None
+                if start is not None:
+                    start.record()
+                actions = self.policy(low_level_obs)
+                done = torch.cuda.Event(enable_timing=start is not None)
+                done.record()
+            return actions, done, (start_ns, start)
+
+    def _render_pipelined_actions(self):
+        """
+        Submit the observations of this low level step and apply the actions of the previous one.
+
+        The policy of step k runs on the worker while the main thread applies the actions of step
+        k - 1 over the ``low_level_decimation`` physics ticks, so actions lag the observations by one
+        low level step. The first step after construction waits for its own actions; envs reset in
+        between get zero actions for the lagging step instead of the pre-reset ones.
+        """
+        low_level_obs = self._compute_low_level_obs()
+        slot = self._pipeline_slot
+        if self._pipeline_obs[slot] is None:
+            self._pipeline_obs[slot] = torch.empty_like(low_level_obs)
+        self._pipeline_obs[slot].copy_(low_level_obs)
+        ready = None
+        if self._pipeline_stream is not None:
+            ready = torch.cuda.Event()
+            ready.record()
+        previous = self._pipeline_future
+        self._pipeline_future = self._pipeline.submit(self._pipelined_forward, self._pipeline_obs[slot], ready)
+        self._pipeline_slot = 1 - slot
+
+        with self.timer.stage("policy_wait"):
+            actions, done, (start_ns, duration) = (previous or self._pipeline_future).result()
+        if done is not None:
+            torch.cuda.current_stream(self.device).wait_event(done)
+            actions.record_stream(torch.cuda.current_stream(self.device))
+        if self.timer.enabled:
+            if done is not None:
+                # profiling only: the side stream is waited on here, not on the worker
+                done.synchronize()
+                duration = int(duration.elapsed_time(done) * 1e6)
+            self.timer.record("policy", start_ns, duration)
+        if previous is None:
+            # nothing was in flight, this step's actions are already current
+            self._pipeline_reset.zero_()
+        self.low_level_actions.copy_(actions)
+        self.low_level_actions.masked_fill_(self._pipeline_reset.unsqueeze(1), 0.0)
+        self._pipeline_reset.zero_()
+
+    """
+    Rollout recording.
+    """
+
+    def _init_recorder(self, cfg: NPCActionBaseCfg):
+        self.recorder = RolloutRecorder(
+            cfg.record_dir,
+            self.num_envs,
+            self.robot.num_joints,
+            fps          = 1.0 / (self._env.physics_dt * cfg.low_level_decimation),
+            device       = self.device,
+            chunk_frames = cfg.record_chunk_frames,
+            max_frames   = cfg.record_max_frames,
+            joint_names  = self.robot.joint_names,
+        )
+        self._record_counter = 0
+
+    def _record_state(self):
+        # one frame per low level step, the rate NPCActionReplay writes them back at
+        if self._record_counter % self.cfg.low_level_decimation == 0:
+            with self.timer.stage("record"):
+                data = self.robot.data
+                self.recorder.record(data.root_state_w, data.joint_pos, data.joint_vel, self._env.scene.env_origins)
+            self._record_counter = 0
+        self._record_counter += 1
+
+    def stop_recording(self):
+        """Save the frames recorded so far and stop recording, the rollout can then be replayed."""
+        if self.recorder is not None:
+            self.recorder.close()
+            self.recorder = None
+
+    """
+    Staggered phases.
+    """
+
+    def _init_phases(self, cfg: NPCActionBaseCfg):
+        if cfg.lod:
+            raise ValueError("'staggered_phases' and 'lod' cannot be combined, pick one scheduling mode.")
+        # observations are only assembled for the due envs, a history would miss the other ticks
+        obs_cfg = cfg.low_level_observations
+        history = cfg.low_level_history_length > 0 or (obs_cfg.history_length or 0) > 0 or any(
+            isinstance(term, ObsTerm) and (term.history_length or 0) > 0 for term in vars(obs_cfg).values()
+        )
+        if history:
+            raise ValueError("'staggered_phases' assembles observations for the due envs only, it cannot feed an "
+                             "observation history ('low_level_history_length' or 'history_length').")
+        decimation = cfg.low_level_decimation
+        # round robin offsets: every tick runs the policy on ~N / decimation envs
+        self.phase_offsets = torch.arange(self.num_envs, device=self.device) % decimation
+        # ticks since the env's phase, the env is due when it wraps to 0
+        self._phase_counter = (-self.phase_offsets) % decimation
+        # every env infers on the first tick
+        self._phase_pending = torch.ones(self.num_envs, dtype=torch.bool, device=self.device)
+        # the command is refreshed for all envs once per low level step (tick 0) and after resets
+        self._phase_tick = 0
+        self._phase_command_due = True
+
+    def _render_staggered_actions(self):
+        """Observations and policy of the envs whose phase is due this tick, then the action processing."""
+        due = (self._phase_counter == 0) | self._phase_pending
+        self._phase_counter.add_(1).remainder_(self.cfg.low_level_decimation)
+        self._phase_pending.zero_()
+        self._phase_command_due = self._phase_command_due or self._phase_tick == 0
+        self._phase_tick = (self._phase_tick + 1) % self.cfg.low_level_decimation
+        due_ids = due.nonzero().squeeze(-1)
+        if due_ids.numel() == 0:
+            return
+        if due_ids.numel() == self.num_envs:
+            self.low_level_actions.copy_(self._policy_forward(self._compute_low_level_obs()))
+        else:
+            self.low_level_actions[due_ids] = self._policy_forward(self._compute_low_level_obs(due_ids))
+        # the whole batch goes through the action term's own processing, the other rows keep their
+        # actions and so their targets
+        self._process_low_level_actions()
+        self._phase_command_due = False
+
+    """
+    Level of detail.
+    """
+
+    def _init_lod(self, cfg: NPCActionBaseCfg):
+        if len(cfg.lod_intervals) != len(cfg.lod_distances) + 1:
+            raise ValueError(
+                f"'lod_intervals' needs one entry per tier ({len(cfg.lod_distances) + 1}), got {len(cfg.lod_intervals)}."
+            )
+        if cfg.lod_far_mode not in LOD_FAR_MODES:
+            raise ValueError(f"Unknown LOD far mode '{cfg.lod_far_mode}', expected one of {LOD_FAR_MODES}.")
+        # tiers pair with 'lod_intervals' in order, so the boundaries are not sorted for the user
+        if any(d1 <= d0 for d0, d1 in zip(cfg.lod_distances[:-1], cfg.lod_distances[1:])):
+            raise ValueError(f"'lod_distances' must be strictly increasing, got {tuple(cfg.lod_distances)}.")
+        self._lod_thresholds = torch.tensor(cfg.lod_distances, dtype=torch.float32, device=self.device)
+        self._lod_intervals = torch.tensor(cfg.lod_intervals, dtype=torch.long, device=self.device)
+        self._lod_tier_ids = torch.arange(len(cfg.lod_distances), device=self.device)
+        self._lod_max_interval = max(int(i) for i in cfg.lod_intervals)
+        self._lod_reference = None
+        self._lod_reference_asset = None
+        if cfg.lod_reference_asset is not None:
+            self._lod_reference_asset = self._env.scene[cfg.lod_reference_asset]
+        # tier per env (0: near) and policy ticks since the last inference
+        self.lod_tier = torch.zeros(self.num_envs, dtype=torch.long, device=self.device)
+        self._lod_ticks = torch.full((self.num_envs,), self._lod_max_interval, dtype=torch.long, device=self.device)
+
+    def set_lod_reference(self, pos: torch.Tensor | None):
+        """World position (3,) or (N, 3) the tiers are measured from, e.g. a camera. None restores the config."""
+        self._lod_reference = pos
+
+    def lod_reference_pos(self) -> torch.Tensor:
+        if self._lod_reference is not None:
+            return self._lod_reference
+        if self._lod_reference_asset is not None:
+            return self._lod_reference_asset.data.root_pos_w
+        return self._env.scene.env_origins
+
+    def update_lod(self) -> torch.Tensor:
+        """
+        Refresh ``lod_tier`` from the planar distance to the reference and step the per-env tick
+        counters.
+
+        A boundary only flips once the distance is ``lod_hysteresis`` past it, so NPCs walking along
+        a threshold do not toggle every tick.
+
+        Returns:
+            due: Tensor (N,) bool, envs running the policy this tick
+        """
+        diff = self.robot.data.root_pos_w[:, :2] - self.lod_reference_pos()[..., :2]
+        dist = torch.norm(diff, dim=-1)
+        beyond = self.lod_tier.unsqueeze(1) > self._lod_tier_ids            # (N, K)
+        hysteresis = self.cfg.lod_hysteresis
+        thresholds = self._lod_thresholds + torch.where(beyond, -hysteresis, hysteresis)
+        self.lod_tier = (dist.unsqueeze(1) > thresholds).sum(dim=1)
+
+        interval = self._lod_intervals[self.lod_tier]
+        self._lod_ticks.add_(1)
+        due = (interval > 0) & (self._lod_ticks >= interval)
+        self._lod_ticks.masked_fill_(due, 0)
+        # counters of policy-off envs saturate, they are due as soon as they enter a policy tier
+        self._lod_ticks.clamp_(max=self._lod_max_interval)
+        return due
+
+    def lod_tier_counts(self) -> torch.Tensor:
+        """Number of envs per tier."""
+        return torch.bincount(self.lod_tier, minlength=self._lod_intervals.shape[0])
+
+    def _render_lod_actions(self):
+        due = self.update_lod()
+        # observations stay batched over all envs, command terms and history keep stepping
+        low_level_obs = self._compute_low_level_obs()
+        due_ids = due.nonzero().squeeze(-1)
+        if due_ids.numel() == self.num_envs:
+            self.low_level_actions.copy_(self._policy_forward(low_level_obs))
+        elif due_ids.numel() > 0:
+            # policy on the compacted subset, the other envs hold their last action
+            self.low_level_actions[due_ids] = self._policy_forward(low_level_obs[due_ids])
+        if self.cfg.lod_far_mode == "kinematic":
+            far_ids = (self._lod_intervals[self.lod_tier] == 0).nonzero().squeeze(-1)
+            if far_ids.numel() > 0:
+                with self.timer.stage("kinematic"):
+                    self._lod_kinematic_step(far_ids, self._env.physics_dt * self.cfg.low_level_decimation)
+
+    def _lod_kinematic_step(self, env_ids: torch.Tensor, dt: float):
+        """
+        Cheap update of the envs in a policy-off tier when ``lod_far_mode`` is "kinematic".
+
+        The base term pins them to the default joint pose at their current root pose, subclasses
+        with a motion source override it with kinematic playback.
+        """
+        self.low_level_actions[env_ids] = 0
+        self.robot.write_root_velocity_to_sim(torch.zeros(env_ids.shape[0], 6, device=self.device), env_ids=env_ids)
+        self.robot.write_joint_state_to_sim(
+            self.robot.data.default_joint_pos[env_ids], self.robot.data.default_joint_vel[env_ids], env_ids=env_ids
+        )
+
 @configclass
 class NPCActionBaseCfg(NullActionCfg):
     class_type: type[ActionTerm] = NPCActionBase
@@ -94,5 +474,64 @@ class NPCActionBaseCfg(NullActionCfg):
     """Low level action configuration."""
     low_level_observations: ObservationGroupCfg = MISSING
     """Low level observation configuration."""
-    
 
+    policy_precision: str = "fp32"
+    """Inference precision of the low level policy: "fp32", "bf16" or "int8" (dynamic, CPU only)."""
+    precision_check_obs: str | None = None
+    """Optional path to recorded low level observations (torch.save), compared against fp32 at load."""
+    static_buffers: bool = False
+    """Keep the NPC side of the step in persistent tensors written in place: observations are assembled into the
+    buffer of :class:`NPCObsAssembler` (implies ``fused_low_level_obs``), commands and actions are copied into
+    preallocated outputs, reset envs get their last action zeroed in :meth:`reset` and the policy runs under
+    :func:`torch.inference_mode`. The routine planner steps into :class:`RoutineStepBuffers` ("waypoint" follow
+    mode; avoidance, behavior and "trajectory" still allocate). The observation term functions, the policy forward
+    and the low level action term allocate their own temporaries, ``IsaacNPC.benchmarks.alloc_bench`` counts both
+    sides and asserts that the NPC side allocates nothing."""
+    fused_low_level_obs: bool = False
+    """Assemble low level observations with :class:`NPCObsAssembler` instead of an ObservationManager."""
+    lod: bool = False
+    """Distance based level of detail: per-env tiers set how often the policy runs, see the ``lod_*`` fields."""
+    lod_reference_asset: str | None = None
+    """Scene asset the tiers are measured from (e.g. the learning agent), None measures from the env origins."""
+    lod_distances: tuple = (5.0, 15.0)
+    """Planar tier boundaries (m), strictly increasing: near < d0 <= mid < d1 <= far."""
+    lod_intervals: tuple = (1, 3, 0)
+    """Policy interval per tier in low level ticks, 0 switches the policy off (see ``lod_far_mode``)."""
+    lod_hysteresis: float = 0.5
+    """Margin (m) past a boundary before an env changes tier."""
+    lod_far_mode: str = "hold"
+    """Policy-off tiers: "hold" keeps the last action, "kinematic" runs :meth:`NPCActionBase._lod_kinematic_step`."""
+    staggered_phases: bool = False
+    """Spread inference over the ``low_level_decimation`` ticks: env i runs the policy on the ticks where
+    ``(tick - i) % low_level_decimation == 0`` instead of all envs on the same tick. Each tick assembles the
+    observations (rows of the fused assembler) and runs the policy for the due subset only, then the low level
+    action term processes the whole batch (the other rows are unchanged); the velocity command is refreshed for
+    all envs once per low level step and after resets. Cannot be combined with an observation history."""
+    profile: bool = False
+    """Time the obs / command / policy / process / apply stages with device synchronized timers into
+    ``self.timer`` (:class:`IsaacNPC.utils.stage_timer.StageTimer`), with p50 / p99 summaries and
+    Chrome trace export. Synchronizing serializes the step, keep it off outside profiling runs. With
+    ``pipelined_inference`` the worker forward is reported as a top level ``"policy"`` stage, next to the
+    ``"policy_wait"`` of the main thread."""
+    profile_capacity: int = 1024
+    """Samples kept per stage (ring buffer)."""
+    low_level_history_length: int = 0
+    """Feed the policy the last H low level observations from a ring buffer (:class:`NPCObsHistory`), one frame
+    per low level step. Use it instead of ``history_length`` on the observation group, which rebuilds the history
+    by shifting and concatenating every step. 0 disables the history."""
+    low_level_history_layout: str = "frame"
+    """"frame": frames oldest first, each the full observation (zero-copy view), "term": per-term histories
+    concatenated like an Isaac Lab group with ``history_length`` (one gather per step)."""
+    pipelined_inference: bool = False
+    """Overlap the low level policy with the simulation: each low level step submits its observations to the
+    background policy worker (one thread shared by the pipelined terms, side CUDA stream on GPU) and applies
+    the actions computed from the previous step's observations. Actions therefore lag the observations by one
+    low level step (``low_level_decimation`` physics ticks), envs reset in between get zero actions for that
+    step. Cannot be combined with ``lod`` or ``staggered_phases``. See ``IsaacNPC.benchmarks.pipeline_bench``."""
+    record_dir: str | None = None
+    """Bake the rollout: root and joint states of every env are appended to this (new) directory once per
+    low level step, see :class:`IsaacNPC.motion.RolloutRecorder`. Replay it with ``NPCActionReplay``."""
+    record_chunk_frames: int = 256
+    """Frames per on-disk chunk, each full chunk is saved by a background thread."""
+    record_max_frames: int | None = None
+    """Stop recording after this many frames, None records until :meth:`NPCActionBase.stop_recording` or exit."""
@@ -18,7 +18,8 @@ from ..npc_action_base import NPCActionBase, NPCActionBaseCfg
 if TYPE_CHECKING:
     from isaaclab.envs import ManagerBasedRLEnv
 
-from beyondMimic.mdp.commands import MotionLoader
+from IsaacNPC.motion import PLAYBACK_MODES, MotionPlayback, PackedFieldTable, get_motion_source
+from IsaacNPC.utils.stage_timer import StageTimer
 from isaaclab.utils.math import matrix_from_quat, subtract_frame_transforms
 
 class NPCActionFK(NPCActionBase):
@@ -27,47 +28,103 @@ class NPCActionFK(NPCActionBase):
         NullAction.__init__(self, cfg, env)
         
         self.robot: Articulation = env.scene[cfg.asset_name]
+        self.timer = StageTimer(self.device, cfg.profile_capacity, enabled=cfg.profile, name=cfg.asset_name)
         self.load_policy(cfg)
-        self.time_steps = torch.zeros(self.num_envs, dtype=torch.long, device=self.device)
+        # per-env clip and global frame index into the packed motion fields
+        self.clip_ids = self.motion.assign(self.num_envs, cfg.clip_assignment)
+        self.time_steps = self.motion.clip_offsets[self.clip_ids].clone()
         self._counter = 0
+        if cfg.playback_mode not in PLAYBACK_MODES:
+            raise ValueError(f"Unknown playback mode '{cfg.playback_mode}', expected one of {PLAYBACK_MODES}.")
+        # continuous time playback, time_steps then follows the lower bracketing frame
+        self.playback = None
+        if cfg.playback_mode == "time":
+            self.playback = MotionPlayback(self.motion, self.clip_ids, cfg.playback_speed, cfg.clip_end_mode)
+            self.time_steps = self.playback.frame0
+
+        # packed playback tables, (T, 13) root state and (T, 2 * J) joint state, shared with the motion
+        self._root_table = self.motion.root_state_table()
+        self._joint_table = self.motion.joint_state_table()
+        self._num_joints = self._joint_table.shape[1] // 2
+        # persistent output buffers
+        self._root_state_buf = torch.zeros(self.num_envs, 13, device=self.device)
+        self._joint_state_buf = torch.zeros(self.num_envs, self._joint_table.shape[1], device=self.device)
 
     def reset(self, env_ids = None):
         # if env_ids is not None:
         #     self.time_steps[env_ids] = 0
         # else:
         #     self.time_steps[:] = 0
-        return super().reset(env_ids)
+        # every env advances and is written on each write tick, reset envs included
+        return NullAction.reset(self, env_ids)
 
     def apply_actions(self):
         if self._counter % self.cfg.low_level_decimation == 0:
-            self.write_to_sim()
+            with self.timer.stage("write"):
+                self.write_to_sim()
             self._counter = 0
-            self.time_steps += 1
-            self.time_steps %= self.motion.time_step_total
+            with self.timer.stage("motion"):
+                if self.playback is not None:
+                    self.playback.advance(self._env.physics_dt * self.cfg.low_level_decimation)
+                else:
+                    self.motion.advance(self.time_steps, self.clip_ids, self.cfg.clip_end_mode)
         self._counter += 1
 
+    @staticmethod
+    def _gather(table, index: torch.Tensor, out: torch.Tensor | None = None) -> torch.Tensor:
+        if isinstance(table, torch.Tensor):
+            return torch.index_select(table, 0, index, out=out) if out is not None else table[index]
+        if isinstance(table, PackedFieldTable):
+            # quantized table, decoded straight into the buffer
+            return table.index_select(index, out)
+        # streamed table
+        return out.copy_(table[index]) if out is not None else table[index]
+
     def write_to_sim(self):
-        # motion = self.motion
-        # robot = self.robot
-        root_states = self.robot.data.default_root_state.clone()
-        root_states[:, :3]      =  self.motion.body_pos_w[self.time_steps][:, 0] + self._env.scene.env_origins[:, None, :]
-        root_states[:, 3:7]     =  self.motion.body_quat_w[self.time_steps][:, 0]
-        root_states[:, 7:10]    =  self.motion.body_lin_vel_w[self.time_steps][:, 0]
-        root_states[:, 10:]     =  self.motion.body_ang_vel_w[self.time_steps][:, 0]
+        if self.playback is not None:
+            # interpolated frames move every tick, write all envs
+            root_states = self.playback.root_state(out=self._root_state_buf)
+            joint_states = self.playback.joint_state(out=self._joint_state_buf)
+            root_states[:, :3] += self._env.scene.env_origins
+        else:
+            # one gather per table straight into the persistent buffers
+            root_states = self._gather(self._root_table, self.time_steps, self._root_state_buf)
+            joint_states = self._gather(self._joint_table, self.time_steps, self._joint_state_buf)
+            root_states[:, :3] += self._env.scene.env_origins
 
         self.robot.write_root_state_to_sim(root_states)
-        self.robot.write_joint_state_to_sim(self.motion.joint_pos[self.time_steps], self.motion.joint_vel[self.time_steps])
+        self.robot.write_joint_state_to_sim(joint_states[:, :self._num_joints], joint_states[:, self._num_joints:])
         # self._env.scene.write_data_to_sim()
 
     def load_policy(self, cfg: NPCActionFKCfg):
         self.body_indexes, _ = self.robot.find_bodies(cfg.body_names)
-        self.motion = MotionLoader(cfg.motion_file, self.body_indexes, device=self.device)
+        # shared between terms playing the same clips
+        self.motion = get_motion_source(cfg, self.body_indexes, device=self.device, consumer=cfg.asset_name)
 
 @configclass
 class NPCActionFKCfg(NullActionCfg):
     class_type:         type[ActionTerm] = NPCActionFK
     low_level_decimation: int = 4
     policy_path:        str = None
-    motion_file:        str = MISSING
+    motion_file:        str = None
+    motion_files:       list = None
+    """Clips (list, directory or glob) packed into a MotionLibrary, one clip per env, overrides ``motion_file``."""
+    clip_assignment:    str = "cycle"     # "cycle": env i plays clip i % C, "random": drawn by clip length
+    clip_end_mode:      str = "loop"      # "loop": restart the clip, "resample": draw a new clip
+    clip_weights:       list = None       # optional sampling weights per clip
+    playback_mode:      str = "frame"
+    """"frame": one stored frame per write, "time": continuous time with interpolation between frames."""
+    motion_fps:         float = None      # resample the stored clips to this rate at load, None keeps the capture rate
+    playback_speed:     float | tuple = 1.0   # "time" mode speed, or a (min, max) range drawn per env
     body_names:         list = MISSING
     anchor_body_name:   str =MISSING
+    motion_mode:        str = "resident"
+    """"resident": whole clip on the device, "stream": only ``motion_window`` frames resident."""
+    motion_window:      int = 512
+    """Resident frames of the "stream" mode, per term: keep it above the frame spread of the term's envs."""
+    motion_cache_dir:   str = None
+    """Directory of the converted clips (see :func:`IsaacNPC.motion.convert_motion`), None writes them next to the clips."""
+    motion_encoding:    str = "fp32"
+    """"fp32", or "quantized": int16 joints / positions, smallest-three quaternions, fp16 velocities (resident mode)."""
+    profile:            bool = False      # time the write / motion stages into ``self.timer``, see NPCActionBaseCfg.profile
+    profile_capacity:   int = 1024
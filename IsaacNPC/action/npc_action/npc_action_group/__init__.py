@@ -0,0 +1 @@
+from .npc_action_group import NPCActionGroupVel, NPCActionGroupVelCfg, NPCActionGroupRoutine, NPCActionGroupRoutineCfg
\ No newline at end of file
@@ -0,0 +1,283 @@
+from __future__ import annotations
+
+import torch
+from dataclasses import MISSING
+from typing import TYPE_CHECKING, List, Tuple, Union
+
+import isaaclab.utils.math as math_utils
+from isaaclab.assets import Articulation
+from isaaclab.managers import ActionTerm, ActionTermCfg, ObservationGroupCfg, ObservationManager
+from isaaclab.utils import configclass
+
+from isaaclab.managers import SceneEntityCfg
+from isaaclab.managers import ObservationTermCfg as ObsTerm
+from ...null_action import NullAction, NullActionCfg
+from ..npc_obs_assembler import NPCObsAssembler
+from ..npc_action_vel.velocity_planner_2d import BatchVelocityPlanner
+from IsaacNPC.planner.velocity.routine_table import RoutineTable
+from IsaacNPC.planner.avoidance import SocialForceAvoidance
+
+from IsaacNPC.utils.func_tools import has_param
+from IsaacNPC.utils.policy_registry import load_policy
+from IsaacNPC.utils.stage_timer import StageTimer
+
+if TYPE_CHECKING:
+    from isaaclab.envs import ManagerBasedRLEnv
+
+
+class NPCActionGroupVel(NullAction):
+    """
+    Drives M NPC assets that share one low level policy.
+
+    Observations of all assets are assembled in place into a single (M, N, obs_dim) batch, one
+    :class:`NPCObsAssembler` bound to each asset slice, so that the policy runs one forward over
+    (M * N, obs_dim) per decimation tick. The joint targets are then scattered back to the low level
+    action term of each asset.
+    """
+
+    cfg: NPCActionGroupVelCfg
+    def __init__(self, cfg: NPCActionGroupVelCfg, env):
+        # the action term base resolves a single asset, anchor it on the first one of the group
+        if cfg.asset_name is None:
+            cfg.asset_name = cfg.asset_names[0]
+        super().__init__(cfg, env)
+
+        self.asset_names: list[str] = list(cfg.asset_names)
+        self.num_assets = len(self.asset_names)
+        if self.num_assets == 0:
+            raise ValueError("NPC group action requires at least one asset name.")
+
+        self.robots: list[Articulation] = [env.scene[name] for name in self.asset_names]
+        self.timer = StageTimer(self.device, cfg.profile_capacity, enabled=cfg.profile, name=cfg.asset_name)
+        self.load_policy(cfg)
+
+        # prepare low level actions, one term per asset
+        self._low_level_action_terms: list[ActionTerm] = []
+        for asset_name in self.asset_names:
+            action_cfg = cfg.low_level_actions.replace(asset_name=asset_name)
+            self._low_level_action_terms.append(action_cfg.class_type(action_cfg, env))
+        action_dims = {term.action_dim for term in self._low_level_action_terms}
+        if len(action_dims) != 1:
+            raise ValueError(f"NPC group assets have different low level action dims: {action_dims}.")
+        # (M, N, A): each asset slice is a contiguous view
+        self.low_level_actions = torch.zeros(
+            self.num_assets, self.num_envs, action_dims.pop(), device=self.device
+        )
+        # (M, N, 3) velocity commands, refreshed once per policy tick for all assets
+        self.vel_commands = torch.zeros(self.num_assets, self.num_envs, 3, device=self.device)
+
+        # prepare low level observations, one assembler per asset writing straight into its slice of the batch
+        self._low_level_obs_managers: list[NPCObsAssembler | ObservationManager] = []
+        for asset_idx, asset_name in enumerate(self.asset_names):
+            obs_cfg = self._make_asset_obs_cfg(asset_idx, asset_name)
+            if cfg.fused_low_level_obs:
+                self._low_level_obs_managers.append(NPCObsAssembler(obs_cfg, env))
+            else:
+                self._low_level_obs_managers.append(ObservationManager({"ll_policy": obs_cfg}, env))
+        obs_dims = {
+            manager.group_obs_dim if cfg.fused_low_level_obs else manager.group_obs_dim["ll_policy"]
+            for manager in self._low_level_obs_managers
+        }
+        if len(obs_dims) != 1:
+            raise ValueError(f"NPC group assets have different low level observation dims: {obs_dims}.")
+        self.low_level_obs = torch.zeros(self.num_assets, self.num_envs, *obs_dims.pop(), device=self.device)
+        if cfg.fused_low_level_obs:
+            for asset_idx, assembler in enumerate(self._low_level_obs_managers):
+                assembler.bind(self.low_level_obs[asset_idx])
+
+        self._counter = 0
+
+    def _make_asset_obs_cfg(self, asset_idx: int, asset_name: str) -> ObservationGroupCfg:
+        obs_cfg: ObservationGroupCfg = self.cfg.low_level_observations.copy()
+        for term in vars(obs_cfg).values():
+            if isinstance(term, ObsTerm):
+                if has_param(term.func, "asset_cfg"):
+                    term.params["asset_cfg"] = SceneEntityCfg(asset_name)
+
+        if hasattr(obs_cfg, "actions"):
+            last_action_term = obs_cfg.actions
+        elif hasattr(obs_cfg, "last_action"):
+            last_action_term = obs_cfg.last_action
+        else:
+            raise NameError("no name for last action.")
+        last_action_term.func = lambda dummy_env, idx=asset_idx: self.last_action(idx)
+        last_action_term.params = dict()
+        obs_cfg.velocity_commands.func = lambda dummy_env, idx=asset_idx: self.vel_commands[idx]
+        obs_cfg.velocity_commands.params = dict()
+        return obs_cfg
+
+    def last_action(self, asset_idx: int) -> torch.Tensor:
+        # reset the low level actions if the episode was reset
+        if hasattr(self._env, "episode_length_buf"):
+            self.low_level_actions[asset_idx, self._env.episode_length_buf == 0, :] = 0
+        return self.low_level_actions[asset_idx]
+
+    def load_policy(self, cfg):
+        self.policy = load_policy(cfg.policy_path, self._env.device, cfg.policy_precision)
+
+    def reset(self, env_ids=None):
+        for manager in self._low_level_obs_managers:
+            manager.reset(env_ids=env_ids)
+        return super().reset(env_ids)
+
+    def update_vel_commands(self):
+        """Fill ``self.vel_commands`` (M, N, 3) for all assets, called once per policy tick."""
+        self.vel_commands.zero_()
+        self.vel_commands[..., 0] = 0.3
+
+    def _render_action(self) -> torch.Tensor:
+        with self.timer.stage("command"):
+            self.update_vel_commands()
+        with self.timer.stage("obs"):
+            if self.cfg.fused_low_level_obs:
+                # the assemblers write into their (N, obs_dim) slice of low_level_obs
+                for assembler in self._low_level_obs_managers:
+                    assembler.compute()
+            else:
+                for asset_idx, manager in enumerate(self._low_level_obs_managers):
+                    self.low_level_obs[asset_idx] = manager.compute_group("ll_policy")
+        # single forward over the (M * N, obs_dim) batch
+        with self.timer.stage("policy"):
+            actions = self.policy(self.low_level_obs.flatten(0, 1))
+        return actions.view(self.num_assets, self.num_envs, -1)
+
+    def apply_actions(self):
+        if self._counter % self.cfg.low_level_decimation == 0:
+            self.low_level_actions[:] = self._render_action()
+            with self.timer.stage("process_actions"):
+                for asset_idx, term in enumerate(self._low_level_action_terms):
+                    term.process_actions(self.low_level_actions[asset_idx])
+            self._counter = 0
+        with self.timer.stage("apply_actions"):
+            for term in self._low_level_action_terms:
+                term.apply_actions()
+        self._counter += 1
+
+    def root_pos_env(self) -> torch.Tensor:
+        """Root positions of all assets relative to the env origins, (M, N, 3)."""
+        root_pos_w = torch.stack([robot.data.root_pos_w for robot in self.robots], dim=0)
+        return root_pos_w - self._env.scene.env_origins.unsqueeze(0)
+
+    def root_yaw(self) -> torch.Tensor:
+        """Root yaw of all assets, (M, N)."""
+        root_quat_w = torch.stack([robot.data.root_quat_w for robot in self.robots], dim=0)
+        _, _, yaw = math_utils.euler_xyz_from_quat(root_quat_w.flatten(0, 1))
+        return yaw.view(self.num_assets, self.num_envs)
+
+
+class NPCActionGroupRoutine(NPCActionGroupVel):
+    """Routine following for a group of NPC assets, the planner runs once over all M * N agents."""
+
+    cfg: NPCActionGroupRoutineCfg
+    def __init__(self, cfg: NPCActionGroupRoutineCfg, env):
+        super().__init__(cfg, env)
+        # per-asset, per-env waypoint pointer
+        self.target_pos_ptr = torch.zeros(
+            (self.num_assets, self.num_envs), device=self.device, dtype=torch.long
+        )
+        self.planner = BatchVelocityPlanner(
+            max_lin_vel = cfg.max_lin_vel,
+            max_yaw_vel = cfg.max_yaw_vel,
+            pos_tol     = cfg.pos_tol,
+            yaw_tol     = cfg.yaw_tol,
+            body_frame  = True,
+            backend     = cfg.planner_backend,
+        )
+        # packed routines, one per agent (asset-major, agent = asset_idx * N + env_id)
+        self.routine_table = RoutineTable.from_cfg(cfg, device=self.device)
+        self.routine_points = self.routine_table.points
+        agent_routine = self.routine_table.assign(self.num_assets * self.num_envs, cfg.routine_assignment)
+        self.routine_start = self.routine_table.offsets[agent_routine]
+        self.routine_length = self.routine_table.lengths[agent_routine]
+
+        # local avoidance between all agents of the group (and extra assets) within each env
+        self.avoidance = None
+        if cfg.avoidance:
+            self.avoidance = SocialForceAvoidance(
+                agent_radius    = cfg.avoidance_radius,
+                influence_range = cfg.avoidance_range,
+                strength        = cfg.avoidance_strength,
+                max_lin_vel     = cfg.max_lin_vel,
+            )
+            self._avoidance_neighbors = [env.scene[name] for name in (cfg.avoidance_neighbor_assets or [])]
+            num_groups = self.num_assets + len(self._avoidance_neighbors)
+            self._avoidance_group = torch.arange(self.num_envs, device=self.device).repeat(num_groups)
+
+    def reset(self, env_ids=None):
+        if env_ids is None:
+            self.target_pos_ptr[:] = 0
+        else:
+            self.target_pos_ptr[:, env_ids] = 0
+        return super().reset(env_ids)
+
+    def update_vel_commands(self):
+        pos = self.root_pos_env()[..., :2].flatten(0, 1)     # (M*N, 2)
+        yaw = self.root_yaw().flatten()                       # (M*N,)
+        ptr = self.target_pos_ptr.view(-1)
+        cmd, _, _ = self.planner.step_routine(
+            pos, yaw, self.routine_points, ptr, self.routine_start, self.routine_length
+        )
+        if self.avoidance is not None:
+            cmd = self._avoid(cmd, pos, yaw)
+        self.vel_commands[:] = cmd.view(self.num_assets, self.num_envs, 3)
+
+    def _avoid(self, cmd, pos, yaw):
+        """Social force correction of the (M*N, 3) commands, agents only avoid agents of the same env."""
+        origins = self._env.scene.env_origins[:, :2]
+        vel = torch.stack([robot.data.root_lin_vel_w[:, :2] for robot in self.robots], dim=0).flatten(0, 1)
+        all_pos = [pos] + [asset.data.root_pos_w[:, :2] - origins for asset in self._avoidance_neighbors]
+        all_vel = [vel] + [asset.data.root_lin_vel_w[:, :2] for asset in self._avoidance_neighbors]
+        return self.avoidance.adjust(cmd, yaw, torch.cat(all_pos), torch.cat(all_vel), self._avoidance_group)
+
+
+@configclass
+class NPCActionGroupVelCfg(NullActionCfg):
+    class_type: type[ActionTerm] = NPCActionGroupVel
+
+    asset_name: str = None
+    """Defaults to the first entry of :attr:`asset_names`, the group is driven by all of them."""
+    asset_names: List[str] = MISSING
+    """Names of the NPC assets driven by this term, all of them must share the policy and obs layout."""
+    policy_path: str = MISSING
+    """Path to the low level policy (.pt files)."""
+
+    low_level_decimation: int = 4
+    """Decimation factor for the low level action term."""
+    low_level_actions: ActionTermCfg = MISSING
+    """Low level action configuration, ``asset_name`` is replaced per asset."""
+    low_level_observations: ObservationGroupCfg = MISSING
+    """Low level observation configuration, copied per asset."""
+    fused_low_level_obs: bool = True
+    """Assemble the observations of every asset with a :class:`NPCObsAssembler` bound to its slice of the
+    (M, N, obs_dim) batch, without concatenation or copies. Disable for groups the assembler rejects (modifiers,
+    noise models, history), which then go through one ``ObservationManager`` per asset."""
+
+    policy_precision: str = "fp32"
+    """Inference precision of the low level policy: "fp32", "bf16" or "int8" (dynamic, CPU only)."""
+    profile: bool = False
+    """Time the command / obs / policy / process / apply stages into ``self.timer``, see ``NPCActionBaseCfg.profile``."""
+    profile_capacity: int = 1024
+    """Samples kept per stage (ring buffer)."""
+
+
+@configclass
+class NPCActionGroupRoutineCfg(NPCActionGroupVelCfg):
+    class_type          : type[ActionTerm] = NPCActionGroupRoutine
+    routine_points      : Union[List[Tuple[float, float, float]], List[List[Tuple[float, float, float]]]] = None
+    """List of [x, y, yaw] shared by every agent, or a list of such routines assigned per agent."""
+    routine_file        : str = None
+    """Optional .npz / .csv routine table (see :class:`RoutineTable`), overrides ``routine_points``."""
+    routine_assignment  : str = "cycle"   # "cycle": agent i runs routine i % R, "random": uniform
+    max_lin_vel         : float = 0.5
+    max_yaw_vel         : float = 0.5
+    pos_tol             : float = 0.1
+    yaw_tol             : float = 0.1
+    planner_backend     : str = "eager"   # "eager", "script" or "compile"
+
+    avoidance           : bool = False
+    """Correct the commands with social force avoidance between the agents of each env."""
+    avoidance_radius    : float = 0.3     # agent disc radius (m)
+    avoidance_range     : float = 1.5     # neighbors further than this are ignored (m)
+    avoidance_strength  : float = 0.5     # repulsive speed at contact (m/s)
+    avoidance_neighbor_assets: List[str] = None
+    """Extra NPC assets outside the group to avoid (driven by other terms)."""
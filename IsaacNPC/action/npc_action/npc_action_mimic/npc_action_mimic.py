@@ -17,7 +17,7 @@ from ..npc_action_base import NPCActionBase, NPCActionBaseCfg
 if TYPE_CHECKING:
     from isaaclab.envs import ManagerBasedRLEnv
 
-from beyondMimic.mdp.commands import MotionLoader
+from IsaacNPC.motion import PLAYBACK_MODES, MotionPlayback, get_motion_source
 from isaaclab.utils.math import matrix_from_quat, subtract_frame_transforms
 
 class NPCActionMimic(NPCActionBase):
@@ -25,9 +25,9 @@ class NPCActionMimic(NPCActionBase):
     def __init__(self, cfg: NPCActionMimicCfg, env):
         super().__init__(cfg, env)
         if hasattr(cfg.low_level_observations , "actions"):
-            self.replace_obsterm_with_dummy_func("actions", lambda dummy_env: self.last_action())
+            self.replace_obsterm_with_dummy_func("actions", lambda dummy_env, env_ids=None: self.last_action(env_ids))
         elif hasattr(cfg.low_level_observations , "last_action"):
-            self.replace_obsterm_with_dummy_func("last_action", lambda dummy_env: self.last_action())
+            self.replace_obsterm_with_dummy_func("last_action", lambda dummy_env, env_ids=None: self.last_action(env_ids))
         else:
             raise NameError("no name for last action.")
         
@@ -37,23 +37,34 @@ class NPCActionMimic(NPCActionBase):
             self.robot.find_bodies(self.cfg.body_names, preserve_order=True)[0], dtype=torch.long, device=self.device
         )
         
-        self.motion = MotionLoader(cfg.motion_file, self.body_indexes, device=self.device)
-        self.time_steps = torch.zeros(self.num_envs, dtype=torch.long, device=self.device)
+        # shared between terms playing the same clips
+        self.motion = get_motion_source(cfg, self.body_indexes, device=self.device, consumer=cfg.asset_name)
+        # per-env clip and global frame index into the packed motion fields
+        self.clip_ids = self.motion.assign(self.num_envs, cfg.clip_assignment)
+        self.time_steps = self.motion.clip_offsets[self.clip_ids].clone()
+        if cfg.playback_mode not in PLAYBACK_MODES:
+            raise ValueError(f"Unknown playback mode '{cfg.playback_mode}', expected one of {PLAYBACK_MODES}.")
+        # continuous time playback, time_steps then follows the lower bracketing frame
+        self.playback = None
+        if cfg.playback_mode == "time":
+            self.playback = MotionPlayback(self.motion, self.clip_ids, cfg.playback_speed, cfg.clip_end_mode)
+            self.time_steps = self.playback.frame0
         
         self.replace_obsterm_with_dummy_func("motion_anchor_ori_b", lambda dummy_env: self.motion_anchor_ori_b())
         self.replace_obsterm_with_dummy_func("command", lambda dummy_env: self.motion_cmd())
         
-        self._low_level_obs_manager = ObservationManager({"ll_policy": cfg.low_level_observations}, env)
+        self._low_level_obs_manager = self._make_low_level_obs_manager(cfg.low_level_observations)
 
     def motion_cmd(self) -> torch.Tensor:
-        return torch.cat([
-            self.motion.joint_pos[self.time_steps], 
-            self.motion.joint_vel[self.time_steps]
-        ], dim=1)
+        with self.timer.stage("command"):
+            if self.playback is not None:
+                return self.playback.joint_state()
+            # joint positions and velocities packed in one table, a single gather
+            return self.motion.joint_state_table()[self.time_steps]
 
     def motion_anchor_ori_b(self) -> torch.Tensor:
-        ref_pos = self.motion_anchor_pos_w[self.time_steps]
-        ref_quat = self.motion_anchor_quat_w[self.time_steps]
+        ref_pos = self.motion_anchor_pos_w
+        ref_quat = self.motion_anchor_quat_w
 
         _, ori_b = subtract_frame_transforms(
             self.robot_anchor_pos_w,
@@ -65,16 +76,33 @@ class NPCActionMimic(NPCActionBase):
         return mat[..., :2].reshape(mat.shape[0], -1)
 
     def process_actions(self, actions):
-        self.time_steps += 1
-        self.time_steps %= self.motion.time_step_total
+        with self.timer.stage("motion"):
+            if self.playback is not None:
+                self.playback.advance(self._env.step_dt)
+            else:
+                self.motion.advance(self.time_steps, self.clip_ids, self.cfg.clip_end_mode)
         return super().process_actions(actions)
 
+    def _lod_kinematic_step(self, env_ids: torch.Tensor, dt: float):
+        # far NPCs play the reference frame directly, like NPCActionFK
+        steps = self.time_steps[env_ids]
+        root_states = self.motion.root_state_table()[steps]
+        root_states[:, :3] += self._env.scene.env_origins[env_ids]
+        joint_states = self.motion.joint_state_table()[steps]
+        num_joints = joint_states.shape[1] // 2
+        self.robot.write_root_state_to_sim(root_states, env_ids=env_ids)
+        self.robot.write_joint_state_to_sim(joint_states[:, :num_joints], joint_states[:, num_joints:], env_ids=env_ids)
+
     @property
     def motion_anchor_pos_w(self) -> torch.Tensor:
+        if self.playback is not None:
+            return self.playback.body_pos(self.motion_anchor_body_index) + self._env.scene.env_origins
         return self.motion.body_pos_w[self.time_steps, self.motion_anchor_body_index] + self._env.scene.env_origins
 
     @property
     def motion_anchor_quat_w(self) -> torch.Tensor:
+        if self.playback is not None:
+            return self.playback.body_quat(self.motion_anchor_body_index)
         return self.motion.body_quat_w[self.time_steps, self.motion_anchor_body_index]
 
     @property
@@ -89,18 +117,26 @@ class NPCActionMimic(NPCActionBase):
         self._low_level_obs_manager.reset(env_ids=env_ids)
         return super().reset(env_ids)
 
-    def _render_action(self):
-        low_level_obs = self._low_level_obs_manager.compute_group("ll_policy")
-        return self.policy(low_level_obs)
-
-    def load_policy(self, cfg):
-        if not check_file_path(cfg.policy_path):
-            raise FileNotFoundError(f"Policy file '{cfg.policy_path}' does not exist.")
-        self.policy = torch.jit.load(cfg.policy_path).to(self._env.device).eval()
-
 @configclass
 class NPCActionMimicCfg(NPCActionBaseCfg):
     class_type:         type[ActionTerm] = NPCActionMimic
-    motion_file:        str = MISSING
+    motion_file:        str = None
+    motion_files:       list = None
+    """Clips (list, directory or glob) packed into a MotionLibrary, one clip per env, overrides ``motion_file``."""
+    clip_assignment:    str = "cycle"     # "cycle": env i plays clip i % C, "random": drawn by clip length
+    clip_end_mode:      str = "loop"      # "loop": restart the clip, "resample": draw a new clip
+    clip_weights:       list = None       # optional sampling weights per clip
     body_names:         list = MISSING
     anchor_body_name:   str =MISSING
+    motion_mode:        str = "resident"
+    """"resident": whole clip on the device, "stream": only ``motion_window`` frames resident."""
+    motion_window:      int = 512
+    """Resident frames of the "stream" mode, per term: keep it above the frame spread of the term's envs."""
+    motion_cache_dir:   str = None
+    """Directory of the converted clips (see :func:`IsaacNPC.motion.convert_motion`), None writes them next to the clips."""
+    motion_encoding:    str = "fp32"
+    """"fp32", or "quantized": int16 joints / positions, smallest-three quaternions, fp16 velocities (resident mode)."""
+    playback_mode:      str = "frame"
+    """"frame": one stored frame per step, "time": continuous time with interpolation between frames."""
+    motion_fps:         float = None      # resample the stored clips to this rate at load, None keeps the capture rate
+    playback_speed:     float | tuple = 1.0   # "time" mode speed, or a (min, max) range drawn per env
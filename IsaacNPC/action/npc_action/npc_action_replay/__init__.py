@@ -0,0 +1 @@
+from .npc_action_replay import *
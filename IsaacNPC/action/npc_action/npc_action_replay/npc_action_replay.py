@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+from isaaclab.managers import ActionTerm
+from isaaclab.utils import configclass
+
+from ..npc_action_fk import NPCActionFK, NPCActionFKCfg
+
+from IsaacNPC.motion import get_baked_rollout
+
+
+class NPCActionReplay(NPCActionFK):
+    """
+    Plays back a rollout baked with ``NPCActionBaseCfg.record_dir``, no observations and no policy.
+
+    Recorded envs are tracks of a :class:`IsaacNPC.motion.BakedRollout`, played like the clips of
+    :class:`NPCActionFK` (same packed table gathers and ``write_to_sim``), env ``i`` replays track
+    ``i % K`` with the default "cycle" assignment.
+    """
+    cfg: NPCActionReplayCfg
+
+    def load_policy(self, cfg: NPCActionReplayCfg):
+        self.motion = get_baked_rollout(cfg.rollout_dir, self.device, cfg.rollout_tracks)
+        if self.motion.num_joints != self.robot.num_joints:
+            raise ValueError(
+                f"Rollout '{cfg.rollout_dir}' was recorded with {self.motion.num_joints} joints, "
+                f"asset '{cfg.asset_name}' has {self.robot.num_joints}."
+            )
+        if self.motion.joint_names is not None and list(self.motion.joint_names) != list(self.robot.joint_names):
+            raise ValueError(f"Rollout '{cfg.rollout_dir}' was recorded with another joint order than '{cfg.asset_name}'.")
+
+
+@configclass
+class NPCActionReplayCfg(NPCActionFKCfg):
+    class_type:         type[ActionTerm] = NPCActionReplay
+    rollout_dir:        str = None
+    """Directory written by a recording term (``record_dir``), see :class:`IsaacNPC.motion.RolloutRecorder`."""
+    rollout_tracks:     list = None       # recorded envs to load, None loads all of them
+    body_names:         list = None
+    anchor_body_name:   str = None
@@ -1,2 +1,4 @@
 from .npc_action_vel import NPCActionVel, NPCActionVelCfg
-from .npc_action_routine import NPCActionRoutine, NPCActionRoutineCfg
\ No newline at end of file
+from .npc_action_routine import NPCActionRoutine, NPCActionRoutineCfg
+from .npc_action_flow_field import NPCActionFlowField, NPCActionFlowFieldCfg
+from .npc_action_kinematic import NPCActionKinematic, NPCActionKinematicCfg, KINEMATIC_MOTION_MODELS, KINEMATIC_OUTPUTS
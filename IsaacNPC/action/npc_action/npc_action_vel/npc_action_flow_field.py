@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import torch
+from typing import List, Tuple
+
+from isaaclab.utils import configclass
+import isaaclab.utils.math as math_utils
+
+from .npc_action_vel import NPCActionVel, NPCActionVelCfg
+from IsaacNPC.planner.flow_field import FlowFieldPlanner
+
+
+class NPCActionFlowField(NPCActionVel):
+    """
+    Velocity NPCs steered by a shared flow field toward common goals.
+
+    Every env holds a goal index into ``cfg.goals``, the planner builds one direction field per goal
+    over the occupancy grid and all envs are served by a single batched lookup per step.
+    """
+    cfg: "NPCActionFlowFieldCfg"
+
+    def __init__(self, cfg: "NPCActionFlowFieldCfg", env):
+        planner_kwargs = dict(
+            origin         = cfg.grid_origin,
+            goals          = cfg.goals,
+            max_lin_vel    = cfg.max_lin_vel,
+            max_yaw_vel    = cfg.max_yaw_vel,
+            goal_tol       = cfg.goal_tol,
+            clearance      = cfg.clearance,
+            body_frame     = True,
+            device         = env.device,
+        )
+        if cfg.occupancy_file is not None:
+            self.planner = FlowFieldPlanner.from_file(cfg.occupancy_file, cfg.grid_resolution, **planner_kwargs)
+        else:
+            occupancy = cfg.occupancy if cfg.occupancy is not None else torch.zeros(cfg.grid_size, dtype=torch.bool)
+            self.planner = FlowFieldPlanner(occupancy, cfg.grid_resolution, **planner_kwargs)
+
+        # per-env goal index
+        if cfg.goal_assignment == "cycle":
+            self.goal_ids = torch.arange(env.num_envs, device=env.device) % self.planner.num_goals
+        elif cfg.goal_assignment == "random":
+            self.goal_ids = torch.randint(0, self.planner.num_goals, (env.num_envs,), device=env.device)
+        else:
+            raise ValueError(f"Unknown goal assignment '{cfg.goal_assignment}', expected 'cycle' or 'random'.")
+        self._initial_goal_ids = self.goal_ids.clone()
+
+        super().__init__(cfg, env)
+
+    def set_env_goals(self, env_ids: torch.Tensor, goal_ids: torch.Tensor):
+        """Send ``env_ids`` toward ``goal_ids``, fields are shared so nothing is recomputed."""
+        self.goal_ids[env_ids] = goal_ids
+
+    def set_goals(self, goals):
+        """Replace the goal positions, the flow fields are rebuilt on the next step."""
+        self.planner.set_goals(goals)
+        self.goal_ids.remainder_(self.planner.num_goals)
+
+    def set_occupancy(self, occupancy):
+        """Replace the occupancy grid, the flow fields are rebuilt on the next step."""
+        self.planner.set_grid(occupancy)
+
+    def reset(self, env_ids=None):
+        if env_ids is None:
+            self.goal_ids[:] = self._initial_goal_ids
+        else:
+            self.goal_ids[env_ids] = self._initial_goal_ids[env_ids]
+        super().reset(env_ids)
+
+    def vel_command(self):
+        pos = self.root_pos_env()[:, :2]  # (N,2)
+        quat = self.robot.data.root_quat_w
+        _, _, yaw = math_utils.euler_xyz_from_quat(quat)  # (N,)
+        cmd, arrived = self.planner.compute_cmd(pos, yaw, self.goal_ids)
+        if self.cfg.advance_on_arrival:
+            # arrived envs head to the next goal from the following step on
+            self.goal_ids.add_(arrived).remainder_(self.planner.num_goals)
+        return cmd
+
+
+@configclass
+class NPCActionFlowFieldCfg(NPCActionVelCfg):
+    class_type          : type[NPCActionFlowField] = NPCActionFlowField
+    goals               : List[Tuple[float, float]] = None
+    """Env-frame (x, y) goals, one flow field is built per goal."""
+    goal_assignment     : str = "cycle"   # "cycle": env i heads to goal i % G, "random": uniform
+    advance_on_arrival  : bool = True     # move on to the next goal once arrived, else hold
+    occupancy_file      : str = None
+    """Optional .npy (or .npz with ``occupancy``) grid, True / nonzero where blocked."""
+    occupancy           : List[List[bool]] = None
+    """Inline occupancy grid, rows follow +y and columns +x. A free ``grid_size`` grid if both are unset."""
+    grid_size           : Tuple[int, int] = (128, 128)
+    grid_resolution     : float = 0.1     # cell size (m)
+    grid_origin         : Tuple[float, float] = (-6.4, -6.4)
+    clearance           : float = 0.3     # paths keep this far from obstacles when possible (m)
+    max_lin_vel         : float = 0.5
+    max_yaw_vel         : float = 0.5
+    goal_tol            : float = 0.2
@@ -0,0 +1,198 @@
+from __future__ import annotations
+
+import torch
+from typing import TYPE_CHECKING
+
+import isaaclab.utils.math as math_utils
+from isaaclab.managers import ActionTermCfg, ObservationGroupCfg
+from isaaclab.markers import VisualizationMarkers, VisualizationMarkersCfg
+from isaaclab.markers.config import BLUE_ARROW_X_MARKER_CFG
+from isaaclab.utils import configclass
+
+from ...null_action import NullAction
+from .npc_action_routine import NPCActionRoutine, NPCActionRoutineCfg
+from IsaacNPC.utils.stage_timer import StageTimer
+
+KINEMATIC_MOTION_MODELS = ("unicycle", "holonomic")
+KINEMATIC_OUTPUTS = ("root_state", "markers", "none")
+
+
+class NPCActionKinematic(NPCActionRoutine):
+    """
+    Physics-free crowd of routine NPCs.
+
+    Runs the routine planner of :class:`NPCActionRoutine` (waypoints or trajectories, avoidance) over
+    ``crowd_size`` agents per env, then integrates the commands with a planar motion model in plain
+    tensors: no joints, no low level policy and no articulation reads. Agents are laid out env-major,
+    agent ``a`` belongs to env ``a // crowd_size``, and the ``env_ids`` of :meth:`set_env_routines`
+    are agent ids here.
+
+    Poses go out as
+      - ``"root_state"``: root pose / velocity of ``asset_name`` (one agent per env, e.g. a kinematic
+        rigid body or a fixed-joint character),
+      - ``"markers"``: one instanced marker per agent, ``asset_name`` is then only the scene anchor
+        the action manager requires,
+      - ``"none"``: nothing, the state is read through :meth:`agent_pose_w`.
+    """
+    cfg: "NPCActionKinematicCfg"
+
+    def __init__(self, cfg: "NPCActionKinematicCfg", env):
+        # no low level policy, skip the articulated setup of NPCActionBase
+        NullAction.__init__(self, cfg, env)
+        if cfg.motion_model not in KINEMATIC_MOTION_MODELS:
+            raise ValueError(f"Unknown motion model '{cfg.motion_model}', expected one of {KINEMATIC_MOTION_MODELS}.")
+        if cfg.output not in KINEMATIC_OUTPUTS:
+            raise ValueError(f"Unknown kinematic output '{cfg.output}', expected one of {KINEMATIC_OUTPUTS}.")
+        if cfg.output == "root_state" and cfg.crowd_size != 1:
+            raise ValueError("'root_state' output drives one asset per env, use 'markers' for crowd_size > 1.")
+
+        self.robot = env.scene[cfg.asset_name]
+        self.timer = StageTimer(self.device, cfg.profile_capacity, enabled=cfg.profile, name=cfg.asset_name)
+        self.crowd_size = cfg.crowd_size
+        self.num_agents = env.num_envs * cfg.crowd_size
+        self._init_routine(cfg, env, self.num_agents)
+
+        # planar agent state: env-frame position, yaw, world velocity (vx, vy, yaw rate) and body-frame command
+        self.agent_env = torch.arange(self.num_agents, device=self.device) // cfg.crowd_size
+        self.agent_pos = torch.zeros(self.num_agents, 2, device=self.device)
+        self.agent_yaw = torch.zeros(self.num_agents, device=self.device)
+        self.agent_vel = torch.zeros(self.num_agents, 3, device=self.device)
+        self.agent_cmd = torch.zeros(self.num_agents, 3, device=self.device)
+        self._agent_offsets = torch.arange(cfg.crowd_size, device=self.device)
+
+        if cfg.root_height is not None:
+            self._height = torch.full((self.num_agents,), cfg.root_height, device=self.device)
+        elif cfg.output == "root_state":
+            self._height = self.robot.data.default_root_state[:, 2].clone()
+        else:
+            self._height = torch.zeros(self.num_agents, device=self.device)
+
+        # persistent output buffers
+        self._pose_buf = torch.zeros(self.num_agents, 7, device=self.device)
+        self._vel_buf = torch.zeros(self.num_agents, 6, device=self.device)
+        self.markers = None
+        if cfg.output == "markers":
+            marker_cfg = cfg.marker_cfg
+            if marker_cfg is None:
+                marker_cfg = BLUE_ARROW_X_MARKER_CFG.copy()
+                marker_cfg.prim_path = f"/Visuals/NPC/{cfg.asset_name}/crowd"
+            self.markers = VisualizationMarkers(marker_cfg)
+        self._counter = 0
+        self._spawn(None)
+
+    def agent_ids(self, env_ids=None) -> torch.Tensor | None:
+        """Agents of ``env_ids`` (None: all agents)."""
+        if env_ids is None:
+            return None
+        env_ids = torch.as_tensor(env_ids, device=self.device, dtype=torch.long)
+        return (env_ids.unsqueeze(1) * self.crowd_size + self._agent_offsets).reshape(-1)
+
+    def reset(self, env_ids=None):
+        agent_ids = self.agent_ids(env_ids)
+        self._reset_routine(agent_ids)
+        self._spawn(agent_ids)
+        # fresh commands on the next tick
+        self._counter = 0
+        return NullAction.reset(self, env_ids)
+
+    def _spawn(self, agent_ids=None):
+        """Place ``agent_ids`` on the first waypoint of their routine, jittered within ``spawn_radius``."""
+        rows = slice(None) if agent_ids is None else agent_ids
+        start = self.routine_start[rows]
+        first = self.routine_table.gather(start, torch.zeros_like(start))
+        pos = first[:, :2]
+        if self.cfg.spawn_radius > 0.0:
+            radius = self.cfg.spawn_radius * torch.sqrt(torch.rand(start.shape[0], device=self.device))
+            angle = 2 * torch.pi * torch.rand(start.shape[0], device=self.device)
+            pos = pos + radius.unsqueeze(1) * torch.stack([torch.cos(angle), torch.sin(angle)], dim=1)
+        self.agent_pos[rows] = pos
+        self.agent_yaw[rows] = first[:, 2]
+        self.agent_vel[rows] = 0.0
+        self.agent_cmd[rows] = 0.0
+
+    def apply_actions(self):
+        if self._counter % self.cfg.low_level_decimation == 0:
+            with self.timer.stage("command"):
+                self.agent_cmd.copy_(self.vel_command())
+            self._counter = 0
+        with self.timer.stage("integrate"):
+            self._integrate(self._env.physics_dt)
+        if self._counter % self.cfg.write_interval == 0:
+            with self.timer.stage("write"):
+                self.write_to_sim()
+        self._counter += 1
+
+    def _integrate(self, dt: float):
+        cmd = self.agent_cmd
+        if self.cfg.motion_model == "unicycle":
+            # forward speed along the midpoint heading, lateral command dropped
+            heading = self.agent_yaw + 0.5 * dt * cmd[:, 2]
+            self.agent_vel[:, 0] = torch.cos(heading) * cmd[:, 0]
+            self.agent_vel[:, 1] = torch.sin(heading) * cmd[:, 0]
+        else:
+            cos_yaw, sin_yaw = torch.cos(self.agent_yaw), torch.sin(self.agent_yaw)
+            self.agent_vel[:, 0] = cos_yaw * cmd[:, 0] - sin_yaw * cmd[:, 1]
+            self.agent_vel[:, 1] = sin_yaw * cmd[:, 0] + cos_yaw * cmd[:, 1]
+        self.agent_vel[:, 2] = cmd[:, 2]
+        self.agent_pos.add_(self.agent_vel[:, :2], alpha=dt)
+        self.agent_yaw.copy_(math_utils.wrap_to_pi(self.agent_yaw + dt * cmd[:, 2]))
+
+    def agent_pose_w(self) -> tuple[torch.Tensor, torch.Tensor]:
+        """World positions (M, 3) and yaw quaternions (M, 4, w first) of every agent, in the output buffers."""
+        pose = self._pose_buf
+        pose[:, :2] = self.agent_pos + self._env.scene.env_origins[self.agent_env, :2]
+        pose[:, 2] = self._height + self._env.scene.env_origins[self.agent_env, 2]
+        # yaw only quaternion
+        half_yaw = 0.5 * self.agent_yaw
+        pose[:, 3] = torch.cos(half_yaw)
+        pose[:, 4:6] = 0.0
+        pose[:, 6] = torch.sin(half_yaw)
+        return pose[:, :3], pose[:, 3:]
+
+    def write_to_sim(self):
+        if self.cfg.output == "none":
+            return
+        pos_w, quat_w = self.agent_pose_w()
+        if self.markers is not None:
+            self.markers.visualize(translations=pos_w, orientations=quat_w)
+            return
+        self._vel_buf[:, :2] = self.agent_vel[:, :2]
+        self._vel_buf[:, 5] = self.agent_vel[:, 2]
+        self.robot.write_root_pose_to_sim(self._pose_buf)
+        self.robot.write_root_velocity_to_sim(self._vel_buf)
+
+    def root_pos_env(self) -> torch.Tensor:
+        pos = torch.zeros(self.num_agents, 3, device=self.device)
+        pos[:, :2] = self.agent_pos
+        pos[:, 2] = self._height
+        return pos
+
+    def root_pose_2d(self) -> tuple[torch.Tensor, torch.Tensor]:
+        return self.agent_pos, self.agent_yaw
+
+    def root_vel_2d(self) -> torch.Tensor:
+        return self.agent_vel[:, :2]
+
+
+@configclass
+class NPCActionKinematicCfg(NPCActionRoutineCfg):
+    """Routine config of :class:`NPCActionKinematic`, the policy and low level fields are unused."""
+    class_type          : type[NPCActionKinematic] = NPCActionKinematic
+    policy_path         : str = None
+    low_level_actions   : ActionTermCfg = None
+    low_level_observations: ObservationGroupCfg = None
+
+    crowd_size          : int = 1
+    """Agents per env, more than one needs the "markers" or "none" output."""
+    motion_model        : str = "unicycle"
+    """"unicycle": forward speed and yaw rate only, "holonomic": forward, lateral and yaw rate."""
+    output              : str = "root_state"
+    """"root_state": write the root of ``asset_name``, "markers": one instanced marker per agent, "none"."""
+    marker_cfg          : VisualizationMarkersCfg = None
+    """Markers of the "markers" output, None uses blue arrows under /Visuals/NPC/<asset_name>/crowd."""
+    root_height         : float | None = None
+    """Height of the agents above the env origin (m), None takes the asset default root height (0 for markers)."""
+    spawn_radius        : float = 0.0
+    """Agents spawn uniformly within this radius (m) of the first waypoint of their routine."""
+    write_interval      : int = 1
+    """Physics ticks between output writes, the state is integrated every tick."""
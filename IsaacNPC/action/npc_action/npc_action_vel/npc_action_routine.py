@@ -2,7 +2,7 @@ from __future__ import annotations
 
 import torch
 from dataclasses import MISSING
-from typing import TYPE_CHECKING, List, Tuple
+from typing import TYPE_CHECKING, List, Tuple, Union
 
 from isaaclab.assets import Articulation
 from isaaclab.managers import ActionTerm, ActionTermCfg
@@ -11,15 +11,25 @@ import isaaclab.utils.math as math_utils
 
 from .npc_action_vel import NPCActionVel, NPCActionVelCfg
 from .velocity_planner_2d import BatchVelocityPlanner
+from IsaacNPC.planner.velocity.velocity_planner_2d import RoutineStepBuffers
+from IsaacNPC.planner.velocity.routine_table import RoutineTable
+from IsaacNPC.planner.velocity.path_table import ArcLengthPathTable
+from IsaacNPC.planner.avoidance import SocialForceAvoidance
+from IsaacNPC.planner.behavior import BehaviorFSM
 
 
 class NPCActionRoutine(NPCActionVel):
     cfg: "NPCActionRoutineCfg"
 
     def __init__(self, cfg: "NPCActionRoutineCfg", env):
-        # per-env waypoint pointer
+        self._init_routine(cfg, env, env.num_envs)
+        super().__init__(cfg, env)
+
+    def _init_routine(self, cfg: "NPCActionRoutineCfg", env, num_agents: int):
+        """Planner, routine table and per-agent routine state for ``num_agents`` agents (env-major)."""
+        # per-agent waypoint pointer
         self.target_pos_ptr = torch.zeros(
-            (env.num_envs,), device=env.device, dtype=torch.long
+            (num_agents,), device=env.device, dtype=torch.long
         )
 
         # planner is stateless, shared across envs
@@ -28,24 +38,131 @@ class NPCActionRoutine(NPCActionVel):
             max_yaw_vel = cfg.max_yaw_vel,
             pos_tol     = cfg.pos_tol,
             yaw_tol     = cfg.yaw_tol,
+            body_frame  = True,
+            backend     = cfg.planner_backend,
         )
+        # static buffers: planar pose and planner step written in place (waypoint mode)
+        self._step_buffers = None
+        if cfg.static_buffers:
+            self._step_buffers = RoutineStepBuffers(num_agents, env.device)
+            self._pos_2d_buf = torch.zeros((num_agents, 2), device=env.device)
+            self._yaw_buf = torch.zeros((num_agents,), device=env.device)
+            self._yaw_tmp = torch.zeros((num_agents,), device=env.device)
+
+        # packed routines: points (P, 3) -> (x, y, yaw), one routine per env through start / length
+        self.routine_table = RoutineTable.from_cfg(cfg, device=env.device)
+        self.routine_points = self.routine_table.points
+        self.total_rountine_points = self.routine_table.num_points
+        self.env_routine = torch.zeros((num_agents,), device=env.device, dtype=torch.long)
+        self.routine_start = torch.zeros_like(self.env_routine)
+        self.routine_length = torch.zeros_like(self.env_routine)
+
+        # trajectory mode: arc-length sampled paths and a per-env progress index
+        self.path_table = None
+        if cfg.follow_mode == "trajectory":
+            self.path_table = ArcLengthPathTable(
+                self.routine_table,
+                resolution  = cfg.path_resolution,
+                max_lin_vel = cfg.max_lin_vel,
+                max_lat_acc = cfg.max_lat_acc,
+                max_lin_acc = cfg.max_lin_acc,
+                min_lin_vel = cfg.min_lin_vel,
+                lookahead   = cfg.path_lookahead,
+            )
+            self.path_progress = torch.zeros_like(self.env_routine)
+            self.path_start = torch.zeros_like(self.env_routine)
+            self.path_length = torch.zeros_like(self.env_routine)
+            self.path_spacing = torch.zeros((num_agents,), device=env.device)
+            self.path_lookahead = torch.zeros_like(self.env_routine)
+        elif cfg.follow_mode != "waypoint":
+            raise ValueError(f"Unknown routine follow mode '{cfg.follow_mode}', expected 'waypoint' or 'trajectory'.")
+
+        # local NPC-NPC avoidance on top of the planner commands
+        self.avoidance = None
+        if cfg.avoidance:
+            self.avoidance = SocialForceAvoidance(
+                agent_radius    = cfg.avoidance_radius,
+                influence_range = cfg.avoidance_range,
+                strength        = cfg.avoidance_strength,
+                max_lin_vel     = cfg.max_lin_vel,
+            )
+            self._avoidance_neighbors = [env.scene[name] for name in (cfg.avoidance_neighbor_assets or [])]
+            # group = env id: agents of an env, then the neighbor assets of every env
+            agents_per_env = num_agents // env.num_envs
+            self._avoidance_group = torch.cat(
+                [torch.arange(num_agents, device=env.device) // agents_per_env]
+                + [torch.arange(env.num_envs, device=env.device)] * len(self._avoidance_neighbors)
+            )
+
+        # walk / wait / turn / idle state machine masking the planner commands
+        self.behavior = None
+        if cfg.behavior:
+            self.behavior = BehaviorFSM(
+                num_agents,
+                device      = env.device,
+                wait_prob   = cfg.behavior_wait_prob,
+                wait_time   = cfg.behavior_wait_time,
+                turn_prob   = cfg.behavior_turn_prob,
+                turn_time   = cfg.behavior_turn_time,
+                turn_rate   = cfg.behavior_turn_rate,
+                idle_rate   = cfg.behavior_idle_rate,
+                idle_time   = cfg.behavior_idle_time,
+                switch_prob = cfg.behavior_switch_prob,
+            )
+            # vel_command runs once per low level step, staggered phases included
+            self._behavior_dt = env.physics_dt * cfg.low_level_decimation
 
-        # routine points: (K, 3) -> (x, y, yaw)
-        self.routine_points = (
-            torch.tensor(cfg.routine_points, dtype=torch.float32, device=env.device)
-            .reshape(-1, 3)
+        self.set_env_routines(
+            torch.arange(num_agents, device=env.device),
+            self.routine_table.assign(num_agents, cfg.routine_assignment),
         )
-        
-        self.total_rountine_points = self.routine_points.shape[0]
-        
-        super().__init__(cfg, env)
+
+    def set_env_routines(self, env_ids: torch.Tensor, routine_ids: torch.Tensor):
+        """Switch ``env_ids`` to ``routine_ids`` and restart them at the first waypoint."""
+        self.env_routine[env_ids] = routine_ids
+        self.routine_start[env_ids] = self.routine_table.offsets[routine_ids]
+        self.routine_length[env_ids] = self.routine_table.lengths[routine_ids]
+        self.target_pos_ptr[env_ids] = 0
+        if self.path_table is not None:
+            start, length, spacing, lookahead = self.path_table.agent_params(routine_ids)
+            self.path_start[env_ids] = start
+            self.path_length[env_ids] = length
+            self.path_spacing[env_ids] = spacing
+            self.path_lookahead[env_ids] = lookahead
+            self.path_progress[env_ids] = 0
 
     def reset(self, env_ids=None):
-        if env_ids is None:
+        self._reset_routine(env_ids)
+        super().reset(env_ids)
+
+    def _reset_routine(self, agent_ids=None):
+        """Restart ``agent_ids`` (all if None) at the first waypoint of their routine."""
+        if agent_ids is None:
             self.target_pos_ptr[:] = 0
         else:
-            self.target_pos_ptr[env_ids] = 0
-        super().reset(env_ids)
+            self.target_pos_ptr[agent_ids] = 0
+        if self.path_table is not None:
+            if agent_ids is None:
+                self.path_progress[:] = 0
+            else:
+                self.path_progress[agent_ids] = 0
+        if self.behavior is not None:
+            self.behavior.reset(agent_ids)
+
+    def _switch_routines(self, switch: torch.Tensor):
+        """Move the ``switch`` (N,) bool agents to a random routine, masked so that no host sync is needed."""
+        routine_ids = torch.randint(0, self.routine_table.num_routines, switch.shape, device=switch.device)
+        self.env_routine.copy_(torch.where(switch, routine_ids, self.env_routine))
+        self.routine_start.copy_(self.routine_table.offsets[self.env_routine])
+        self.routine_length.copy_(self.routine_table.lengths[self.env_routine])
+        self.target_pos_ptr.masked_fill_(switch, 0)
+        if self.path_table is not None:
+            start, length, spacing, lookahead = self.path_table.agent_params(self.env_routine)
+            self.path_start.copy_(start)
+            self.path_length.copy_(length)
+            self.path_spacing.copy_(spacing)
+            self.path_lookahead.copy_(lookahead)
+            self.path_progress.masked_fill_(switch, 0)
 
     def _get_current_targets(self):
         """
@@ -53,11 +170,8 @@ class NPCActionRoutine(NPCActionVel):
             goal_pos: (N,2)
             goal_yaw: (N,)
         """
-        # (N,) index into routine_points (K,3)
-        idx = self.target_pos_ptr.clamp(max=self.total_rountine_points)
-
-        # gather for each env
-        goals = self.routine_points[idx]     # (N,3)
+        # gather for each env from its own routine
+        goals = self.routine_table.gather(self.routine_start, self.target_pos_ptr)     # (N,3)
         goal_pos = goals[:, :2]              # (N,2)
         goal_yaw = goals[:, 2]               # (N,)
         return goal_pos, goal_yaw
@@ -68,27 +182,97 @@ class NPCActionRoutine(NPCActionVel):
         Produces (N,3) velocity commands.
         """
 
-        pos = self.root_pos_env()[:, :2]  # (N,2)
-        quat = self.robot.data.root_quat_w
-        _, _, yaw = math_utils.euler_xyz_from_quat(quat)  # (N,)
-        goal_pos, goal_yaw = self._get_current_targets()
-        arrived = self.planner.check_arrival(pos, yaw, goal_pos, goal_yaw)
-        # update target index for arrived envs
-        if arrived.any():
-            self.target_pos_ptr[arrived] += 1
-            self.target_pos_ptr %= self.total_rountine_points
-
-        # recompute goals after updating pointers
-        goal_pos, goal_yaw = self._get_current_targets()
-        cmd, _ = self.planner.compute_cmd(pos, yaw, goal_pos, goal_yaw)
-        
+        pos, yaw = self.root_pose_2d()  # (N,2), (N,)
+        arrived = None
+        if self.path_table is not None:
+            # progress update and table lookup, no arrival checks
+            cmd = self.path_table.follow(
+                pos, yaw, self.path_progress, self.path_start, self.path_length,
+                self.path_spacing, self.path_lookahead, self.planner.max_yaw_vel,
+            )
+        else:
+            # arrival, pointer update and command, arrived envs already head to the next point
+            cmd, arrived, _ = self.planner.step_routine(
+                pos, yaw, self.routine_points, self.target_pos_ptr, self.routine_start, self.routine_length,
+                out=self._step_buffers,
+            )
+        if self.avoidance is not None:
+            cmd = self._avoid(cmd, pos, yaw)
+        if self.behavior is not None:
+            # after avoidance, waiting agents stand still and walkers steer around them
+            self.behavior.step(self._behavior_dt, arrived)
+            if self.cfg.behavior_switch_prob > 0.0:
+                self._switch_routines(self.behavior.switch)
+            cmd = self.behavior.command(cmd)
         return cmd
 
+    def root_pose_2d(self) -> tuple[torch.Tensor, torch.Tensor]:
+        """Planar pose the routine is steered from: xy in the env frame (N, 2) and yaw (N,)."""
+        if self._step_buffers is not None:
+            return self._root_pose_2d_static()
+        _, _, yaw = math_utils.euler_xyz_from_quat(self.robot.data.root_quat_w)
+        return self.root_pos_env()[:, :2], yaw
+
+    def _root_pose_2d_static(self) -> tuple[torch.Tensor, torch.Tensor]:
+        # yaw = atan2(w z + x y, 1/2 - (y^2 + z^2)), the yaw of euler_xyz_from_quat up to a 2 pi wrap
+        w, x, y, z = self.robot.data.root_quat_w.unbind(1)
+        yaw, tmp = self._yaw_buf, self._yaw_tmp
+        torch.mul(w, z, out=yaw).addcmul_(x, y)
+        torch.mul(y, y, out=tmp).addcmul_(z, z)
+        torch.sub(self._step_buffers.scalar(0.5), tmp, out=tmp)
+        torch.atan2(yaw, tmp, out=yaw)
+        torch.sub(self.robot.data.root_pos_w[:, :2], self._env.scene.env_origins[:, :2], out=self._pos_2d_buf)
+        return self._pos_2d_buf, yaw
+
+    def root_vel_2d(self) -> torch.Tensor:
+        """Planar world velocity (N, 2), seen by the avoidance of the other agents."""
+        return self.robot.data.root_lin_vel_w[:, :2]
+
+    def _avoid(self, cmd, pos, yaw):
+        """Social force correction against the other NPCs of the same env (this asset first, then neighbors)."""
+        origins = self._env.scene.env_origins[:, :2]
+        all_pos = [pos] + [asset.data.root_pos_w[:, :2] - origins for asset in self._avoidance_neighbors]
+        all_vel = [self.root_vel_2d()] + [asset.data.root_lin_vel_w[:, :2] for asset in self._avoidance_neighbors]
+        return self.avoidance.adjust(cmd, yaw, torch.cat(all_pos), torch.cat(all_vel), self._avoidance_group)
+
 @configclass
 class NPCActionRoutineCfg(NPCActionVelCfg):
     class_type          : type[NPCActionRoutine] = NPCActionRoutine
-    routine_points      : List[Tuple[float, float, float]] = MISSING   # list of [x, y, yaw]
-    max_lin_vel         : float = 0.5, 
-    max_yaw_vel         : float = 0.5,
-    pos_tol             : float = 0.1,
+    routine_points      : Union[List[Tuple[float, float, float]], List[List[Tuple[float, float, float]]]] = None
+    """List of [x, y, yaw] shared by every env, or a list of such routines assigned per env."""
+    routine_file        : str = None
+    """Optional .npz / .csv routine table (see :class:`RoutineTable`), overrides ``routine_points``."""
+    routine_assignment  : str = "cycle"   # "cycle": env i runs routine i % R, "random": uniform
+    max_lin_vel         : float = 0.5
+    max_yaw_vel         : float = 0.5
+    pos_tol             : float = 0.1
     yaw_tol             : float = 0.1
+    planner_backend     : str = "eager"   # "eager", "script" or "compile"
+
+    follow_mode         : str = "waypoint"
+    """"waypoint": steer to the next discrete waypoint, "trajectory": follow the arc-length sampled path."""
+    path_resolution     : float = 0.05    # arc-length spacing of the path samples (m)
+    path_lookahead      : float = 0.5     # distance ahead of the progress point to steer toward (m)
+    max_lat_acc         : float = 0.5     # curvature speed limit, v <= sqrt(max_lat_acc / |kappa|)
+    max_lin_acc         : float = 0.5     # acceleration limit along the path (m/s^2)
+    min_lin_vel         : float = 0.1     # lower bound of the path speed profile (m/s)
+
+    avoidance           : bool = False
+    """Correct the commands with social force avoidance against the NPCs of the same env."""
+    avoidance_radius    : float = 0.3     # agent disc radius (m)
+    avoidance_range     : float = 1.5     # neighbors further than this are ignored (m)
+    avoidance_strength  : float = 0.5     # repulsive speed at contact (m/s)
+    avoidance_neighbor_assets: List[str] = None
+    """NPC assets of the same env to avoid (driven by other terms), envs never see each other."""
+
+    behavior            : bool = False
+    """Mask the routine commands with a :class:`IsaacNPC.planner.behavior.BehaviorFSM` (walk / wait / turn / idle),
+    waits, look-arounds and route switches trigger on waypoint arrivals ("waypoint" follow mode)."""
+    behavior_wait_prob  : float = 0.3     # probability to wait at a reached waypoint
+    behavior_wait_time  : tuple = (1.0, 3.0)   # (min, max) wait duration (s)
+    behavior_turn_prob  : float = 0.2     # probability to look around at a reached waypoint
+    behavior_turn_time  : tuple = (1.0, 2.0)   # (min, max) look-around duration (s)
+    behavior_turn_rate  : float = 0.8     # look-around yaw rate (rad/s)
+    behavior_idle_rate  : float = 0.02    # idle stops per second of walking
+    behavior_idle_time  : tuple = (2.0, 6.0)   # (min, max) idle duration (s)
+    behavior_switch_prob: float = 0.0     # probability to switch to a random routine at a reached waypoint
@@ -21,31 +21,70 @@ class NPCActionVel(NPCActionBase):
     cfg: NPCActionVelCfg
     def __init__(self, cfg: NPCActionVelCfg, env):
         super().__init__(cfg, env)
+        # ``env_ids``: the fused assembler reads these terms on the due rows only (staggered phases)
         if hasattr(cfg.low_level_observations , "actions"):
-            cfg.low_level_observations.actions.func = lambda dummy_env: self.last_action()
+            cfg.low_level_observations.actions.func = lambda dummy_env, env_ids=None: self.last_action(env_ids)
             cfg.low_level_observations.actions.params = dict()
         elif hasattr(cfg.low_level_observations , "last_action"):
-            cfg.low_level_observations.last_action.func = lambda dummy_env: self.last_action()
+            cfg.low_level_observations.last_action.func = lambda dummy_env, env_ids=None: self.last_action(env_ids)
             cfg.low_level_observations.last_action.params = dict()
         else:
             raise NameError("no name for last action.")
-        cfg.low_level_observations.velocity_commands.func = lambda dummy_env: self.vel_command()
+        # constant command, allocated once for static buffers, also the command output of subclasses
+        self._vel_command_buf = torch.zeros((self._env.num_envs, 3), device=self.device, dtype=torch.float32)
+        self._vel_command_buf[:, 0] = 0.3
+        # last command fed to the policy, reused by the kinematic LOD step
+        self._last_vel_command = self._vel_command_buf
+        cfg.low_level_observations.velocity_commands.func = lambda dummy_env, env_ids=None: self._observe_vel_command(env_ids)
         cfg.low_level_observations.velocity_commands.params = dict()
-        self._low_level_obs_manager = ObservationManager({"ll_policy": cfg.low_level_observations}, env)
+        self._low_level_obs_manager = self._make_low_level_obs_manager(cfg.low_level_observations)
         
     def reset(self, env_ids = None):
         self._low_level_obs_manager.reset(env_ids=env_ids)
         return super().reset(env_ids)
         
-    def _render_action(self):
-        low_level_obs = self._low_level_obs_manager.compute_group("ll_policy")
-        return self.policy(low_level_obs)
-    
     def vel_command(self):
+        if self.cfg.static_buffers:
+            return self._vel_command_buf
         cmd = torch.zeros((self._env.num_envs, 3), device=self.device, dtype=torch.float32)
         cmd[:, 0] = 0.3 
         return cmd
 
+    def _observe_vel_command(self, env_ids=None):
+        # with staggered phases the due envs read their rows of the command refreshed once per low level step
+        if not self.cfg.staggered_phases or self._phase_command_due:
+            with self.timer.stage("command"):
+                cmd = self.vel_command()
+                if self.cfg.static_buffers:
+                    # planner outputs land in the persistent command buffer
+                    if cmd is not self._vel_command_buf:
+                        self._vel_command_buf.copy_(cmd)
+                    cmd = self._vel_command_buf
+                self._last_vel_command = cmd
+        return self._last_vel_command if env_ids is None else self._last_vel_command[env_ids]
+
+    def _lod_kinematic_step(self, env_ids: torch.Tensor, dt: float):
+        # far NPCs slide along their command: planar unicycle step of the root, default joint pose
+        cmd = self._last_vel_command[env_ids]
+        root_pos = self.robot.data.root_pos_w[env_ids]
+        _, _, yaw = math_utils.euler_xyz_from_quat(self.robot.data.root_quat_w[env_ids])
+        cos_yaw, sin_yaw = torch.cos(yaw), torch.sin(yaw)
+        vel_w = torch.zeros(env_ids.shape[0], 6, device=self.device)
+        vel_w[:, 0] = cos_yaw * cmd[:, 0] - sin_yaw * cmd[:, 1]
+        vel_w[:, 1] = sin_yaw * cmd[:, 0] + cos_yaw * cmd[:, 1]
+        vel_w[:, 5] = cmd[:, 2]
+        pose = torch.zeros(env_ids.shape[0], 7, device=self.device)
+        pose[:, :2] = root_pos[:, :2] + vel_w[:, :2] * dt
+        pose[:, 2] = self.robot.data.default_root_state[env_ids, 2] + self._env.scene.env_origins[env_ids, 2]
+        zeros = torch.zeros_like(yaw)
+        pose[:, 3:] = math_utils.quat_from_euler_xyz(zeros, zeros, yaw + cmd[:, 2] * dt)
+        self.low_level_actions[env_ids] = 0
+        self.robot.write_root_pose_to_sim(pose, env_ids=env_ids)
+        self.robot.write_root_velocity_to_sim(vel_w, env_ids=env_ids)
+        self.robot.write_joint_state_to_sim(
+            self.robot.data.default_joint_pos[env_ids], self.robot.data.default_joint_vel[env_ids], env_ids=env_ids
+        )
+
 @configclass
 class NPCActionVelCfg(NPCActionBaseCfg):
     class_type: type[ActionTerm] = NPCActionVel
@@ -0,0 +1,195 @@
+from __future__ import annotations
+
+import inspect
+import torch
+from typing import TYPE_CHECKING
+
+from isaaclab.managers import ManagerTermBase, ObservationGroupCfg, SceneEntityCfg
+from isaaclab.managers import ObservationTermCfg as ObsTerm
+from isaaclab.utils import noise
+
+from IsaacNPC.utils.func_tools import has_param
+
+if TYPE_CHECKING:
+    from isaaclab.envs import ManagerBasedEnv
+
+
+class NPCObsAssembler:
+    """
+    Fused low level observation assembler for NPC policies.
+
+    Built from the same :class:`ObservationGroupCfg` as the ``ObservationManager`` it replaces. Slice
+    offsets are resolved once at construction and every step each term writes straight into a single
+    preallocated (N, obs_dim) buffer. Noise, clip and scale are then applied as one vectorized op
+    each over the whole buffer, in the same order as ``ObservationManager.compute_group``
+    (noise -> clip -> scale).
+
+    Supported: additive uniform / gaussian / constant noise, clip and scalar or per-dim scale.
+    Modifiers, noise models, non additive noise and history are rejected, keep the
+    ``ObservationManager`` for those groups.
+
+    :meth:`compute` can assemble a subset of the envs only (e.g. the due envs of staggered phases):
+    terms whose function takes an ``env_ids`` argument are evaluated on those rows, the others over
+    the whole batch then gathered, and noise, clip and scale run on the rows alone.
+
+    The returned tensor is the internal buffer, it is overwritten on the next :meth:`compute`. :meth:`bind`
+    swaps it for an external (N, obs_dim) tensor, e.g. one asset slice of a batched group buffer.
+    """
+
+    def __init__(self, cfg: ObservationGroupCfg, env: ManagerBasedEnv):
+        self.cfg = cfg
+        self._env = env
+        self.num_envs = env.num_envs
+        self.device = env.device
+
+        if cfg.history_length is not None and cfg.history_length > 0:
+            raise ValueError("NPCObsAssembler does not support observation history.")
+        if not cfg.concatenate_terms:
+            raise ValueError("NPCObsAssembler requires concatenated observation terms.")
+
+        self.term_names: list[str] = []
+        self._term_cfgs: list[ObsTerm] = []
+        self._class_terms: list[ManagerTermBase] = []
+        self._row_terms: list[bool] = []   # term function takes ``env_ids``
+        self.term_slices: dict[str, slice] = {}
+
+        # resolve terms and their dims, in declaration order like the observation manager
+        term_dims = []
+        for term_name, term_cfg in cfg.__dict__.items():
+            if term_name in ["enable_corruption", "concatenate_terms", "history_length", "flatten_history_dim", "concatenate_dim"]:
+                continue
+            if term_cfg is None or not isinstance(term_cfg, ObsTerm):
+                continue
+            self._resolve_term(term_name, term_cfg)
+            term_dims.append(self._evaluate_term(term_cfg).shape[1])
+
+        offset = 0
+        for term_name, dim in zip(self.term_names, term_dims):
+            self.term_slices[term_name] = slice(offset, offset + dim)
+            offset += dim
+        self.obs_dim = offset
+
+        self._buffer = torch.zeros(self.num_envs, self.obs_dim, device=self.device)
+        self._build_post_processing(cfg)
+
+    """
+    Operations.
+    """
+
+    def compute(self, env_ids: torch.Tensor | None = None) -> torch.Tensor:
+        """
+        Assemble the observations of all envs, (N, obs_dim), or of ``env_ids`` only, (len(env_ids), obs_dim)
+        in the order of ``env_ids``.
+        """
+        if env_ids is None:
+            buffer = self._buffer
+            for term_cfg, term_slice in zip(self._term_cfgs, self.term_slices.values()):
+                buffer[:, term_slice] = self._evaluate_term(term_cfg)
+        else:
+            # compact rows at the head of the buffer
+            buffer = self._buffer[:env_ids.shape[0]]
+            for term_cfg, term_slice, rows in zip(self._term_cfgs, self.term_slices.values(), self._row_terms):
+                if rows:
+                    buffer[:, term_slice] = self._evaluate_term(term_cfg, env_ids)
+                else:
+                    buffer[:, term_slice] = self._evaluate_term(term_cfg)[env_ids]
+        if self._uniform_span is not None:
+            noise_buf = self._noise_buf[:buffer.shape[0]]
+            noise_buf.uniform_()
+            buffer.addcmul_(noise_buf, self._uniform_span)
+        if self._gaussian_std is not None:
+            noise_buf = self._noise_buf[:buffer.shape[0]]
+            noise_buf.normal_()
+            buffer.addcmul_(noise_buf, self._gaussian_std)
+        if self._noise_offset is not None:
+            buffer.add_(self._noise_offset)
+        if self._clip_min is not None:
+            buffer.clamp_(min=self._clip_min, max=self._clip_max)
+        if self._scale is not None:
+            buffer.mul_(self._scale)
+        return buffer
+
+    def bind(self, buffer: torch.Tensor):
+        """Assemble into ``buffer`` (N, obs_dim) from now on, written in place (a view of a larger tensor works)."""
+        if tuple(buffer.shape) != (self.num_envs, self.obs_dim):
+            raise ValueError(f"Observation buffer must have shape {(self.num_envs, self.obs_dim)}, got {tuple(buffer.shape)}.")
+        self._buffer = buffer
+
+    def reset(self, env_ids=None):
+        for term in self._class_terms:
+            term.reset(env_ids=env_ids)
+
+    @property
+    def group_obs_dim(self) -> tuple[int]:
+        return (self.obs_dim,)
+
+    """
+    Internal helpers.
+    """
+
+    def _resolve_term(self, term_name: str, term_cfg: ObsTerm):
+        if term_cfg.modifiers is not None:
+            raise ValueError(f"NPCObsAssembler does not support modifiers (term '{term_name}').")
+        if term_cfg.history_length is not None and term_cfg.history_length > 0:
+            raise ValueError(f"NPCObsAssembler does not support observation history (term '{term_name}').")
+        if term_cfg.noise is not None and self.cfg.enable_corruption:
+            if not isinstance(term_cfg.noise, noise.NoiseCfg) or isinstance(term_cfg.noise, noise.NoiseModelCfg):
+                raise ValueError(f"NPCObsAssembler does not support noise models (term '{term_name}').")
+            if term_cfg.noise.operation != "add":
+                raise ValueError(f"NPCObsAssembler only supports additive noise (term '{term_name}').")
+
+        for value in term_cfg.params.values():
+            if isinstance(value, SceneEntityCfg):
+                value.resolve(self._env.scene)
+        if inspect.isclass(term_cfg.func):
+            term_cfg.func = term_cfg.func(cfg=term_cfg, env=self._env)
+            self._class_terms.append(term_cfg.func)
+
+        self.term_names.append(term_name)
+        self._term_cfgs.append(term_cfg)
+        self._row_terms.append(has_param(term_cfg.func, "env_ids"))
+
+    def _evaluate_term(self, term_cfg: ObsTerm, env_ids: torch.Tensor | None = None) -> torch.Tensor:
+        if env_ids is None:
+            return term_cfg.func(self._env, **term_cfg.params).reshape(self.num_envs, -1)
+        return term_cfg.func(self._env, env_ids=env_ids, **term_cfg.params).reshape(env_ids.shape[0], -1)
+
+    def _build_post_processing(self, cfg: ObservationGroupCfg):
+        """Flatten the per-term noise, clip and scale settings into (obs_dim,) vectors."""
+        inf = float("inf")
+        uniform_span = torch.zeros(self.obs_dim, device=self.device)
+        gaussian_std = torch.zeros(self.obs_dim, device=self.device)
+        noise_offset = torch.zeros(self.obs_dim, device=self.device)
+        clip_min = torch.full((self.obs_dim,), -inf, device=self.device)
+        clip_max = torch.full((self.obs_dim,), inf, device=self.device)
+        scale = torch.ones(self.obs_dim, device=self.device)
+        has_uniform = has_gaussian = has_offset = has_clip = has_scale = False
+
+        for term_cfg, term_slice in zip(self._term_cfgs, self.term_slices.values()):
+            term_noise = term_cfg.noise if cfg.enable_corruption else None
+            if isinstance(term_noise, noise.UniformNoiseCfg):
+                uniform_span[term_slice] = torch.as_tensor(term_noise.n_max - term_noise.n_min, device=self.device)
+                noise_offset[term_slice] += torch.as_tensor(term_noise.n_min, device=self.device)
+                has_uniform = has_offset = True
+            elif isinstance(term_noise, noise.GaussianNoiseCfg):
+                gaussian_std[term_slice] = torch.as_tensor(term_noise.std, device=self.device)
+                noise_offset[term_slice] += torch.as_tensor(term_noise.mean, device=self.device)
+                has_gaussian = has_offset = True
+            elif isinstance(term_noise, noise.ConstantNoiseCfg):
+                noise_offset[term_slice] += torch.as_tensor(term_noise.bias, device=self.device)
+                has_offset = True
+            if term_cfg.clip:
+                clip_min[term_slice] = term_cfg.clip[0]
+                clip_max[term_slice] = term_cfg.clip[1]
+                has_clip = True
+            if term_cfg.scale is not None:
+                scale[term_slice] = torch.as_tensor(term_cfg.scale, dtype=torch.float32, device=self.device)
+                has_scale = True
+
+        self._uniform_span = uniform_span if has_uniform else None
+        self._gaussian_std = gaussian_std if has_gaussian else None
+        self._noise_offset = noise_offset if has_offset else None
+        self._clip_min, self._clip_max = (clip_min, clip_max) if has_clip else (None, None)
+        self._scale = scale if has_scale else None
+        if has_uniform or has_gaussian:
+            self._noise_buf = torch.empty(self.num_envs, self.obs_dim, device=self.device)
@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import torch
+from typing import Sequence
+
+HISTORY_LAYOUTS = ("frame", "term")
+
+
+class NPCObsHistory:
+    """
+    Ring buffer history of the low level observations, (N, 2H, D) with mirrored writes.
+
+    Each :meth:`push` writes the new frame at the rolling index ``i`` and again at ``i + H``, so the
+    last H frames, oldest first, are always the contiguous window ``[i + 1, i + 1 + H)`` of every
+    row. The policy input is then a strided (N, H * D) view of the buffer (row stride 2 * H * D):
+    nothing is shifted or concatenated, the cost per step is two row writes of D values.
+
+    Layouts of the returned history:
+
+    * ``"frame"``: frame major, ``[o_{t-H+1}, ..., o_t]`` with each ``o`` the full observation
+      vector, the zero-copy view.
+    * ``"term"``: term major like Isaac Lab group histories (``history_length`` on the group,
+      flattened), ``[term_1 over H frames, term_2 over H frames, ...]``. The window is reordered
+      with one precomputed gather into a persistent (N, H * D) buffer.
+
+    Reset rows are filled with their first frame after the reset, as Isaac Lab's circular buffers do.
+    """
+
+    def __init__(self, num_envs: int, obs_dim: int, history_length: int, device: str | torch.device = "cpu",
+                 layout: str = "frame", term_dims: Sequence[int] | None = None):
+        if history_length < 1:
+            raise ValueError(f"History length must be at least 1, got {history_length}.")
+        if layout not in HISTORY_LAYOUTS:
+            raise ValueError(f"Unknown history layout '{layout}', expected one of {HISTORY_LAYOUTS}.")
+        self.num_envs = num_envs
+        self.obs_dim = obs_dim
+        self.history_length = history_length
+        self.device = device
+        self.layout = layout
+        self._buffer = torch.zeros(num_envs, 2 * history_length, obs_dim, device=device)
+        self._index = history_length - 1
+        # rows to fill with their next frame: all of them before the first push
+        self._fill_all = True
+        self._fill_ids: list[torch.Tensor] = []
+
+        self._term_index = None
+        if layout == "term":
+            if term_dims is None or sum(term_dims) != obs_dim:
+                raise ValueError(f"The 'term' history layout needs term dims summing to {obs_dim}, got {term_dims}.")
+            # flat window position (frame * D + column) of every output column
+            columns, start = [], 0
+            for dim in term_dims:
+                for frame in range(history_length):
+                    columns.append(torch.arange(start, start + dim) + frame * obs_dim)
+                start += dim
+            self._term_index = torch.cat(columns).to(device)
+            self._term_buf = torch.zeros(num_envs, history_length * obs_dim, device=device)
+
+    @property
+    def history_dim(self) -> int:
+        return self.history_length * self.obs_dim
+
+    def push(self, frame: torch.Tensor) -> torch.Tensor:
+        """
+        Append one (N, D) frame and return the (N, H * D) history in the configured layout.
+
+        The returned tensor is a view of (or the buffer behind) the history, overwritten by the next push.
+        """
+        H = self.history_length
+        self._index = (self._index + 1) % H
+        buffer = self._buffer
+        if self._fill_all:
+            buffer.copy_(frame.unsqueeze(1).expand_as(buffer))
+            self._fill_all = False
+            self._fill_ids.clear()
+        else:
+            buffer[:, self._index] = frame
+            buffer[:, self._index + H] = frame
+            if self._fill_ids:
+                ids = torch.cat(self._fill_ids) if len(self._fill_ids) > 1 else self._fill_ids[0]
+                buffer[ids] = frame[ids].unsqueeze(1).expand(-1, 2 * H, -1)
+                self._fill_ids.clear()
+        return self.history()
+
+    def history(self) -> torch.Tensor:
+        H = self.history_length
+        start = self._index + 1
+        window = self._buffer[:, start:start + H].flatten(1)   # view, row stride 2 * H * D
+        if self._term_index is None:
+            return window
+        return torch.index_select(window, 1, self._term_index, out=self._term_buf)
+
+    def frames(self) -> torch.Tensor:
+        """(N, H, D) view of the last H frames, oldest first."""
+        start = self._index + 1
+        return self._buffer[:, start:start + self.history_length]
+
+    def reset(self, env_ids=None):
+        """Only ``env_ids`` rows are refilled, from their first frame after the reset."""
+        if env_ids is None:
+            self._fill_all = True
+            self._fill_ids.clear()
+        elif not self._fill_all:
+            self._fill_ids.append(torch.as_tensor(env_ids, dtype=torch.long, device=self.device).reshape(-1))
+
+    def __repr__(self) -> str:
+        return (f"NPCObsHistory(envs={self.num_envs}, obs_dim={self.obs_dim}, history={self.history_length}, "
+                f"layout={self.layout!r})")
@@ -10,11 +10,11 @@ from isaaclab.managers import ActionTerm, ActionTermCfg, ObservationGroupCfg, Ob
 from isaaclab.markers import VisualizationMarkers
 from isaaclab.markers.config import BLUE_ARROW_X_MARKER_CFG, GREEN_ARROW_X_MARKER_CFG
 from isaaclab.utils import configclass
-from isaaclab.utils.assets import check_file_path, read_file
 
 from isaaclab.managers import SceneEntityCfg
 from isaaclab.managers import ObservationTermCfg as ObsTerm
 from IsaacNPC.utils.func_tools import has_param
+from IsaacNPC.utils.policy_registry import load_policy
 
 if TYPE_CHECKING:
     from isaaclab.envs import ManagerBasedRLEnv
@@ -38,10 +38,7 @@ class PreTrainedVelPolicyAction(ActionTerm):
         self.robot: Articulation = env.scene[cfg.asset_name]
 
         # load policy
-        if not check_file_path(cfg.policy_path):
-            raise FileNotFoundError(f"Policy file '{cfg.policy_path}' does not exist.")
-        file_bytes = read_file(cfg.policy_path)
-        self.policy = torch.jit.load(file_bytes).to(env.device).eval()
+        self.policy = load_policy(cfg.policy_path, env.device)
 
         self._raw_actions = torch.zeros(self.num_envs, self.action_dim, device=self.device)
 
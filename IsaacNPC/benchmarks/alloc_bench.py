@@ -0,0 +1,149 @@
+"""Tensor allocations per low level step of the NPC velocity terms, with and without ``static_buffers``.
+
+Steps ``NPCActionVel`` / ``NPCActionRoutine`` on the stand-in env (see
+:mod:`IsaacNPC.benchmarks.npc_suite_bench`) and counts the allocations of one low level step
+(``low_level_decimation`` x ``apply_actions``) with :class:`IsaacNPC.utils.alloc_tools.AllocationCounter`.
+With static buffers the step is also split into what the NPC term does itself and the code it
+calls into: the observation term functions, the policy forward and the low level action term
+(Isaac Lab and TorchScript code), each counted on its own. The NPC side (assembly, command and
+planner, action buffers, last action) is counted directly: the same step runs again with the
+external calls wrapped in an ``npc_external`` profiler scope that the counter excludes.
+:func:`check_static_allocations` asserts that it allocates nothing in steady state.
+
+The counter runs the step under the profiler, counts are ops that allocated.
+
+    python -m IsaacNPC.benchmarks.alloc_bench --sizes 256 4096
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import tempfile
+
+import torch
+
+from IsaacNPC.benchmarks.npc_suite_bench import _Assets, make_term_cfg, run_metadata
+from IsaacNPC.benchmarks.standin import StandInEnv, install_isaaclab_standins
+from IsaacNPC.utils.alloc_tools import AllocationCounter, allocation_scope
+
+ALLOC_TERMS = ("vel", "routine")
+
+
+EXTERNAL_SCOPE = "npc_external"
+
+
+def _count(fn, device: str, exclude: tuple[str, ...] = ()) -> tuple[int, int]:
+    with torch.inference_mode(), AllocationCounter(device, exclude) as counter:
+        fn()
+    return counter.count, counter.bytes
+
+
+def _external_obs_terms(term) -> list:
+    """Observation terms computed by Isaac Lab functions, i.e. not the command / last action of the NPC term."""
+    obs_cfg = term.cfg.low_level_observations
+    own_terms = {id(obs_cfg.velocity_commands)} | {
+        id(getattr(obs_cfg, name)) for name in ("actions", "last_action") if hasattr(obs_cfg, name)
+    }
+    return [cfg for cfg in term._low_level_obs_manager._term_cfgs if id(cfg) not in own_terms]
+
+
+def _scope_external_calls(term):
+    """Run the observation term functions, the policy and the low level action term inside ``EXTERNAL_SCOPE``."""
+    for cfg in _external_obs_terms(term):
+        cfg.func = allocation_scope(cfg.func, f"{EXTERNAL_SCOPE}/obs")
+    term.policy = allocation_scope(term.policy, f"{EXTERNAL_SCOPE}/policy")
+    low_level_term = term._low_level_action_term
+    low_level_term.process_actions = allocation_scope(low_level_term.process_actions, f"{EXTERNAL_SCOPE}/action_term")
+    low_level_term.apply_actions = allocation_scope(low_level_term.apply_actions, f"{EXTERNAL_SCOPE}/action_term")
+
+
+def _external_parts(term, device: str) -> dict[str, int]:
+    """Allocations of the code the static NPC step calls into, one low level step worth."""
+    assembler = term._low_level_obs_manager
+    obs_terms = _external_obs_terms(term)
+    low_level_term = term._low_level_action_term
+    obs = assembler.compute().clone()
+
+    def apply_low_level():
+        low_level_term.process_actions(term.low_level_actions)
+        for _ in range(term.cfg.low_level_decimation):
+            low_level_term.apply_actions()
+
+    return {
+        "obs_terms": _count(lambda: [cfg.func(term._env, **cfg.params) for cfg in obs_terms], device)[0],
+        "policy": _count(lambda: term.policy(obs), device)[0],
+        "action_term": _count(apply_low_level, device)[0],
+    }
+
+
+def bench_allocations(kind: str, num_envs: int, static: bool, assets: _Assets, device: str = "cpu") -> dict:
+    env = StandInEnv(num_envs, device=device)
+    env.scene.add_articulation("npc")
+    term = env.add_action_term("npc", make_term_cfg(kind, "npc", assets, static_buffers=static))
+    env.reset()
+    for _ in range(3):
+        env.step()
+
+    def low_level_step():
+        # from the policy tick to the next one
+        term._counter = 0
+        for _ in range(term.cfg.low_level_decimation):
+            term.apply_actions()
+
+    count, num_bytes = _count(low_level_step, device)
+    row = {"term": kind, "num_envs": num_envs, "static_buffers": static, "allocs": count, "bytes": num_bytes}
+    if static:
+        row.update(_external_parts(term, device))
+        # one extra planner step, the routine pointers may advance
+        row["command"] = _count(term.vel_command, device)[0]
+        _scope_external_calls(term)
+        row["npc_allocs"], row["npc_bytes"] = _count(low_level_step, device, exclude=(EXTERNAL_SCOPE,))
+    return row
+
+
+def check_static_allocations(results):
+    """Raises ``AssertionError`` if the NPC side of a static buffers step allocated."""
+    for row in results:
+        if row["static_buffers"] and (row["npc_allocs"] != 0 or row["command"] != 0):
+            raise AssertionError(
+                f"Static buffers step of '{row['term']}' at {row['num_envs']} envs allocated on the NPC side: "
+                f"{row['npc_allocs']} ops ({row['npc_bytes']} bytes), command {row['command']}."
+            )
+
+
+def run(sizes=(256, 4096), terms=ALLOC_TERMS, device: str = "cpu") -> list[dict]:
+    install_isaaclab_standins()
+    results = []
+    with tempfile.TemporaryDirectory(prefix="npc_alloc_") as directory:
+        assets = _Assets(directory)
+        for kind in terms:
+            for num_envs in sizes:
+                for static in (False, True):
+                    results.append(bench_allocations(kind, num_envs, static, assets, device))
+    return results
+
+
+def format_table(results) -> str:
+    columns = ("allocs", "obs_terms", "command", "policy", "action_term", "npc_allocs")
+    lines = [f"{'term':<10}{'num_envs':>10}{'static':>8}" + "".join(f"{name:>13}" for name in columns)]
+    for row in results:
+        lines.append(f"{row['term']:<10}{row['num_envs']:>10}{str(row['static_buffers']):>8}"
+                     + "".join(f"{row.get(name, '-'):>13}" for name in columns))
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[256, 4096])
+    parser.add_argument("--terms", type=str, nargs="+", default=list(ALLOC_TERMS), choices=ALLOC_TERMS)
+    parser.add_argument("--device", type=str, default="cpu")
+    parser.add_argument("--json", type=str, default=None, help="Optional path to dump the results and run metadata as JSON.")
+    args = parser.parse_args()
+
+    results = run(args.sizes, args.terms, args.device)
+    print(format_table(results))
+    check_static_allocations(results)
+    if args.json is not None:
+        with open(args.json, "w") as f:
+            json.dump({"meta": run_metadata(args.device), "results": results}, f, indent=2)
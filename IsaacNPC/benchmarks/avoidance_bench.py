@@ -0,0 +1,97 @@
+"""Scaling benchmark of the NPC-NPC avoidance layer.
+
+Times the spatial hash build, the neighbor query and the full social force correction for growing
+agent counts, spread over envs of ``agents_per_env`` NPCs. The dense all-pairs baseline is only run
+up to ``--dense_max`` agents.
+
+    python -m IsaacNPC.benchmarks.avoidance_bench --sizes 1000 10000 100000
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import time
+
+import torch
+
+from IsaacNPC.planner.avoidance import SocialForceAvoidance, SpatialHash
+
+
+def dense_neighbors(pos, group, radius):
+    """All-pairs baseline, O(N^2) memory and time."""
+    dist = torch.cdist(pos, pos)
+    mask = (dist < radius) & (group.unsqueeze(0) == group.unsqueeze(1))
+    mask.fill_diagonal_(False)
+    return mask
+
+
+def _make_inputs(num_agents: int, agents_per_env: int, device: str, seed: int = 0):
+    generator = torch.Generator(device=device).manual_seed(seed)
+    num_envs = max(1, num_agents // agents_per_env)
+    # keep the crowd density fixed, ~1 agent per 2 m^2 in every env
+    side = math.sqrt(2.0 * agents_per_env)
+    pos = torch.rand(num_agents, 2, generator=generator, device=device) * side
+    vel = (torch.rand(num_agents, 2, generator=generator, device=device) - 0.5)
+    yaw = (torch.rand(num_agents, generator=generator, device=device) - 0.5) * 6.28
+    cmd = torch.zeros(num_agents, 3, device=device)
+    cmd[:, 0] = 0.5
+    group = torch.arange(num_agents, device=device) % num_envs
+    return pos, vel, yaw, cmd, group
+
+
+def _time(fn, num_iters: int) -> float:
+    for _ in range(3):
+        fn()
+    start = time.perf_counter()
+    for _ in range(num_iters):
+        fn()
+    return (time.perf_counter() - start) / num_iters * 1e3
+
+
+def run(sizes=(1_000, 10_000, 100_000), agents_per_env: int = 64, num_iters: int = 20, dense_max: int = 10_000,
+        device: str = "cpu"):
+    results = []
+    for num_agents in sizes:
+        pos, vel, yaw, cmd, group = _make_inputs(num_agents, agents_per_env, device)
+        avoidance = SocialForceAvoidance()
+        spatial_hash = SpatialHash(avoidance.influence_range)
+        spatial_hash.build(pos, group)
+        row = {"num_agents": num_agents}
+        row["build_ms"] = _time(lambda: spatial_hash.build(pos, group), num_iters)
+        row["max_occupancy"] = spatial_hash.max_occupancy
+        row["overflow"] = spatial_hash.num_overflow
+        row["query_ms"] = _time(lambda: spatial_hash.neighbors(pos, avoidance.influence_range, group), num_iters)
+        row["avoid_ms"] = _time(lambda: avoidance.adjust(cmd, yaw, pos, vel, group), num_iters)
+        if num_agents <= dense_max:
+            row["dense_ms"] = _time(lambda: dense_neighbors(pos, group, avoidance.influence_range), num_iters)
+        else:
+            row["dense_ms"] = float("nan")
+        results.append(row)
+    return results
+
+
+def format_table(results) -> str:
+    keys = list(results[0].keys())
+    lines = ["".join(f"{key:>14}" for key in keys)]
+    for row in results:
+        lines.append("".join(f"{row[key]:>14.3f}" if isinstance(row[key], float) else f"{row[key]:>14}" for key in keys))
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--agents_per_env", type=int, default=64)
+    parser.add_argument("--num_iters", type=int, default=20)
+    parser.add_argument("--dense_max", type=int, default=10_000)
+    parser.add_argument("--device", type=str, default="cpu")
+    parser.add_argument("--json", type=str, default=None, help="Optional path to dump the results as JSON.")
+    args = parser.parse_args()
+
+    results = run(args.sizes, args.agents_per_env, args.num_iters, args.dense_max, args.device)
+    print(format_table(results))
+    if args.json is not None:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
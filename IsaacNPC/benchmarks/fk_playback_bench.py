@@ -0,0 +1,134 @@
+"""Micro-benchmark of the FK playback gather.
+
+Compares the previous ``NPCActionFK.write_to_sim`` gathers (clone of the default root state, four
+body field gathers, two joint gathers) with the packed (T, 13) root / (T, 2 * J) joint tables
+gathered into persistent buffers, and with the quantized tables decoded at gather time. Only the
+tensor work is timed, not the simulator writes.
+
+    python -m IsaacNPC.benchmarks.fk_playback_bench --sizes 1000 10000 100000
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import time
+
+import torch
+
+from IsaacNPC.motion.quantization import PackedFieldTable, QuantizedField, QUANTIZED_KINDS
+
+
+def _make_motion(num_frames: int, num_bodies: int, num_joints: int, device: str, seed: int = 0):
+    generator = torch.Generator(device=device).manual_seed(seed)
+
+    def rand(*shape):
+        return torch.rand(*shape, generator=generator, device=device)
+
+    motion = {
+        "body_pos_w": rand(num_frames, num_bodies, 3),
+        "body_quat_w": rand(num_frames, num_bodies, 4),
+        "body_lin_vel_w": rand(num_frames, num_bodies, 3),
+        "body_ang_vel_w": rand(num_frames, num_bodies, 3),
+        "joint_pos": rand(num_frames, num_joints),
+        "joint_vel": rand(num_frames, num_joints),
+    }
+    root_table = torch.cat([motion[key][:, 0] for key in ("body_pos_w", "body_quat_w", "body_lin_vel_w", "body_ang_vel_w")], dim=1)
+    joint_table = torch.cat([motion["joint_pos"], motion["joint_vel"]], dim=1)
+    return motion, root_table.contiguous(), joint_table.contiguous()
+
+
+def legacy_gather(motion, default_root_state, env_origins, time_steps):
+    root_states = default_root_state.clone()
+    root_states[:, :3] = motion["body_pos_w"][time_steps][:, 0] + env_origins
+    root_states[:, 3:7] = motion["body_quat_w"][time_steps][:, 0]
+    root_states[:, 7:10] = motion["body_lin_vel_w"][time_steps][:, 0]
+    root_states[:, 10:] = motion["body_ang_vel_w"][time_steps][:, 0]
+    return root_states, motion["joint_pos"][time_steps], motion["joint_vel"][time_steps]
+
+
+def packed_gather(root_table, joint_table, env_origins, time_steps, root_buf, joint_buf):
+    torch.index_select(root_table, 0, time_steps, out=root_buf)
+    torch.index_select(joint_table, 0, time_steps, out=joint_buf)
+    root_buf[:, :3] += env_origins
+    num_joints = joint_buf.shape[1] // 2
+    return root_buf, joint_buf[:, :num_joints], joint_buf[:, num_joints:]
+
+
+def quantized_tables(motion):
+    fields = {key: QuantizedField(value, QUANTIZED_KINDS[key]) for key, value in motion.items()}
+    root_table = PackedFieldTable([(fields[key], 0) for key in ("body_pos_w", "body_quat_w", "body_lin_vel_w", "body_ang_vel_w")])
+    joint_table = PackedFieldTable([(fields["joint_pos"], None), (fields["joint_vel"], None)])
+    return root_table, joint_table
+
+
+def quantized_gather(root_table, joint_table, env_origins, time_steps, root_buf, joint_buf):
+    root_table.index_select(time_steps, root_buf)
+    joint_table.index_select(time_steps, joint_buf)
+    root_buf[:, :3] += env_origins
+    num_joints = joint_buf.shape[1] // 2
+    return root_buf, joint_buf[:, :num_joints], joint_buf[:, num_joints:]
+
+
+def _time(fn, num_iters: int) -> float:
+    for _ in range(3):
+        fn()
+    start = time.perf_counter()
+    for _ in range(num_iters):
+        fn()
+    return (time.perf_counter() - start) / num_iters * 1e3
+
+
+def run(sizes=(1_000, 10_000, 100_000), num_frames: int = 10_000, num_bodies: int = 14, num_joints: int = 29,
+        num_iters: int = 50, device: str = "cpu"):
+    motion, root_table, joint_table = _make_motion(num_frames, num_bodies, num_joints, device)
+    quant_root, quant_joint = quantized_tables(motion)
+    results = []
+    for num_envs in sizes:
+        time_steps = torch.randint(0, num_frames, (num_envs,), device=device)
+        env_origins = torch.rand(num_envs, 3, device=device)
+        default_root_state = torch.zeros(num_envs, 13, device=device)
+        root_buf = torch.zeros(num_envs, 13, device=device)
+        joint_buf = torch.zeros(num_envs, 2 * num_joints, device=device)
+
+        legacy = legacy_gather(motion, default_root_state, env_origins, time_steps)
+        packed = packed_gather(root_table, joint_table, env_origins, time_steps, root_buf, joint_buf)
+        for a, b in zip(legacy, packed):
+            assert torch.allclose(a, b), "packed playback differs from the legacy gather"
+
+        row = {"num_envs": num_envs}
+        row["legacy_ms"] = _time(lambda: legacy_gather(motion, default_root_state, env_origins, time_steps), num_iters)
+        row["packed_ms"] = _time(
+            lambda: packed_gather(root_table, joint_table, env_origins, time_steps, root_buf, joint_buf), num_iters
+        )
+        row["quantized_ms"] = _time(
+            lambda: quantized_gather(quant_root, quant_joint, env_origins, time_steps, root_buf, joint_buf), num_iters
+        )
+        row["speedup"] = row["legacy_ms"] / row["packed_ms"]
+        results.append(row)
+    return results
+
+
+def format_table(results) -> str:
+    keys = list(results[0].keys())
+    lines = ["".join(f"{key:>14}" for key in keys)]
+    for row in results:
+        lines.append("".join(f"{row[key]:>14.3f}" if isinstance(row[key], float) else f"{row[key]:>14}" for key in keys))
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--num_frames", type=int, default=10_000)
+    parser.add_argument("--num_bodies", type=int, default=14)
+    parser.add_argument("--num_iters", type=int, default=50)
+    parser.add_argument("--device", type=str, default="cpu")
+    parser.add_argument("--json", type=str, default=None, help="Optional path to dump the results as JSON.")
+    args = parser.parse_args()
+
+    results = run(args.sizes, args.num_frames, args.num_bodies, num_iters=args.num_iters, device=args.device)
+    print(format_table(results))
+    if args.json is not None:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
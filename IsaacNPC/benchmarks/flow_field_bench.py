@@ -0,0 +1,92 @@
+"""CPU micro-benchmark of the flow field planner, with a corner cutting check of the fields.
+
+Times the field build (distance relaxation + direction field) on random occupancy grids and the
+batched command lookup for growing agent counts. Before timing, :func:`check_corner_cutting`
+verifies on a small grid that no direction crosses the corner of a blocked cell.
+
+    python -m IsaacNPC.benchmarks.flow_field_bench --grids 64 128 --sizes 1000 100000
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import time
+
+import torch
+
+from IsaacNPC.planner.flow_field import FlowFieldPlanner
+
+
+def check_corner_cutting(device: str = "cpu"):
+    """
+    Wall ``occ[2, 0:3]`` on a 5x5 grid with the goal in the top-left cell: cell (2, 3) at the wall
+    end must not point to (3, 2) and cell (1, 2) below it must not aim at (2, 3), both diagonals
+    cross the blocked corner (2, 2). Raises ``AssertionError`` otherwise.
+    """
+    occupancy = torch.zeros(5, 5, dtype=torch.bool)
+    occupancy[2, 0:3] = True
+    planner = FlowFieldPlanner(occupancy, 1.0, goals=[(0.5, 4.5)], device=device)
+    planner.update()
+    field = planner.direction_field.view(5, 5, 2).cpu()
+    diagonal = 1.0 / math.sqrt(2.0)
+    # directions are (x, y) = (d_col, d_row)
+    for (row, col), (d_col, d_row) in (((2, 3), (-1, 1)), ((1, 2), (1, 1))):
+        cut = torch.tensor([d_col * diagonal, d_row * diagonal])
+        if torch.allclose(field[row, col], cut):
+            raise AssertionError(f"Flow field cell ({row}, {col}) cuts the corner of blocked cell (2, 2).")
+    # every free cell still has a way to the goal
+    assert torch.isfinite(planner.distance_field[0][~occupancy]).all()
+
+
+def _random_grid(size: int, density: float, seed: int = 0) -> torch.Tensor:
+    generator = torch.Generator().manual_seed(seed)
+    occupancy = torch.rand(size, size, generator=generator) < density
+    occupancy[:, 0] = False   # free goal column
+    return occupancy
+
+
+def run(grids=(64, 128), sizes=(1_000, 100_000), num_goals: int = 4, density: float = 0.2,
+        num_iters: int = 20, device: str = "cpu") -> list[dict]:
+    check_corner_cutting(device)
+    results = []
+    for grid in grids:
+        occupancy = _random_grid(grid, density)
+        goals = [(0.5, (i + 0.5) * grid / num_goals) for i in range(num_goals)]
+        planner = FlowFieldPlanner(occupancy, 1.0, goals=goals, device=device)
+        start = time.perf_counter()
+        planner.update()
+        build_ms = (time.perf_counter() - start) * 1e3
+        for num_agents in sizes:
+            generator = torch.Generator(device=device).manual_seed(0)
+            pos = torch.rand(num_agents, 2, generator=generator, device=device) * grid
+            yaw = (torch.rand(num_agents, generator=generator, device=device) - 0.5) * 6.28
+            goal_ids = torch.randint(0, num_goals, (num_agents,), generator=generator, device=device)
+            for _ in range(3):
+                planner.compute_cmd(pos, yaw, goal_ids)
+            start = time.perf_counter()
+            for _ in range(num_iters):
+                planner.compute_cmd(pos, yaw, goal_ids)
+            cmd_ms = (time.perf_counter() - start) / num_iters * 1e3
+            results.append({"grid": grid, "num_agents": num_agents, "build_ms": build_ms, "cmd_ms": cmd_ms})
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--grids", type=int, nargs="+", default=[64, 128])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 100_000])
+    parser.add_argument("--num_goals", type=int, default=4)
+    parser.add_argument("--num_iters", type=int, default=20)
+    parser.add_argument("--device", type=str, default="cpu")
+    parser.add_argument("--json", type=str, default=None, help="Optional path to dump the results as JSON.")
+    args = parser.parse_args()
+
+    results = run(args.grids, args.sizes, args.num_goals, num_iters=args.num_iters, device=args.device)
+    print(f"{'grid':>8}{'num_agents':>12}{'build_ms':>12}{'cmd_ms':>10}")
+    for row in results:
+        print(f"{row['grid']:>8}{row['num_agents']:>12}{row['build_ms']:>12.2f}{row['cmd_ms']:>10.3f}")
+    if args.json is not None:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
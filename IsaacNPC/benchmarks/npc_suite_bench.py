@@ -0,0 +1,273 @@
+"""Headless benchmark suite of the NPC action terms on the stand-in env.
+
+Drives ``NPCActionVel``, ``NPCActionRoutine``, ``NPCActionGroupRoutine`` (one term over all the NPCs of
+an env), ``NPCActionKinematic``, ``NPCActionMimic`` and ``NPCActionFK`` through the
+Isaac Lab step loop (``process_actions``, then ``decimation`` x ``apply_actions`` + scene update) on
+:class:`IsaacNPC.benchmarks.standin.StandInEnv`, plus the bare ``BatchVelocityPlanner`` routine
+step, over sweeps of env counts and NPCs per env. No simulator is launched: the scene is plain torch
+tensors, the policies are random TorchScript MLPs of the G1 sizes and the clips synthetic, so the
+numbers measure the NPC code paths only.
+
+Every row reports the env step latency (mean / p50 / p99, ms) and the throughput in NPC steps per
+second. ``--json`` writes the rows together with the run metadata for regression tracking.
+
+    python -m IsaacNPC.benchmarks.npc_suite_bench --sizes 256 1024 4096 --npc_counts 1 4 --json npc_suite.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import tempfile
+import time
+
+import numpy as np
+import torch
+
+from IsaacNPC.benchmarks.standin import G1_BODY_NAMES, StandInEnv, install_isaaclab_standins
+
+SUITE_TERMS = ("vel", "routine", "group", "kinematic", "mimic", "fk", "planner")
+VEL_OBS_DIM = 99
+MIMIC_OBS_DIM = 154
+NUM_JOINTS = 29
+
+
+def make_policy(path: str, obs_dim: int, action_dim: int = NUM_JOINTS, hidden=(256, 128), seed: int = 0) -> str:
+    """Random TorchScript MLP with the layout of the G1 low level policies."""
+    torch.manual_seed(seed)
+    layers, last = [], obs_dim
+    for width in hidden:
+        layers += [torch.nn.Linear(last, width), torch.nn.ELU()]
+        last = width
+    layers.append(torch.nn.Linear(last, action_dim))
+    torch.jit.save(torch.jit.script(torch.nn.Sequential(*layers).eval()), path)
+    return path
+
+
+def make_motion_clip(path: str, num_frames: int = 2000, num_bodies: int = len(G1_BODY_NAMES),
+                     num_joints: int = NUM_JOINTS, fps: int = 50, seed: int = 0) -> str:
+    """Synthetic clip in the beyondMimic ``.npz`` layout: a walk forward with oscillating joints."""
+    rng = np.random.default_rng(seed)
+    t = np.arange(num_frames, dtype=np.float32) / fps
+    phase = rng.uniform(0.0, 2 * np.pi, size=num_joints).astype(np.float32)
+    body_pos = np.zeros((num_frames, num_bodies, 3), dtype=np.float32)
+    body_pos[..., 0] = 0.5 * t[:, None]
+    body_pos[..., 2] = 0.8 + np.linspace(0.0, 0.6, num_bodies, dtype=np.float32)
+    body_quat = np.zeros((num_frames, num_bodies, 4), dtype=np.float32)
+    body_quat[..., 0] = 1.0
+    body_lin_vel = np.zeros_like(body_pos)
+    body_lin_vel[..., 0] = 0.5
+    np.savez(
+        path,
+        fps=np.array([fps]),
+        joint_pos=0.3 * np.sin(2 * np.pi * t[:, None] + phase),
+        joint_vel=0.6 * np.pi * np.cos(2 * np.pi * t[:, None] + phase),
+        body_pos_w=body_pos,
+        body_quat_w=body_quat,
+        body_lin_vel_w=body_lin_vel,
+        body_ang_vel_w=np.zeros_like(body_pos),
+    )
+    return path
+
+
+class _Assets:
+    """Policies and clips shared by every run of the suite, written once to a temporary directory."""
+
+    def __init__(self, directory: str):
+        self.vel_policy = make_policy(os.path.join(directory, "vel_policy.pt"), VEL_OBS_DIM)
+        self.mimic_policy = make_policy(os.path.join(directory, "mimic_policy.pt"), MIMIC_OBS_DIM)
+        self.motion_file = make_motion_clip(os.path.join(directory, "clip.npz"))
+
+
+def _mimic_obs_cfg():
+    from isaaclab.envs import mdp
+    from isaaclab.managers import ObservationGroupCfg as ObsGroup
+    from isaaclab.managers import ObservationTermCfg as ObsTerm
+    from isaaclab.utils import configclass
+
+    @configclass
+    class MimicPolicyCfg(ObsGroup):
+        command = ObsTerm(func=mdp.generated_commands, params={"command_name": "motion"})
+        motion_anchor_ori_b = ObsTerm(func=mdp.generated_commands, params={"command_name": "motion"})
+        base_ang_vel = ObsTerm(func=mdp.base_ang_vel)
+        joint_pos_rel = ObsTerm(func=mdp.joint_pos_rel)
+        joint_vel_rel = ObsTerm(func=mdp.joint_vel_rel)
+        actions = ObsTerm(func=mdp.last_action)
+
+    return MimicPolicyCfg()
+
+
+def make_term_cfg(kind: str, asset_name: str, assets: _Assets, **overrides):
+    """Action term config of ``kind`` bound to ``asset_name``, G1 template settings."""
+    from isaaclab.envs import mdp
+
+    from IsaacNPC.action.npc_action.npc_action_fk import NPCActionFKCfg
+    from IsaacNPC.action.npc_action.npc_action_group import NPCActionGroupRoutineCfg
+    from IsaacNPC.action.npc_action.npc_action_mimic import NPCActionMimicCfg
+    from IsaacNPC.action.npc_action.npc_action_vel import NPCActionKinematicCfg, NPCActionRoutineCfg, NPCActionVelCfg
+    from IsaacNPC.template.g1.npc_zero_vel_policy_cfg import G1NPCVelPolicyActionsCfg
+
+    def joint_actions():
+        return mdp.JointPositionActionCfg(asset_name=asset_name, joint_names=[".*"], scale=0.25, use_default_offset=True)
+
+    if kind == "vel":
+        cfg = NPCActionVelCfg(
+            asset_name=asset_name, policy_path=assets.vel_policy,
+            low_level_observations=G1NPCVelPolicyActionsCfg.PolicyCfg(), low_level_actions=joint_actions(),
+        )
+    elif kind == "routine":
+        cfg = NPCActionRoutineCfg(
+            asset_name=asset_name, policy_path=assets.vel_policy,
+            low_level_observations=G1NPCVelPolicyActionsCfg.PolicyCfg(), low_level_actions=joint_actions(),
+            routine_points=[(0, 0, 3.14 * 0.75), (6, 0, 3.14 * 0.75), (6, 6, 3.14 / 4), (0, 0, 0)],
+            max_lin_vel=0.8, max_yaw_vel=1.0, pos_tol=0.5, yaw_tol=0.2,
+        )
+    elif kind == "group":
+        # ``asset_names`` lists the whole group, see bench_term
+        cfg = NPCActionGroupRoutineCfg(
+            asset_names=[asset_name], policy_path=assets.vel_policy,
+            low_level_observations=G1NPCVelPolicyActionsCfg.PolicyCfg(), low_level_actions=joint_actions(),
+            routine_points=[(0, 0, 3.14 * 0.75), (6, 0, 3.14 * 0.75), (6, 6, 3.14 / 4), (0, 0, 0)],
+            max_lin_vel=0.8, max_yaw_vel=1.0, pos_tol=0.5, yaw_tol=0.2,
+        )
+    elif kind == "kinematic":
+        cfg = NPCActionKinematicCfg(
+            asset_name=asset_name,
+            routine_points=[(0, 0, 3.14 * 0.75), (6, 0, 3.14 * 0.75), (6, 6, 3.14 / 4), (0, 0, 0)],
+            max_lin_vel=0.8, max_yaw_vel=1.0, pos_tol=0.5, yaw_tol=0.2,
+        )
+    elif kind == "mimic":
+        cfg = NPCActionMimicCfg(
+            asset_name=asset_name, policy_path=assets.mimic_policy,
+            low_level_observations=_mimic_obs_cfg(), low_level_actions=joint_actions(),
+            motion_file=assets.motion_file, body_names=list(G1_BODY_NAMES), anchor_body_name="torso_link",
+        )
+    elif kind == "fk":
+        cfg = NPCActionFKCfg(
+            asset_name=asset_name, motion_file=assets.motion_file,
+            body_names=list(G1_BODY_NAMES), anchor_body_name="torso_link",
+        )
+    else:
+        raise ValueError(f"Unknown suite term '{kind}', expected one of {SUITE_TERMS}.")
+    for key, value in overrides.items():
+        setattr(cfg, key, value)
+    return cfg
+
+
+def _sync(device):
+    if torch.device(device).type == "cuda":
+        torch.cuda.synchronize(device)
+
+
+def _latency_row(samples_ms: list[float], num_agents: int, steps_per_sample: int = 1) -> dict:
+    samples = np.asarray(samples_ms)
+    return {
+        "mean_ms": float(samples.mean()),
+        "p50_ms": float(np.percentile(samples, 50)),
+        "p99_ms": float(np.percentile(samples, 99)),
+        "npc_steps_per_s": float(num_agents * steps_per_sample / (samples.mean() / 1e3)),
+    }
+
+
+def bench_term(kind: str, num_envs: int, num_npcs: int, assets: _Assets, num_steps: int = 50, warmup: int = 5,
+               device: str = "cpu", **overrides) -> dict:
+    """Env step latency with ``num_npcs`` NPC assets per env, each driven by its own ``kind`` term
+    ("group": a single term drives all of them)."""
+    env = StandInEnv(num_envs, device=device)
+    names = [f"npc_{i}" for i in range(num_npcs)]
+    for name in names:
+        env.scene.add_articulation(name)
+    if kind == "group":
+        env.add_action_term("npc_group", make_term_cfg(kind, names[0], assets, asset_names=names, **overrides))
+    else:
+        for name in names:
+            env.add_action_term(name, make_term_cfg(kind, name, assets, **overrides))
+    env.reset()
+    for _ in range(warmup):
+        env.step()
+    samples = []
+    for _ in range(num_steps):
+        _sync(device)
+        start = time.perf_counter()
+        env.step()
+        _sync(device)
+        samples.append((time.perf_counter() - start) * 1e3)
+    # kinematic terms drive a crowd of agents each
+    num_agents = num_envs * num_npcs * overrides.get("crowd_size", 1)
+    return {"term": kind, "num_envs": num_envs, "num_npcs": num_npcs, **_latency_row(samples, num_agents)}
+
+
+def bench_planner(num_envs: int, num_npcs: int, num_steps: int = 50, warmup: int = 5, device: str = "cpu") -> dict:
+    """Fused routine step of ``BatchVelocityPlanner`` over every NPC at once, one call per env step."""
+    from IsaacNPC.planner.velocity.velocity_planner_2d import BatchVelocityPlanner
+
+    num_agents = num_envs * num_npcs
+    generator = torch.Generator(device=device).manual_seed(0)
+    routine_points = torch.tensor([(0, 0, 2.35), (6, 0, 2.35), (6, 6, 0.785), (0, 0, 0)], device=device)
+    pos = torch.rand(num_agents, 2, generator=generator, device=device) * 6.0
+    yaw = (torch.rand(num_agents, generator=generator, device=device) - 0.5) * 6.28
+    target_ptr = torch.randint(0, routine_points.shape[0], (num_agents,), generator=generator, device=device)
+    planner = BatchVelocityPlanner(max_lin_vel=0.8, max_yaw_vel=1.0, pos_tol=0.5, yaw_tol=0.2)
+    for _ in range(warmup):
+        planner.step_routine(pos, yaw, routine_points, target_ptr)
+    samples = []
+    for _ in range(num_steps):
+        _sync(device)
+        start = time.perf_counter()
+        planner.step_routine(pos, yaw, routine_points, target_ptr)
+        _sync(device)
+        samples.append((time.perf_counter() - start) * 1e3)
+    return {"term": "planner", "num_envs": num_envs, "num_npcs": num_npcs, **_latency_row(samples, num_agents)}
+
+
+def run(sizes=(256, 1024, 4096), npc_counts=(1, 4), terms=SUITE_TERMS, num_steps: int = 50, device: str = "cpu") -> list[dict]:
+    install_isaaclab_standins()
+    results = []
+    with tempfile.TemporaryDirectory(prefix="npc_suite_") as directory:
+        assets = _Assets(directory)
+        for kind in terms:
+            for num_npcs in npc_counts:
+                for num_envs in sizes:
+                    if kind == "planner":
+                        results.append(bench_planner(num_envs, num_npcs, num_steps, device=device))
+                    else:
+                        results.append(bench_term(kind, num_envs, num_npcs, assets, num_steps, device=device))
+    return results
+
+
+def run_metadata(device: str) -> dict:
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "torch": torch.__version__,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "device": str(device),
+        "num_threads": torch.get_num_threads(),
+    }
+
+
+def format_table(results) -> str:
+    keys = list(results[0].keys())
+    lines = ["".join(f"{key:>16}" for key in keys)]
+    for row in results:
+        lines.append("".join(f"{row[key]:>16.3f}" if isinstance(row[key], float) else f"{row[key]:>16}" for key in keys))
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[256, 1024, 4096])
+    parser.add_argument("--npc_counts", type=int, nargs="+", default=[1, 4])
+    parser.add_argument("--terms", type=str, nargs="+", default=list(SUITE_TERMS), choices=SUITE_TERMS)
+    parser.add_argument("--num_steps", type=int, default=50)
+    parser.add_argument("--device", type=str, default="cpu")
+    parser.add_argument("--json", type=str, default=None, help="Optional path to dump the results and run metadata as JSON.")
+    args = parser.parse_args()
+
+    results = run(args.sizes, args.npc_counts, args.terms, args.num_steps, args.device)
+    print(format_table(results))
+    if args.json is not None:
+        with open(args.json, "w") as f:
+            json.dump({"meta": run_metadata(args.device), "results": results}, f, indent=2)
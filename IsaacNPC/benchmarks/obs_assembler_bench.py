@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import time
+import torch
+from typing import TYPE_CHECKING
+
+from isaaclab.managers import ObservationManager, SceneEntityCfg
+from isaaclab.managers import ObservationTermCfg as ObsTerm
+
+from IsaacNPC.action.npc_action.npc_obs_assembler import NPCObsAssembler
+from IsaacNPC.template.g1.npc_zero_vel_policy_cfg import G1NPCVelPolicyActionsCfg
+from IsaacNPC.utils.func_tools import has_param
+
+if TYPE_CHECKING:
+    from isaaclab.envs import ManagerBasedEnv
+
+
+def make_g1_policy_obs_cfg(env: ManagerBasedEnv, asset_name: str, enable_corruption: bool = True):
+    """G1 ``PolicyCfg`` bound to ``asset_name``, with command / last action replaced like the NPC terms do."""
+    obs_cfg = G1NPCVelPolicyActionsCfg.PolicyCfg()
+    obs_cfg.enable_corruption = enable_corruption
+    for term in vars(obs_cfg).values():
+        if isinstance(term, ObsTerm):
+            if has_param(term.func, "asset_cfg"):
+                term.params["asset_cfg"] = SceneEntityCfg(asset_name)
+
+    robot = env.scene[asset_name]
+    vel_command = torch.zeros(env.num_envs, 3, device=env.device)
+    vel_command[:, 0] = 0.3
+    last_action = torch.zeros(env.num_envs, robot.num_joints, device=env.device)
+    obs_cfg.velocity_commands.func = lambda dummy_env: vel_command
+    obs_cfg.velocity_commands.params = dict()
+    obs_cfg.actions.func = lambda dummy_env: last_action
+    obs_cfg.actions.params = dict()
+    return obs_cfg
+
+
+def _time(fn, num_iters: int, device) -> float:
+    for _ in range(10):
+        fn()
+    if torch.device(device).type == "cuda":
+        torch.cuda.synchronize(device)
+    start = time.perf_counter()
+    for _ in range(num_iters):
+        fn()
+    if torch.device(device).type == "cuda":
+        torch.cuda.synchronize(device)
+    return (time.perf_counter() - start) / num_iters * 1e3
+
+
+def benchmark_obs_assembler(env: ManagerBasedEnv, asset_name: str, num_iters: int = 1000) -> dict[str, float]:
+    """
+    Compare ``ObservationManager.compute_group`` with :class:`NPCObsAssembler` on the G1 ``PolicyCfg``.
+
+    Both paths are first checked to produce the same observations with corruption disabled, then
+    timed with corruption enabled (as configured in the template).
+
+    Returns:
+        Mean milliseconds per call for both paths, their ratio and the observation dim.
+    """
+    manager = ObservationManager({"ll_policy": make_g1_policy_obs_cfg(env, asset_name, False)}, env)
+    assembler = NPCObsAssembler(make_g1_policy_obs_cfg(env, asset_name, False), env)
+    torch.testing.assert_close(assembler.compute(), manager.compute_group("ll_policy"))
+
+    manager = ObservationManager({"ll_policy": make_g1_policy_obs_cfg(env, asset_name)}, env)
+    assembler = NPCObsAssembler(make_g1_policy_obs_cfg(env, asset_name), env)
+    compute_group_ms = _time(lambda: manager.compute_group("ll_policy"), num_iters, env.device)
+    assembler_ms = _time(assembler.compute, num_iters, env.device)
+    return {
+        "num_envs": env.num_envs,
+        "obs_dim": assembler.obs_dim,
+        "compute_group_ms": compute_group_ms,
+        "assembler_ms": assembler_ms,
+        "speedup": compute_group_ms / assembler_ms,
+    }
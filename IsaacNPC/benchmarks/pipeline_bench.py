@@ -0,0 +1,98 @@
+"""Benchmark of pipelined NPC policy inference against the synchronous step.
+
+Steps ``NPCActionVel`` terms on the stand-in env (see :mod:`IsaacNPC.benchmarks.npc_suite_bench`)
+with ``pipelined_inference`` off and on, and reports the env step latency and the saving. The
+stand-in scene update is nearly free, ``--physics_ms`` adds a simulator cost per physics tick (a
+sleep, which like a PhysX step releases the GIL) so that there is simulation for the policy to
+overlap with. Without it the pipelined step can only hide the policy behind the observation and
+action work of the other terms.
+
+    python -m IsaacNPC.benchmarks.pipeline_bench --sizes 1024 4096 --physics_ms 0 0.5 1.0
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import tempfile
+import time
+
+import numpy as np
+
+from IsaacNPC.benchmarks.npc_suite_bench import _Assets, _sync, make_term_cfg, run_metadata
+from IsaacNPC.benchmarks.standin import StandInEnv, install_isaaclab_standins
+
+
+def _add_physics_cost(env: StandInEnv, physics_ms: float):
+    update = env.scene.update
+
+    def update_with_physics(dt: float):
+        update(dt)
+        time.sleep(physics_ms / 1e3)
+
+    if physics_ms > 0:
+        env.scene.update = update_with_physics
+
+
+def bench_step(num_envs: int, num_npcs: int, pipelined: bool, assets: _Assets, physics_ms: float = 0.0,
+               num_steps: int = 50, warmup: int = 5, device: str = "cpu") -> float:
+    """Mean env step latency (ms) with ``num_npcs`` velocity NPC terms."""
+    env = StandInEnv(num_envs, device=device)
+    for i in range(num_npcs):
+        name = f"npc_{i}"
+        env.scene.add_articulation(name)
+        env.add_action_term(name, make_term_cfg("vel", name, assets, pipelined_inference=pipelined))
+    _add_physics_cost(env, physics_ms)
+    env.reset()
+    for _ in range(warmup):
+        env.step()
+    samples = []
+    for _ in range(num_steps):
+        _sync(device)
+        start = time.perf_counter()
+        env.step()
+        _sync(device)
+        samples.append((time.perf_counter() - start) * 1e3)
+    return float(np.mean(samples))
+
+
+def run(sizes=(1024, 4096), npc_counts=(1,), physics_ms=(0.0, 1.0), num_steps: int = 50, device: str = "cpu") -> list[dict]:
+    install_isaaclab_standins()
+    results = []
+    with tempfile.TemporaryDirectory(prefix="npc_pipeline_") as directory:
+        assets = _Assets(directory)
+        for cost in physics_ms:
+            for num_npcs in npc_counts:
+                for num_envs in sizes:
+                    sync_ms = bench_step(num_envs, num_npcs, False, assets, cost, num_steps, device=device)
+                    pipelined_ms = bench_step(num_envs, num_npcs, True, assets, cost, num_steps, device=device)
+                    results.append({
+                        "num_envs": num_envs,
+                        "num_npcs": num_npcs,
+                        "physics_ms": cost,
+                        "sync_ms": sync_ms,
+                        "pipelined_ms": pipelined_ms,
+                        "saved_pct": 100.0 * (1.0 - pipelined_ms / sync_ms),
+                    })
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1024, 4096])
+    parser.add_argument("--npc_counts", type=int, nargs="+", default=[1])
+    parser.add_argument("--physics_ms", type=float, nargs="+", default=[0.0, 1.0],
+                        help="Emulated simulator cost per physics tick (ms).")
+    parser.add_argument("--num_steps", type=int, default=50)
+    parser.add_argument("--device", type=str, default="cpu")
+    parser.add_argument("--json", type=str, default=None, help="Optional path to dump the results and run metadata as JSON.")
+    args = parser.parse_args()
+
+    results = run(args.sizes, args.npc_counts, args.physics_ms, args.num_steps, args.device)
+    print(f"{'num_envs':>10}{'num_npcs':>10}{'physics_ms':>12}{'sync_ms':>12}{'pipelined_ms':>14}{'saved_%':>10}")
+    for row in results:
+        print(f"{row['num_envs']:>10}{row['num_npcs']:>10}{row['physics_ms']:>12.2f}{row['sync_ms']:>12.3f}"
+              f"{row['pipelined_ms']:>14.3f}{row['saved_pct']:>10.1f}")
+    if args.json is not None:
+        with open(args.json, "w") as f:
+            json.dump({"meta": run_metadata(args.device), "results": results}, f, indent=2)
@@ -0,0 +1,104 @@
+"""CPU micro-benchmark of the routine planner step.
+
+Compares the legacy routine path (check_arrival, pointer update, compute_cmd) with the fused
+:meth:`BatchVelocityPlanner.step_routine` for every backend. Both give arrived envs the command
+toward their next waypoint in the same step.
+
+    python -m IsaacNPC.benchmarks.planner_bench --sizes 1000 10000 100000 1000000
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import time
+
+import torch
+
+from IsaacNPC.planner.velocity.velocity_planner_2d import PLANNER_BACKENDS, BatchVelocityPlanner
+
+
+def legacy_routine_step(planner: BatchVelocityPlanner, pos, yaw, routine_points, target_ptr):
+    """The routine step as it was written before the fused kernel, geometry evaluated three times."""
+    goals = routine_points[target_ptr]
+    arrived = planner.check_arrival(pos, yaw, goals[:, :2], goals[:, 2])
+    if arrived.any():
+        target_ptr[arrived] += 1
+        target_ptr %= routine_points.shape[0]
+    goals = routine_points[target_ptr]
+    goal_pos, goal_yaw = goals[:, :2], goals[:, 2]
+
+    diff = goal_pos - pos
+    dist = torch.norm(diff, dim=1)
+    direction = diff / (dist.unsqueeze(1) + 1e-8)
+    speed = torch.clamp(dist, max=planner.max_lin_vel)
+    v_xy = direction * speed.unsqueeze(1)
+    cos_yaw = torch.cos(yaw)
+    sin_yaw = torch.sin(yaw)
+    v_xy = torch.stack([
+        cos_yaw * v_xy[:, 0] + sin_yaw * v_xy[:, 1],
+        -sin_yaw * v_xy[:, 0] + cos_yaw * v_xy[:, 1],
+    ], dim=1)
+    yaw_error = torch.atan2(torch.sin(goal_yaw - yaw), torch.cos(goal_yaw - yaw))
+    yaw_rate = torch.clamp(yaw_error, -planner.max_yaw_vel, planner.max_yaw_vel)
+    arrived = planner.check_arrival(pos, yaw, goal_pos, goal_yaw)
+    cmd = torch.zeros((pos.size(0), 3), device=pos.device, dtype=pos.dtype)
+    cmd[:, 0:2] = v_xy
+    cmd[:, 2] = yaw_rate
+    cmd[arrived] = 0.0
+    return cmd, arrived, target_ptr
+
+
+def _make_inputs(num_envs: int, device: str, seed: int = 0):
+    generator = torch.Generator(device=device).manual_seed(seed)
+    routine_points = torch.tensor([(0, 0, 2.35), (6, 0, 2.35), (6, 6, 0.785), (0, 0, 0)], dtype=torch.float32, device=device)
+    pos = torch.rand(num_envs, 2, generator=generator, device=device) * 6.0
+    yaw = (torch.rand(num_envs, generator=generator, device=device) - 0.5) * 6.28
+    target_ptr = torch.randint(0, routine_points.shape[0], (num_envs,), generator=generator, device=device)
+    return pos, yaw, routine_points, target_ptr
+
+
+def _time(fn, num_iters: int) -> float:
+    for _ in range(3):
+        fn()
+    start = time.perf_counter()
+    for _ in range(num_iters):
+        fn()
+    return (time.perf_counter() - start) / num_iters * 1e3
+
+
+def run(sizes=(1_000, 10_000, 100_000, 1_000_000), backends=PLANNER_BACKENDS, num_iters: int = 50, device: str = "cpu"):
+    results = []
+    for num_envs in sizes:
+        pos, yaw, routine_points, target_ptr = _make_inputs(num_envs, device)
+        legacy = BatchVelocityPlanner(max_lin_vel=0.8, max_yaw_vel=1.0, pos_tol=0.5, yaw_tol=0.2)
+        row = {"num_envs": num_envs}
+        row["legacy_ms"] = _time(lambda: legacy_routine_step(legacy, pos, yaw, routine_points, target_ptr.clone()), num_iters)
+        for backend in backends:
+            planner = BatchVelocityPlanner(max_lin_vel=0.8, max_yaw_vel=1.0, pos_tol=0.5, yaw_tol=0.2, backend=backend)
+            row[f"{backend}_ms"] = _time(lambda: planner.step_routine(pos, yaw, routine_points, target_ptr.clone()), num_iters)
+        results.append(row)
+    return results
+
+
+def format_table(results) -> str:
+    keys = list(results[0].keys())
+    lines = ["".join(f"{key:>14}" for key in keys)]
+    for row in results:
+        lines.append("".join(f"{row[key]:>14.3f}" if isinstance(row[key], float) else f"{row[key]:>14}" for key in keys))
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000, 1_000_000])
+    parser.add_argument("--backends", type=str, nargs="+", default=list(PLANNER_BACKENDS))
+    parser.add_argument("--num_iters", type=int, default=50)
+    parser.add_argument("--json", type=str, default=None, help="Optional path to dump the results as JSON.")
+    args = parser.parse_args()
+
+    results = run(args.sizes, args.backends, args.num_iters)
+    print(format_table(results))
+    if args.json is not None:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
@@ -0,0 +1,2 @@
+from .isaaclab_shim import install_isaaclab_standins
+from .env import G1_BODY_NAMES, G1_JOINT_NAMES, StandInArticulation, StandInArticulationData, StandInEnv, StandInScene
@@ -0,0 +1,241 @@
+"""Pure torch stand-in env: articulation data tensors, a scene with env origins and the step loop."""
+
+from __future__ import annotations
+
+import math
+
+import torch
+
+from .isaaclab_shim import _find, quat_apply, quat_apply_inverse
+
+G1_JOINT_NAMES = [f"joint_{i}" for i in range(29)]
+G1_BODY_NAMES = ["pelvis", "torso_link"] + [f"link_{i}" for i in range(2, 14)]
+
+
+class StandInArticulationData:
+    """The ``ArticulationData`` fields read by the NPC terms, derived quantities computed on access like Isaac Lab."""
+
+    def __init__(self, num_envs: int, num_joints: int, num_bodies: int, device: str, root_height: float = 0.8):
+        self.device = device
+        self.root_state_w = torch.zeros(num_envs, 13, device=device)
+        self.root_state_w[:, 2] = root_height
+        self.root_state_w[:, 3] = 1.0
+        self.default_root_state = self.root_state_w.clone()
+        self.joint_pos = torch.zeros(num_envs, num_joints, device=device)
+        self.joint_vel = torch.zeros_like(self.joint_pos)
+        self.joint_pos_target = torch.zeros_like(self.joint_pos)
+        self.default_joint_pos = torch.zeros_like(self.joint_pos)
+        self.default_joint_vel = torch.zeros_like(self.joint_pos)
+        # fixed body offsets in the root frame, a rough humanoid column
+        self.body_offsets = torch.zeros(num_bodies, 3, device=device)
+        self.body_offsets[:, 2] = torch.linspace(0.0, 0.6, num_bodies, device=device)
+        self.gravity_w = torch.tensor([0.0, 0.0, -1.0], device=device)
+
+    @property
+    def root_pos_w(self) -> torch.Tensor:
+        return self.root_state_w[:, :3]
+
+    @property
+    def root_quat_w(self) -> torch.Tensor:
+        return self.root_state_w[:, 3:7]
+
+    @property
+    def root_lin_vel_w(self) -> torch.Tensor:
+        return self.root_state_w[:, 7:10]
+
+    @property
+    def root_ang_vel_w(self) -> torch.Tensor:
+        return self.root_state_w[:, 10:13]
+
+    @property
+    def root_lin_vel_b(self) -> torch.Tensor:
+        return quat_apply_inverse(self.root_quat_w, self.root_lin_vel_w)
+
+    @property
+    def root_ang_vel_b(self) -> torch.Tensor:
+        return quat_apply_inverse(self.root_quat_w, self.root_ang_vel_w)
+
+    @property
+    def projected_gravity_b(self) -> torch.Tensor:
+        return quat_apply_inverse(self.root_quat_w, self.gravity_w.expand(self.root_quat_w.shape[0], 3))
+
+    @property
+    def body_pos_w(self) -> torch.Tensor:
+        num_bodies = self.body_offsets.shape[0]
+        quat = self.root_quat_w.unsqueeze(1).expand(-1, num_bodies, 4)
+        return self.root_pos_w.unsqueeze(1) + quat_apply(quat, self.body_offsets.expand_as(quat[..., :3]))
+
+    @property
+    def body_quat_w(self) -> torch.Tensor:
+        return self.root_quat_w.unsqueeze(1).expand(-1, self.body_offsets.shape[0], 4)
+
+    @property
+    def body_lin_vel_w(self) -> torch.Tensor:
+        return self.root_lin_vel_w.unsqueeze(1).expand(-1, self.body_offsets.shape[0], 3)
+
+    @property
+    def body_ang_vel_w(self) -> torch.Tensor:
+        return self.root_ang_vel_w.unsqueeze(1).expand(-1, self.body_offsets.shape[0], 3)
+
+
+class StandInArticulation:
+    """
+    Articulation with the write / target API of Isaac Lab's ``Articulation`` and a trivial integrator:
+    joints track their position targets with a first-order lag and the root drifts with its velocity.
+    """
+
+    def __init__(self, num_envs: int, device: str = "cpu", joint_names: list[str] | None = None,
+                 body_names: list[str] | None = None, tracking_rate: float = 40.0):
+        self.joint_names = list(joint_names or G1_JOINT_NAMES)
+        self.body_names = list(body_names or G1_BODY_NAMES)
+        self.num_instances = num_envs
+        self.device = device
+        self.tracking_rate = tracking_rate
+        self.data = StandInArticulationData(num_envs, len(self.joint_names), len(self.body_names), device)
+
+    @property
+    def num_joints(self) -> int:
+        return len(self.joint_names)
+
+    @property
+    def num_bodies(self) -> int:
+        return len(self.body_names)
+
+    def find_joints(self, name_keys, preserve_order: bool = False):
+        return _find(self.joint_names, name_keys, preserve_order)
+
+    def find_bodies(self, name_keys, preserve_order: bool = False):
+        return _find(self.body_names, name_keys, preserve_order)
+
+    @staticmethod
+    def _rows(env_ids):
+        return slice(None) if env_ids is None else env_ids
+
+    def write_root_state_to_sim(self, root_state: torch.Tensor, env_ids=None):
+        self.data.root_state_w[self._rows(env_ids)] = root_state
+
+    def write_root_pose_to_sim(self, root_pose: torch.Tensor, env_ids=None):
+        self.data.root_state_w[self._rows(env_ids), :7] = root_pose
+
+    def write_root_velocity_to_sim(self, root_velocity: torch.Tensor, env_ids=None):
+        self.data.root_state_w[self._rows(env_ids), 7:] = root_velocity
+
+    def write_joint_state_to_sim(self, position: torch.Tensor, velocity: torch.Tensor, joint_ids=None, env_ids=None):
+        cols = slice(None) if joint_ids is None else joint_ids
+        if env_ids is None:
+            self.data.joint_pos[:, cols] = position
+            self.data.joint_vel[:, cols] = velocity
+        elif joint_ids is None:
+            self.data.joint_pos[env_ids] = position
+            self.data.joint_vel[env_ids] = velocity
+        else:
+            rows = env_ids.unsqueeze(1)
+            self.data.joint_pos[rows, cols] = position
+            self.data.joint_vel[rows, cols] = velocity
+
+    def set_joint_position_target(self, target: torch.Tensor, joint_ids=None, env_ids=None):
+        cols = slice(None) if joint_ids is None else joint_ids
+        if env_ids is None:
+            self.data.joint_pos_target[:, cols] = target
+        else:
+            self.data.joint_pos_target[env_ids.unsqueeze(1), cols] = target
+
+    def update(self, dt: float):
+        data = self.data
+        alpha = min(1.0, self.tracking_rate * dt)
+        delta = (data.joint_pos_target - data.joint_pos) * alpha
+        data.joint_pos.add_(delta)
+        torch.div(delta, dt, out=data.joint_vel)
+        data.root_state_w[:, :3].add_(data.root_state_w[:, 7:10], alpha=dt)
+
+    def reset(self, env_ids=None):
+        rows = self._rows(env_ids)
+        self.data.joint_vel[rows] = 0.0
+
+
+class StandInScene:
+    """Named assets and a grid of env origins, indexed like ``InteractiveScene``."""
+
+    def __init__(self, num_envs: int, device: str = "cpu", env_spacing: float = 4.0):
+        self.num_envs = num_envs
+        self.device = device
+        side = math.ceil(math.sqrt(num_envs))
+        ids = torch.arange(num_envs, device=device)
+        self.env_origins = torch.zeros(num_envs, 3, device=device)
+        self.env_origins[:, 0] = (ids // side).float() * env_spacing
+        self.env_origins[:, 1] = (ids % side).float() * env_spacing
+        self.articulations: dict[str, StandInArticulation] = {}
+
+    def __getitem__(self, name: str):
+        return self.articulations[name]
+
+    def keys(self):
+        return self.articulations.keys()
+
+    def add_articulation(self, name: str, **kwargs) -> StandInArticulation:
+        asset = StandInArticulation(self.num_envs, self.device, **kwargs)
+        asset.data.root_state_w[:, :3] += self.env_origins
+        asset.data.default_root_state[:, :3] = 0.0
+        asset.data.default_root_state[:, 2] = asset.data.root_state_w[0, 2] - self.env_origins[0, 2]
+        self.articulations[name] = asset
+        return asset
+
+    def update(self, dt: float):
+        for asset in self.articulations.values():
+            asset.update(dt)
+
+
+class StandInEnv:
+    """
+    Headless stand-in of ``ManagerBasedRLEnv`` for the NPC action terms.
+
+    Holds the scene, the counters the terms read (``episode_length_buf``, ``_sim_step_counter``)
+    and the step loop of Isaac Lab: ``process_actions`` once per env step, then ``decimation``
+    physics ticks of ``apply_actions`` followed by a scene update.
+    """
+
+    def __init__(self, num_envs: int, device: str = "cpu", physics_dt: float = 0.005, decimation: int = 4,
+                 env_spacing: float = 4.0):
+        self.num_envs = num_envs
+        self.device = device
+        self.physics_dt = physics_dt
+        self.decimation = decimation
+        self.scene = StandInScene(num_envs, device, env_spacing)
+        self.episode_length_buf = torch.zeros(num_envs, dtype=torch.long, device=device)
+        self.common_step_counter = 0
+        self._sim_step_counter = 0
+        self.action_terms: dict[str, object] = {}
+        self._empty_action = torch.zeros(num_envs, 0, device=device)
+
+    @property
+    def step_dt(self) -> float:
+        return self.physics_dt * self.decimation
+
+    def add_action_term(self, name: str, cfg):
+        term = cfg.class_type(cfg, self)
+        self.action_terms[name] = term
+        return term
+
+    @torch.inference_mode()
+    def step(self):
+        # rollouts run without autograd, like the RL runners stepping Isaac Lab envs
+        for term in self.action_terms.values():
+            term.process_actions(self._empty_action)
+        for _ in range(self.decimation):
+            for term in self.action_terms.values():
+                term.apply_actions()
+            self._sim_step_counter += 1
+            self.scene.update(self.physics_dt)
+        self.episode_length_buf += 1
+        self.common_step_counter += 1
+
+    @torch.inference_mode()
+    def reset(self, env_ids=None):
+        for asset in self.scene.articulations.values():
+            asset.reset(env_ids)
+        for term in self.action_terms.values():
+            term.reset(env_ids)
+        if env_ids is None:
+            self.episode_length_buf[:] = 0
+        else:
+            self.episode_length_buf[env_ids] = 0
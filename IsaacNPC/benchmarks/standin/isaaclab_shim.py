@@ -0,0 +1,560 @@
+"""Minimal pure torch stand-ins for the ``isaaclab`` modules imported by the NPC terms.
+
+Importing ``isaaclab.managers`` / ``isaaclab.assets`` requires a running Isaac Sim app. The
+benchmark suite only needs the term code paths, so :func:`install_isaaclab_standins` registers
+small replacements under the ``isaaclab`` module names: ``configclass``, the math helpers, the
+observation / action manager pieces and the G1 observation functions, all on the
+:class:`StandInArticulation` data layout. The replacements follow Isaac Lab's semantics closely
+enough for timing, they are not a simulator and never used when Isaac Lab is already loaded.
+"""
+
+from __future__ import annotations
+
+import copy
+import dataclasses
+import inspect
+import io
+import math
+import os
+import re
+import sys
+import types
+from dataclasses import MISSING
+
+import torch
+
+_MODULES = (
+    "isaaclab",
+    "isaaclab.utils",
+    "isaaclab.utils.math",
+    "isaaclab.utils.assets",
+    "isaaclab.utils.noise",
+    "isaaclab.managers",
+    "isaaclab.assets",
+    "isaaclab.markers",
+    "isaaclab.markers.config",
+    "isaaclab.envs",
+    "isaaclab.envs.mdp",
+)
+
+
+"""
+configclass.
+"""
+
+
+def _is_immutable(value) -> bool:
+    return value is None or value is MISSING or isinstance(value, (bool, int, float, str, bytes, tuple, type, frozenset)) \
+        or callable(value) and not hasattr(value, "__dataclass_fields__")
+
+
+def configclass(cls):
+    """``dataclass`` with Isaac Lab's conveniences: implicit fields, copied mutable defaults, copy / replace."""
+    annotations = cls.__dict__.get("__annotations__", {})
+    cls.__annotations__ = annotations
+    for name, value in list(cls.__dict__.items()):
+        if name.startswith("__") or inspect.isclass(value) or isinstance(value, (property, staticmethod, classmethod)):
+            continue
+        if inspect.isfunction(value):
+            continue
+        if name not in annotations:
+            annotations[name] = type(value).__name__
+    for name in annotations:
+        value = cls.__dict__.get(name, MISSING)
+        if name not in cls.__dict__:
+            # inherited or declared without a default, fall back to the parent value
+            for base in cls.__mro__[1:]:
+                if name in getattr(base, "__dataclass_fields__", {}):
+                    parent = base.__dataclass_fields__[name]
+                    value = parent.default if parent.default is not MISSING else parent.default_factory()
+                    break
+                if name in base.__dict__:
+                    value = base.__dict__[name]
+                    break
+        if isinstance(value, dataclasses.Field):
+            continue
+        if _is_immutable(value) and value is not MISSING:
+            setattr(cls, name, value)
+        else:
+            setattr(cls, name, dataclasses.field(default_factory=lambda value=value: copy.deepcopy(value)))
+    cls = dataclasses.dataclass(cls)
+    cls.copy = lambda self: copy.deepcopy(self)
+    cls.replace = lambda self, **changes: dataclasses.replace(self, **changes)
+    cls.to_dict = lambda self: dataclasses.asdict(self)
+    return cls
+
+
+"""
+Math (quaternions are (w, x, y, z), like Isaac Lab).
+"""
+
+
+def quat_mul(q1: torch.Tensor, q2: torch.Tensor) -> torch.Tensor:
+    w1, x1, y1, z1 = q1.unbind(-1)
+    w2, x2, y2, z2 = q2.unbind(-1)
+    return torch.stack([
+        w1 * w2 - x1 * x2 - y1 * y2 - z1 * z2,
+        w1 * x2 + x1 * w2 + y1 * z2 - z1 * y2,
+        w1 * y2 - x1 * z2 + y1 * w2 + z1 * x2,
+        w1 * z2 + x1 * y2 - y1 * x2 + z1 * w2,
+    ], dim=-1)
+
+
+def quat_conjugate(q: torch.Tensor) -> torch.Tensor:
+    return torch.cat([q[..., :1], -q[..., 1:]], dim=-1)
+
+
+def quat_inv(q: torch.Tensor) -> torch.Tensor:
+    return quat_conjugate(q) / q.square().sum(dim=-1, keepdim=True).clamp(min=1e-9)
+
+
+def quat_apply(quat: torch.Tensor, vec: torch.Tensor) -> torch.Tensor:
+    xyz = quat[..., 1:]
+    t = 2.0 * torch.cross(xyz, vec, dim=-1)
+    return vec + quat[..., :1] * t + torch.cross(xyz, t, dim=-1)
+
+
+def quat_apply_inverse(quat: torch.Tensor, vec: torch.Tensor) -> torch.Tensor:
+    return quat_apply(quat_conjugate(quat), vec)
+
+
+quat_rotate = quat_apply
+quat_rotate_inverse = quat_apply_inverse
+
+
+def wrap_to_pi(angles: torch.Tensor) -> torch.Tensor:
+    return torch.remainder(angles + math.pi, 2 * math.pi) - math.pi
+
+
+def euler_xyz_from_quat(quat: torch.Tensor) -> tuple[torch.Tensor, torch.Tensor, torch.Tensor]:
+    w, x, y, z = quat.unbind(-1)
+    roll = torch.atan2(2.0 * (w * x + y * z), 1.0 - 2.0 * (x * x + y * y))
+    pitch = torch.asin(torch.clamp(2.0 * (w * y - z * x), -1.0, 1.0))
+    yaw = torch.atan2(2.0 * (w * z + x * y), 1.0 - 2.0 * (y * y + z * z))
+    return roll % (2 * math.pi), pitch % (2 * math.pi), yaw % (2 * math.pi)
+
+
+def quat_from_euler_xyz(roll: torch.Tensor, pitch: torch.Tensor, yaw: torch.Tensor) -> torch.Tensor:
+    cy, sy = torch.cos(yaw * 0.5), torch.sin(yaw * 0.5)
+    cr, sr = torch.cos(roll * 0.5), torch.sin(roll * 0.5)
+    cp, sp = torch.cos(pitch * 0.5), torch.sin(pitch * 0.5)
+    return torch.stack([
+        cy * cr * cp + sy * sr * sp,
+        cy * sr * cp - sy * cr * sp,
+        cy * cr * sp + sy * sr * cp,
+        sy * cr * cp - cy * sr * sp,
+    ], dim=-1)
+
+
+def yaw_quat(quat: torch.Tensor) -> torch.Tensor:
+    _, _, yaw = euler_xyz_from_quat(quat)
+    zeros = torch.zeros_like(yaw)
+    return quat_from_euler_xyz(zeros, zeros, yaw)
+
+
+def matrix_from_quat(quat: torch.Tensor) -> torch.Tensor:
+    w, x, y, z = quat.unbind(-1)
+    two_s = 2.0 / quat.square().sum(dim=-1)
+    mat = torch.stack([
+        1 - two_s * (y * y + z * z), two_s * (x * y - z * w), two_s * (x * z + y * w),
+        two_s * (x * y + z * w), 1 - two_s * (x * x + z * z), two_s * (y * z - x * w),
+        two_s * (x * z - y * w), two_s * (y * z + x * w), 1 - two_s * (x * x + y * y),
+    ], dim=-1)
+    return mat.reshape(quat.shape[:-1] + (3, 3))
+
+
+def subtract_frame_transforms(t01, q01, t02=None, q02=None):
+    q10 = quat_inv(q01)
+    q12 = quat_mul(q10, q02) if q02 is not None else q10
+    t12 = quat_apply(q10, t02 - t01) if t02 is not None else quat_apply(q10, -t01)
+    return t12, q12
+
+
+"""
+Assets, noise.
+"""
+
+
+def check_file_path(path: str) -> int:
+    return 1 if os.path.isfile(path) else 0
+
+
+def read_file(path: str) -> io.BytesIO:
+    with open(path, "rb") as f:
+        return io.BytesIO(f.read())
+
+
+@configclass
+class NoiseCfg:
+    func: object = None
+    operation: str = "add"
+
+
+@configclass
+class ConstantNoiseCfg(NoiseCfg):
+    bias: float = 0.0
+
+
+@configclass
+class UniformNoiseCfg(NoiseCfg):
+    n_min: float = -1.0
+    n_max: float = 1.0
+
+
+@configclass
+class GaussianNoiseCfg(NoiseCfg):
+    mean: float = 0.0
+    std: float = 1.0
+
+
+@configclass
+class NoiseModelCfg:
+    noise_cfg: object = None
+
+
+AdditiveUniformNoiseCfg = UniformNoiseCfg
+AdditiveGaussianNoiseCfg = GaussianNoiseCfg
+
+
+def _apply_noise(data: torch.Tensor, cfg: NoiseCfg) -> torch.Tensor:
+    if isinstance(cfg, UniformNoiseCfg):
+        return data + torch.rand_like(data) * (cfg.n_max - cfg.n_min) + cfg.n_min
+    if isinstance(cfg, GaussianNoiseCfg):
+        return data + torch.randn_like(data) * cfg.std + cfg.mean
+    if isinstance(cfg, ConstantNoiseCfg):
+        return data + cfg.bias
+    return data
+
+
+"""
+Managers.
+"""
+
+
+@configclass
+class SceneEntityCfg:
+    name: str = MISSING
+    joint_names: object = None
+    joint_ids: object = slice(None)
+    body_names: object = None
+    body_ids: object = slice(None)
+    preserve_order: bool = False
+
+    def __init__(self, name: str = MISSING, joint_names=None, body_names=None, preserve_order: bool = False, **kwargs):
+        self.name = name
+        self.joint_names = joint_names
+        self.joint_ids = kwargs.get("joint_ids", slice(None))
+        self.body_names = body_names
+        self.body_ids = kwargs.get("body_ids", slice(None))
+        self.preserve_order = preserve_order
+
+    def resolve(self, scene):
+        asset = scene[self.name]
+        if self.joint_names is not None:
+            self.joint_ids, _ = asset.find_joints(self.joint_names, preserve_order=self.preserve_order)
+        if self.body_names is not None:
+            self.body_ids, _ = asset.find_bodies(self.body_names, preserve_order=self.preserve_order)
+
+
+@configclass
+class ManagerTermBaseCfg:
+    func: object = None
+    params: dict = dataclasses.field(default_factory=dict)
+
+
+@configclass
+class ObservationTermCfg(ManagerTermBaseCfg):
+    modifiers: object = None
+    noise: object = None
+    clip: object = None
+    scale: object = None
+    history_length: int = 0
+    flatten_history_dim: bool = True
+
+
+@configclass
+class ObservationGroupCfg:
+    concatenate_terms: bool = True
+    concatenate_dim: int = -1
+    enable_corruption: bool = False
+    history_length: object = None
+    flatten_history_dim: bool = True
+
+
+@configclass
+class EventTermCfg(ManagerTermBaseCfg):
+    mode: str = MISSING
+
+
+@configclass
+class RewardTermCfg(ManagerTermBaseCfg):
+    weight: float = MISSING
+
+
+@configclass
+class TerminationTermCfg(ManagerTermBaseCfg):
+    time_out: bool = False
+
+
+@configclass
+class ActionTermCfg:
+    class_type: object = MISSING
+    asset_name: str = MISSING
+    debug_vis: bool = False
+    clip: object = None
+
+
+class ManagerTermBase:
+    def __init__(self, cfg, env):
+        self.cfg = cfg
+        self._env = env
+
+    @property
+    def num_envs(self) -> int:
+        return self._env.num_envs
+
+    @property
+    def device(self) -> str:
+        return self._env.device
+
+    def reset(self, env_ids=None):
+        pass
+
+
+class ActionTerm(ManagerTermBase):
+    def __init__(self, cfg, env):
+        super().__init__(cfg, env)
+        self._asset = env.scene[cfg.asset_name]
+
+    def reset(self, env_ids=None):
+        pass
+
+
+_GROUP_KEYS = ("enable_corruption", "concatenate_terms", "history_length", "flatten_history_dim", "concatenate_dim")
+
+
+class ObservationManager:
+    """``ObservationManager.compute_group`` path: term func -> noise -> clip -> scale -> concat."""
+
+    def __init__(self, cfg: dict, env):
+        self._env = env
+        self._groups = {}
+        self._class_terms = []
+        self.group_obs_dim = {}
+        self.group_obs_term_dim = {}
+        for group_name, group_cfg in cfg.items():
+            terms = []
+            for term_name, term_cfg in group_cfg.__dict__.items():
+                if term_name in _GROUP_KEYS or not isinstance(term_cfg, ObservationTermCfg):
+                    continue
+                for value in term_cfg.params.values():
+                    if isinstance(value, SceneEntityCfg):
+                        value.resolve(env.scene)
+                if inspect.isclass(term_cfg.func):
+                    term_cfg.func = term_cfg.func(cfg=term_cfg, env=env)
+                    self._class_terms.append(term_cfg.func)
+                terms.append(term_cfg)
+            self._groups[group_name] = (group_cfg, terms)
+            self.group_obs_term_dim[group_name] = [tuple(self._compute_term(group_cfg, term).shape[1:]) for term in terms]
+            self.group_obs_dim[group_name] = (sum(dims[0] for dims in self.group_obs_term_dim[group_name]),)
+
+    def _compute_term(self, group_cfg, term_cfg) -> torch.Tensor:
+        obs = term_cfg.func(self._env, **term_cfg.params).clone().reshape(self._env.num_envs, -1)
+        if term_cfg.noise is not None and group_cfg.enable_corruption:
+            obs = _apply_noise(obs, term_cfg.noise)
+        if term_cfg.clip:
+            obs = obs.clip_(min=term_cfg.clip[0], max=term_cfg.clip[1])
+        if term_cfg.scale is not None:
+            obs = obs * torch.as_tensor(term_cfg.scale, dtype=torch.float32, device=obs.device)
+        return obs
+
+    def compute_group(self, group_name: str) -> torch.Tensor:
+        group_cfg, terms = self._groups[group_name]
+        return torch.cat([self._compute_term(group_cfg, term) for term in terms], dim=-1)
+
+    def compute(self) -> dict:
+        return {name: self.compute_group(name) for name in self._groups}
+
+    def reset(self, env_ids=None) -> dict:
+        for term in self._class_terms:
+            term.reset(env_ids=env_ids)
+        return {}
+
+
+"""
+envs.mdp: G1 observation functions and the joint position action.
+"""
+
+
+def base_lin_vel(env, asset_cfg: SceneEntityCfg = SceneEntityCfg("robot")) -> torch.Tensor:
+    return env.scene[asset_cfg.name].data.root_lin_vel_b
+
+
+def base_ang_vel(env, asset_cfg: SceneEntityCfg = SceneEntityCfg("robot")) -> torch.Tensor:
+    return env.scene[asset_cfg.name].data.root_ang_vel_b
+
+
+def projected_gravity(env, asset_cfg: SceneEntityCfg = SceneEntityCfg("robot")) -> torch.Tensor:
+    return env.scene[asset_cfg.name].data.projected_gravity_b
+
+
+def joint_pos_rel(env, asset_cfg: SceneEntityCfg = SceneEntityCfg("robot")) -> torch.Tensor:
+    data = env.scene[asset_cfg.name].data
+    return data.joint_pos[:, asset_cfg.joint_ids] - data.default_joint_pos[:, asset_cfg.joint_ids]
+
+
+def joint_vel_rel(env, asset_cfg: SceneEntityCfg = SceneEntityCfg("robot")) -> torch.Tensor:
+    data = env.scene[asset_cfg.name].data
+    return data.joint_vel[:, asset_cfg.joint_ids] - data.default_joint_vel[:, asset_cfg.joint_ids]
+
+
+def generated_commands(env, command_name: str) -> torch.Tensor:
+    return env.command_manager.get_command(command_name)
+
+
+def last_action(env, action_name: str | None = None) -> torch.Tensor:
+    return env.action_manager.action
+
+
+def _unused_event(env, env_ids, **kwargs):
+    pass
+
+
+class JointPositionAction(ActionTerm):
+    def __init__(self, cfg, env):
+        super().__init__(cfg, env)
+        self._joint_ids, _ = self._asset.find_joints(cfg.joint_names, preserve_order=cfg.preserve_order)
+        self._num_joints = len(self._joint_ids)
+        if self._num_joints == self._asset.num_joints and not cfg.preserve_order:
+            self._joint_ids = slice(None)
+        self._raw_actions = torch.zeros(self.num_envs, self._num_joints, device=self.device)
+        self._processed_actions = torch.zeros_like(self._raw_actions)
+        self._scale = cfg.scale
+        self._offset = self._asset.data.default_joint_pos[:, self._joint_ids].clone() if cfg.use_default_offset else cfg.offset
+
+    @property
+    def action_dim(self) -> int:
+        return self._num_joints
+
+    @property
+    def raw_actions(self) -> torch.Tensor:
+        return self._raw_actions
+
+    @property
+    def processed_actions(self) -> torch.Tensor:
+        return self._processed_actions
+
+    def process_actions(self, actions: torch.Tensor):
+        self._raw_actions[:] = actions
+        self._processed_actions = self._raw_actions * self._scale + self._offset
+
+    def apply_actions(self):
+        self._asset.set_joint_position_target(self._processed_actions, joint_ids=self._joint_ids)
+
+
+@configclass
+class JointPositionActionCfg(ActionTermCfg):
+    class_type: object = JointPositionAction
+    joint_names: list = MISSING
+    scale: float = 1.0
+    offset: float = 0.0
+    preserve_order: bool = False
+    use_default_offset: bool = True
+
+
+class VisualizationMarkers:
+    def __init__(self, cfg):
+        self.cfg = cfg
+
+    def set_visibility(self, visible: bool):
+        pass
+
+    def visualize(self, *args, **kwargs):
+        pass
+
+
+@configclass
+class VisualizationMarkersCfg:
+    prim_path: str = ""
+    markers: dict = dataclasses.field(default_factory=dict)
+
+
+def _find(names: list[str], keys, preserve_order: bool = False) -> tuple[list[int], list[str]]:
+    """``isaaclab.utils.string.resolve_matching_names``: regex keys matched against ``names``."""
+    if isinstance(keys, str):
+        keys = [keys]
+    if preserve_order:
+        ids = [i for key in keys for i, name in enumerate(names) if re.fullmatch(key, name)]
+    else:
+        ids = [i for i, name in enumerate(names) if any(re.fullmatch(key, name) for key in keys)]
+    if not ids:
+        raise ValueError(f"No names matched {keys}.")
+    return ids, [names[i] for i in ids]
+
+
+"""
+Registration.
+"""
+
+
+def install_isaaclab_standins(force: bool = False) -> bool:
+    """
+    Register the stand-ins under the ``isaaclab`` module names.
+
+    Does nothing when Isaac Lab is already imported (a simulator app is running) unless ``force``.
+    Returns whether the stand-ins are installed.
+    """
+    if "isaaclab.managers" in sys.modules and not getattr(sys.modules["isaaclab.managers"], "__standin__", False):
+        if not force:
+            return False
+    from .env import StandInArticulation, StandInEnv
+
+    modules = {name: types.ModuleType(name) for name in _MODULES}
+    for module in modules.values():
+        module.__standin__ = True
+    modules["isaaclab"].__path__ = []
+    modules["isaaclab.utils"].__path__ = []
+    modules["isaaclab.markers"].__path__ = []
+    modules["isaaclab.envs"].__path__ = []
+
+    modules["isaaclab.utils"].configclass = configclass
+    math_module = modules["isaaclab.utils.math"]
+    for func in (quat_mul, quat_conjugate, quat_inv, quat_apply, quat_apply_inverse, wrap_to_pi, euler_xyz_from_quat,
+                 quat_from_euler_xyz, yaw_quat, matrix_from_quat, subtract_frame_transforms):
+        setattr(math_module, func.__name__, func)
+    math_module.quat_rotate = quat_rotate
+    math_module.quat_rotate_inverse = quat_rotate_inverse
+    modules["isaaclab.utils"].math = math_module
+    modules["isaaclab.utils.assets"].check_file_path = check_file_path
+    modules["isaaclab.utils.assets"].read_file = read_file
+    noise_module = modules["isaaclab.utils.noise"]
+    for cls in (NoiseCfg, ConstantNoiseCfg, UniformNoiseCfg, GaussianNoiseCfg, NoiseModelCfg):
+        setattr(noise_module, cls.__name__, cls)
+    noise_module.AdditiveUniformNoiseCfg = AdditiveUniformNoiseCfg
+    noise_module.AdditiveGaussianNoiseCfg = AdditiveGaussianNoiseCfg
+    modules["isaaclab.utils"].noise = noise_module
+
+    managers = modules["isaaclab.managers"]
+    for obj in (SceneEntityCfg, ManagerTermBaseCfg, ObservationTermCfg, ObservationGroupCfg, EventTermCfg,
+                RewardTermCfg, TerminationTermCfg, ActionTermCfg, ManagerTermBase, ActionTerm, ObservationManager):
+        setattr(managers, obj.__name__, obj)
+
+    modules["isaaclab.assets"].Articulation = StandInArticulation
+    modules["isaaclab.markers"].VisualizationMarkers = VisualizationMarkers
+    modules["isaaclab.markers"].VisualizationMarkersCfg = VisualizationMarkersCfg
+    marker_config = modules["isaaclab.markers.config"]
+    marker_config.BLUE_ARROW_X_MARKER_CFG = VisualizationMarkersCfg(prim_path="/Visuals/blue_arrow")
+    marker_config.GREEN_ARROW_X_MARKER_CFG = VisualizationMarkersCfg(prim_path="/Visuals/green_arrow")
+
+    envs = modules["isaaclab.envs"]
+    envs.ManagerBasedEnv = envs.ManagerBasedRLEnv = StandInEnv
+    mdp = modules["isaaclab.envs.mdp"]
+    for obj in (base_lin_vel, base_ang_vel, projected_gravity, joint_pos_rel, joint_vel_rel, generated_commands,
+                last_action, JointPositionAction, JointPositionActionCfg):
+        setattr(mdp, obj.__name__, obj)
+    for name in ("randomize_rigid_body_material", "reset_root_state_uniform", "reset_joints_by_scale"):
+        setattr(mdp, name, _unused_event)
+    envs.mdp = mdp
+
+    sys.modules.update(modules)
+    return True
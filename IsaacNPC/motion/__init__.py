@@ -0,0 +1,14 @@
+from .motion_store import MotionStore, StreamField, TimeBounds, convert_motion, get_motion_store, clear_motion_stores
+from .motion_library import MotionLibrary, get_motion_library, get_motion_source, resolve_motion_files
+from .interpolation import interpolate_root_state, lerp_rows, quat_slerp, resample_frames
+from .playback import PLAYBACK_MODES, MotionPlayback
+from .quantization import (
+    MOTION_ENCODINGS,
+    PackedFieldTable,
+    QuantizedField,
+    decode_smallest_three,
+    encode_smallest_three,
+    format_quantization_report,
+    quantization_report,
+)
+from .rollout import BakedRollout, RolloutRecorder, clear_baked_rollouts, get_baked_rollout
@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import numpy as np
+import torch
+
+
+def quat_slerp(q0: torch.Tensor, q1: torch.Tensor, alpha: torch.Tensor) -> torch.Tensor:
+    """
+    Batched slerp along the shortest arc, (..., 4) quaternions and (...,) weights.
+
+    Nearly parallel pairs fall back to a normalized lerp.
+    """
+    dot = (q0 * q1).sum(dim=-1, keepdim=True)
+    q1 = torch.where(dot < 0.0, -q1, q1)
+    dot = dot.abs().clamp(max=1.0)
+    alpha = alpha.unsqueeze(-1)
+    theta = torch.acos(dot)
+    sin_theta = torch.sin(theta)
+    close = sin_theta < 1e-4
+    safe_sin = torch.where(close, torch.ones_like(sin_theta), sin_theta)
+    w0 = torch.where(close, 1.0 - alpha, torch.sin((1.0 - alpha) * theta) / safe_sin)
+    w1 = torch.where(close, alpha, torch.sin(alpha * theta) / safe_sin)
+    out = w0 * q0 + w1 * q1
+    return out / torch.norm(out, dim=-1, keepdim=True).clamp(min=1e-8)
+
+
+def lerp_rows(table, idx0: torch.Tensor, idx1: torch.Tensor, alpha: torch.Tensor) -> torch.Tensor:
+    """``table[idx0]`` blended toward ``table[idx1]`` by (N,) ``alpha``, any trailing shape."""
+    a = table[idx0]
+    b = table[idx1]
+    return torch.lerp(a, b, alpha.view(-1, *([1] * (a.dim() - 1))))
+
+
+def interpolate_root_state(root_table, idx0: torch.Tensor, idx1: torch.Tensor, alpha: torch.Tensor,
+                           out: torch.Tensor | None = None) -> torch.Tensor:
+    """(N, 13) root states between two frames: lerp of position / velocities, slerp of the quaternion."""
+    a = root_table[idx0]
+    b = root_table[idx1]
+    state = torch.lerp(a, b, alpha.unsqueeze(1))
+    state[:, 3:7] = quat_slerp(a[:, 3:7], b[:, 3:7], alpha)
+    if out is not None:
+        return out.copy_(state)
+    return state
+
+
+"""
+Storage resampling (load time, numpy).
+"""
+
+
+def _np_slerp(q0: np.ndarray, q1: np.ndarray, alpha: np.ndarray) -> np.ndarray:
+    dot = np.sum(q0 * q1, axis=-1, keepdims=True)
+    q1 = np.where(dot < 0.0, -q1, q1)
+    dot = np.clip(np.abs(dot), 0.0, 1.0)
+    theta = np.arccos(dot)
+    sin_theta = np.sin(theta)
+    close = sin_theta < 1e-4
+    safe_sin = np.where(close, 1.0, sin_theta)
+    w0 = np.where(close, 1.0 - alpha, np.sin((1.0 - alpha) * theta) / safe_sin)
+    w1 = np.where(close, alpha, np.sin(alpha * theta) / safe_sin)
+    out = w0 * q0 + w1 * q1
+    return out / np.maximum(np.linalg.norm(out, axis=-1, keepdims=True), 1e-8)
+
+
+def resampled_length(num_frames: int, src_fps: float, dst_fps: float) -> int:
+    """Frames of a ``num_frames`` clip resampled to ``dst_fps``, covering the same duration."""
+    return int(np.floor((num_frames - 1) / src_fps * dst_fps + 1e-6)) + 1
+
+
+def resample_frames(array: np.ndarray, src_fps: float, dst_fps: float, is_quat: bool = False) -> np.ndarray:
+    """Resample a (T, ...) clip field from ``src_fps`` to ``dst_fps`` (lerp, or slerp for quaternions)."""
+    num_src = array.shape[0]
+    num_dst = resampled_length(num_src, src_fps, dst_fps)
+    u = np.arange(num_dst) * (src_fps / dst_fps)
+    i0 = np.minimum(np.floor(u).astype(np.int64), num_src - 1)
+    i1 = np.minimum(i0 + 1, num_src - 1)
+    alpha = (u - i0).astype(np.float32).reshape((-1,) + (1,) * (array.ndim - 1))
+    a = np.asarray(array[i0], dtype=np.float32)
+    b = np.asarray(array[i1], dtype=np.float32)
+    if is_quat:
+        return _np_slerp(a, b, alpha).astype(np.float32)
+    return (a + (b - a) * alpha).astype(np.float32)
@@ -0,0 +1,229 @@
+from __future__ import annotations
+
+import glob
+import json
+import os
+import threading
+from typing import Sequence
+
+import numpy as np
+import torch
+
+from .interpolation import resample_frames, resampled_length
+from .motion_store import BODY_FIELDS, MOTION_FIELDS, convert_motion, get_motion_store
+from .quantization import MOTION_ENCODINGS, PackedFieldTable, quantize_fields
+
+CLIP_ASSIGNMENTS = ("cycle", "random")
+CLIP_END_MODES = ("loop", "resample")
+
+
+def resolve_motion_files(motion_files) -> list[str]:
+    """A directory (every ``.npz`` inside, sorted), a glob pattern or a list of files."""
+    if isinstance(motion_files, str):
+        if os.path.isdir(motion_files):
+            files = sorted(glob.glob(os.path.join(motion_files, "*.npz")))
+        else:
+            files = sorted(glob.glob(motion_files))
+    else:
+        files = list(motion_files)
+    if len(files) == 0:
+        raise FileNotFoundError(f"No motion clips found for '{motion_files}'.")
+    return files
+
+
+class MotionLibrary:
+    """
+    Many motion clips packed into one set of per-field tensors (CSR layout, like ``RoutineTable``).
+
+    Clip ``c`` spans frames ``clip_offsets[c]:clip_offsets[c + 1]`` of every field. Playback keeps a
+    global frame index per env, so reading the current frame of all envs is one gather
+    ``field[time_steps]`` whatever clip each env plays. Fields are the ones of ``MotionStore``
+    (``joint_pos``, ``body_pos_w``, ...), bodies selected at load.
+
+    Per-env clip bookkeeping is vectorized: :meth:`assign` picks clips, :meth:`advance` steps the
+    frames and restarts or resamples the envs whose clip ended, without host syncs.
+
+    ``target_fps`` resamples every clip at load to a common rate, playback then interpolates
+    between the stored frames (see ``MotionPlayback``). ``encoding="quantized"`` keeps the packed
+    fields in the compact encoding of :mod:`.quantization`.
+    """
+
+    def __init__(self, motion_files, body_indexes: Sequence[int], device: str | torch.device = "cpu",
+                 clip_weights: Sequence[float] | None = None, target_fps: float | None = None,
+                 encoding: str = "fp32", cache_root: str | None = None):
+        if encoding not in MOTION_ENCODINGS:
+            raise ValueError(f"Unknown motion encoding '{encoding}', expected one of {MOTION_ENCODINGS}.")
+        self.motion_files = resolve_motion_files(motion_files)
+        self.device = device
+        self.encoding = encoding
+        self._body_indexes = [int(i) for i in body_indexes]
+
+        cache_dirs = [convert_motion(motion_file, cache_root) for motion_file in self.motion_files]
+        metas = []
+        for cache_dir in cache_dirs:
+            with open(os.path.join(cache_dir, "meta.json")) as f:
+                metas.append(json.load(f))
+        src_fps = [meta["fps"] for meta in metas]
+        clip_fps = src_fps if target_fps is None else [target_fps] * len(metas)
+        lengths = np.asarray([
+            meta["num_frames"] if target_fps is None else resampled_length(meta["num_frames"], fps, target_fps)
+            for meta, fps in zip(metas, src_fps)
+        ], dtype=np.int64)
+        offsets = np.concatenate([[0], np.cumsum(lengths)])
+
+        # pack every field into one preallocated array, reading the clips through their memory maps
+        for field in MOTION_FIELDS:
+            arrays = [np.load(os.path.join(cache_dir, f"{field}.npy"), mmap_mode="r") for cache_dir in cache_dirs]
+            if field in BODY_FIELDS:
+                arrays = [array[:, self._body_indexes] for array in arrays]
+            if target_fps is not None:
+                arrays = [
+                    resample_frames(array, fps, target_fps, is_quat=field == "body_quat_w")
+                    for array, fps in zip(arrays, src_fps)
+                ]
+            shapes = {array.shape[1:] for array in arrays}
+            if len(shapes) != 1:
+                raise ValueError(f"Motion clips disagree on the '{field}' shape: {shapes}.")
+            packed = np.empty((offsets[-1],) + shapes.pop(), dtype=np.float32)
+            for array, start, end in zip(arrays, offsets[:-1], offsets[1:]):
+                packed[start:end] = array
+            setattr(self, field, torch.from_numpy(packed).to(device))
+        if encoding == "quantized":
+            quantize_fields(self)
+
+        self._tables = {}
+        self.clip_lengths = torch.from_numpy(lengths).to(device)
+        self.clip_offsets = torch.from_numpy(offsets).to(device)
+        self.clip_fps = torch.tensor(clip_fps, dtype=torch.float32, device=device)
+        self.fps = clip_fps[0]
+        self.time_step_total = int(offsets[-1])
+        if clip_weights is None:
+            clip_weights = lengths.astype(np.float64)
+        self.clip_weights = torch.as_tensor(clip_weights, dtype=torch.float32, device=device)
+        if self.clip_weights.shape[0] != self.num_clips:
+            raise ValueError(f"Got {self.clip_weights.shape[0]} clip weights for {self.num_clips} clips.")
+
+    @property
+    def num_clips(self) -> int:
+        return self.clip_lengths.shape[0]
+
+    """
+    Per-env playback.
+    """
+
+    def sample_clips(self, num: int, generator: torch.Generator | None = None) -> torch.Tensor:
+        """``num`` clip ids drawn with the clip weights (clip length by default)."""
+        return torch.multinomial(self.clip_weights, num, replacement=True, generator=generator)
+
+    def assign(self, num_envs: int, mode: str = "cycle", generator: torch.Generator | None = None) -> torch.Tensor:
+        """Returns a clip id per env: ``env % C`` for "cycle", weighted draw for "random"."""
+        if mode == "cycle":
+            return torch.arange(num_envs, device=self.device) % self.num_clips
+        if mode == "random":
+            return self.sample_clips(num_envs, generator)
+        raise ValueError(f"Unknown clip assignment '{mode}', expected one of {CLIP_ASSIGNMENTS}.")
+
+    def clip_start(self, clip_ids: torch.Tensor) -> torch.Tensor:
+        return self.clip_offsets[clip_ids]
+
+    def local_time(self, time_steps: torch.Tensor, clip_ids: torch.Tensor) -> torch.Tensor:
+        """Frame index within the clip of each env."""
+        return time_steps - self.clip_offsets[clip_ids]
+
+    def advance(self, time_steps: torch.Tensor, clip_ids: torch.Tensor, end_mode: str = "loop",
+                steps: int | torch.Tensor = 1, generator: torch.Generator | None = None) -> torch.Tensor:
+        """
+        Step the global frame index of every env, in place.
+
+        Envs running past the end of their clip restart it ("loop") or switch to a newly drawn
+        clip ("resample"), both from its first frame.
+
+        Args:
+            time_steps: Tensor (N,) long, global frame index, updated in place
+            clip_ids:   Tensor (N,) long, clip per env, updated in place for "resample"
+
+        Returns:
+            ended: Tensor (N,) bool, envs whose clip ended this step
+        """
+        time_steps.add_(steps)
+        ended = time_steps >= self.clip_offsets[clip_ids + 1]
+        if end_mode == "resample":
+            clip_ids.copy_(torch.where(ended, self.sample_clips(clip_ids.shape[0], generator), clip_ids))
+        elif end_mode != "loop":
+            raise ValueError(f"Unknown clip end mode '{end_mode}', expected one of {CLIP_END_MODES}.")
+        time_steps.copy_(torch.where(ended, self.clip_offsets[clip_ids], time_steps))
+        return ended
+
+    """
+    Packed playback tables.
+    """
+
+    def root_state_table(self) -> torch.Tensor:
+        """(F, 13) root state (pos, quat, lin vel, ang vel) of the first selected body, packed once."""
+        if "root_state" not in self._tables and self.encoding == "quantized":
+            self._tables["root_state"] = PackedFieldTable([(getattr(self, field), 0) for field in BODY_FIELDS])
+        elif "root_state" not in self._tables:
+            self._tables["root_state"] = torch.cat(
+                [getattr(self, field)[:, 0] for field in BODY_FIELDS], dim=1
+            ).contiguous()
+        return self._tables["root_state"]
+
+    def joint_state_table(self) -> torch.Tensor:
+        """(F, 2 * J) joint positions then joint velocities, packed once."""
+        if "joint_state" not in self._tables and self.encoding == "quantized":
+            self._tables["joint_state"] = PackedFieldTable([(self.joint_pos, None), (self.joint_vel, None)])
+        elif "joint_state" not in self._tables:
+            self._tables["joint_state"] = torch.cat([self.joint_pos, self.joint_vel], dim=1).contiguous()
+        return self._tables["joint_state"]
+
+    def __repr__(self) -> str:
+        return (f"MotionLibrary(clips={self.num_clips}, frames={self.time_step_total}, "
+                f"bodies={len(self._body_indexes)}, encoding={self.encoding!r}, device={self.device})")
+
+
+_MOTION_LIBRARIES: dict[tuple, MotionLibrary] = {}
+_MOTION_LIBRARIES_LOCK = threading.Lock()
+
+
+def get_motion_library(motion_files, body_indexes: Sequence[int], device: str | torch.device = "cpu",
+                       clip_weights: Sequence[float] | None = None, target_fps: float | None = None,
+                       encoding: str = "fp32", cache_root: str | None = None) -> MotionLibrary:
+    """Shared :class:`MotionLibrary` per (clips, bodies, device, weights, fps, encoding), loaded on first use.
+    ``cache_root``: directory of the converted clips, see :func:`convert_motion`."""
+    files = tuple(os.path.realpath(motion_file) for motion_file in resolve_motion_files(motion_files))
+    body_indexes = tuple(int(i) for i in body_indexes)
+    weights = None if clip_weights is None else tuple(float(w) for w in clip_weights)
+    key = (files, body_indexes, str(device), weights, target_fps, encoding)
+    with _MOTION_LIBRARIES_LOCK:
+        library = _MOTION_LIBRARIES.get(key)
+        if library is None:
+            library = MotionLibrary(list(files), body_indexes, device, clip_weights, target_fps, encoding, cache_root)
+            _MOTION_LIBRARIES[key] = library
+        return library
+
+
+def get_motion_source(cfg, body_indexes: Sequence[int], device: str | torch.device = "cpu", consumer: str | None = None):
+    """
+    Motion source of an NPC playback term: a shared :class:`MotionLibrary` when ``cfg.motion_files``
+    is set, else the shared ``MotionStore`` of ``cfg.motion_file``. Both expose the same fields and
+    the ``assign`` / ``advance`` playback interface. ``consumer`` keys the streamed stores per term.
+    """
+    cache_root = getattr(cfg, "motion_cache_dir", None)
+    if getattr(cfg, "motion_files", None) is not None:
+        if getattr(cfg, "motion_mode", "resident") != "resident":
+            raise ValueError(
+                f"Motion mode '{cfg.motion_mode}' (and 'motion_window') is not supported with 'motion_files', the "
+                "clips of a MotionLibrary are packed resident on the device. Stream a single 'motion_file' instead."
+            )
+        return get_motion_library(
+            cfg.motion_files, body_indexes, device, getattr(cfg, "clip_weights", None), getattr(cfg, "motion_fps", None),
+            getattr(cfg, "motion_encoding", "fp32"), cache_root,
+        )
+    if cfg.motion_file is None:
+        raise ValueError("Either 'motion_file' or 'motion_files' must be set.")
+    return get_motion_store(
+        cfg.motion_file, body_indexes, device=device,
+        mode=getattr(cfg, "motion_mode", "resident"), window=getattr(cfg, "motion_window", 512),
+        target_fps=getattr(cfg, "motion_fps", None), encoding=getattr(cfg, "motion_encoding", "fp32"),
+        cache_root=cache_root, consumer=consumer,
+    )
@@ -0,0 +1,397 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import warnings
+import weakref
+from typing import Sequence
+
+import numpy as np
+import torch
+
+from .interpolation import resample_frames, resampled_length
+from .quantization import MOTION_ENCODINGS, PackedFieldTable, quantize_fields
+
+MOTION_FIELDS = ("joint_pos", "joint_vel", "body_pos_w", "body_quat_w", "body_lin_vel_w", "body_ang_vel_w")
+BODY_FIELDS = ("body_pos_w", "body_quat_w", "body_lin_vel_w", "body_ang_vel_w")
+MOTION_MODES = ("resident", "stream")
+
+
+def motion_cache_dir(motion_file: str, cache_root: str | None = None) -> str:
+    """``<motion_file>.mmap`` next to the clip, or ``<cache_root>/<name>-<path hash>.mmap`` (e.g. for read-only datasets)."""
+    path = os.path.realpath(motion_file)
+    if cache_root is None:
+        return path + ".mmap"
+    name = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(cache_root, f"{name}-{hashlib.sha1(path.encode()).hexdigest()[:12]}.mmap")
+
+
+def _temp_path(directory: str, suffix: str) -> str:
+    """Unique temporary file in ``directory`` (same file system, so ``os.replace`` is atomic)."""
+    fd, path = tempfile.mkstemp(suffix=suffix, dir=directory)
+    os.close(fd)
+    return path
+
+
+def _save_npy(path: str, array: np.ndarray):
+    # write then rename, readers never see a partial file and concurrent writers never share a temp file
+    tmp_path = _temp_path(os.path.dirname(path), ".npy")
+    try:
+        np.save(tmp_path, array)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+
+def _save_selected_npy(path: str, shape: tuple, chunks):
+    """Write the (start, rows) ``chunks`` into a new float32 ``.npy`` of ``shape`` through a memory map."""
+    tmp_path = _temp_path(os.path.dirname(path), ".npy")
+    try:
+        out = np.lib.format.open_memmap(tmp_path, mode="w+", dtype=np.float32, shape=shape)
+        for start, rows in chunks:
+            out[start:start + rows.shape[0]] = rows
+        out.flush()
+        del out
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+
+def convert_motion(motion_file: str, cache_root: str | None = None) -> str:
+    """
+    Convert a motion ``.npz`` (beyondMimic layout) once into a directory of ``.npy`` files.
+
+    Each field is stored as a contiguous float32 array that ``np.load(..., mmap_mode="r")`` maps
+    without reading, next to a ``meta.json`` with the fps, frame count and the size / mtime of the
+    source. The conversion is skipped while the source is unchanged.
+
+    Args:
+        motion_file: Source ``.npz`` clip.
+        cache_root: Directory holding the converted clips, None writes them next to the source.
+
+    Returns:
+        The cache directory, see :func:`motion_cache_dir`.
+    """
+    if not os.path.isfile(motion_file):
+        raise FileNotFoundError(f"Invalid file path: {motion_file}")
+    stat = os.stat(motion_file)
+    cache_dir = motion_cache_dir(motion_file, cache_root)
+    meta_path = os.path.join(cache_dir, "meta.json")
+    if os.path.isfile(meta_path):
+        with open(meta_path) as f:
+            meta = json.load(f)
+        if meta.get("source_size") == stat.st_size and meta.get("source_mtime_ns") == stat.st_mtime_ns:
+            return cache_dir
+
+    os.makedirs(cache_dir, exist_ok=True)
+    data = np.load(motion_file)
+    for field in MOTION_FIELDS:
+        _save_npy(os.path.join(cache_dir, f"{field}.npy"), np.ascontiguousarray(data[field], dtype=np.float32))
+    meta = {
+        "fps": np.asarray(data["fps"]).reshape(-1)[0].item(),
+        "num_frames": int(data["joint_pos"].shape[0]),
+        "source_size": stat.st_size,
+        "source_mtime_ns": stat.st_mtime_ns,
+    }
+    tmp_path = _temp_path(cache_dir, ".json")
+    with open(tmp_path, "w") as f:
+        json.dump(meta, f)
+    os.replace(tmp_path, meta_path)
+    return cache_dir
+
+
+class TimeBounds:
+    """
+    Host side ``[first, last]`` of the time step tensors indexing :class:`StreamField` objects.
+
+    Bounds are cached per tensor and stay valid while its version counter is unchanged, so the
+    fields of a store gathered with the same ``time_steps`` share one device sync. Any in-place
+    write (e.g. a reset) invalidates them, :meth:`MotionStore.advance` carries them across the
+    known advance, so steady playback gathers without syncing.
+    """
+
+    def __init__(self):
+        self._bounds: dict[int, tuple] = {}
+
+    def peek(self, time_index: torch.Tensor) -> tuple[int, int] | None:
+        """Cached bounds of ``time_index``, None if unknown or stale."""
+        entry = self._bounds.get(id(time_index))
+        if entry is None or entry[0]() is not time_index or entry[1] != time_index._version:
+            return None
+        return entry[2], entry[3]
+
+    def set(self, time_index: torch.Tensor, first: int, last: int):
+        key = id(time_index)
+        ref = weakref.ref(time_index, lambda _, key=key: self._bounds.pop(key, None))
+        self._bounds[key] = (ref, time_index._version, first, last)
+
+    def get(self, time_index: torch.Tensor) -> tuple[int, int]:
+        """Bounds of ``time_index``, synced from the device when not cached."""
+        bounds = self.peek(time_index)
+        if bounds is None:
+            if time_index.numel() == 0:
+                bounds = (0, 0)
+            else:
+                bounds = tuple(int(v) for v in torch.stack(torch.aminmax(time_index)).tolist())
+            self.set(time_index, *bounds)
+        return bounds
+
+
+class StreamField:
+    """
+    Motion field of a :class:`MotionStore` in streaming mode.
+
+    Only a window of ``window`` frames lives on the device. Indexing with a time tensor (optionally
+    followed by body indices) slides the window to cover the requested frames, the frame bounds of
+    the request come from the :class:`TimeBounds` of the store. Requests spanning more than a window
+    (e.g. envs far apart in the clip) are gathered straight from the memory map, with a warning on
+    the first one: raise the window or keep the envs of a consumer closer in the clip.
+
+    The window is shared by every reader of the field, consumers playing different parts of the clip
+    need their own store (see the ``consumer`` key of :func:`get_motion_store`).
+    """
+
+    def __init__(self, array: np.ndarray, window: int, device: str | torch.device, bounds: TimeBounds | None = None):
+        self._array = array
+        self.window = min(int(window), array.shape[0])
+        self.device = device
+        self.shape = tuple(array.shape)
+        self._bounds = TimeBounds() if bounds is None else bounds
+        self._start = 0
+        # own copy: on the CPU a view would alias the memory map and reloads would overwrite its frames
+        self._buffer = torch.from_numpy(np.array(array[:self.window])).to(device)
+        self.num_loads = 1
+        self.num_direct_reads = 0
+
+    def __len__(self) -> int:
+        return self.shape[0]
+
+    def __getitem__(self, index):
+        time_index, rest = (index[0], index[1:]) if isinstance(index, tuple) else (index, ())
+        time_index = torch.as_tensor(time_index, device=self.device)
+        first, last = self._bounds.get(time_index)
+        if last - first >= self.window:
+            if self.num_direct_reads == 0:
+                warnings.warn(f"Stream motion request spans {last - first + 1} frames, more than the window of "
+                              f"{self.window}: gathering from the memory map. Raise 'motion_window' to keep it resident.")
+            self.num_direct_reads += 1
+            frames = torch.from_numpy(self._array[time_index.cpu().numpy()]).to(self.device)
+            return frames[(slice(None),) + rest] if rest else frames
+        if first < self._start or last >= self._start + self.window:
+            self._load(first)
+        local = time_index - self._start
+        return self._buffer[(local,) + rest]
+
+    def _load(self, first: int):
+        self._start = min(first, self.shape[0] - self.window)
+        frames = torch.from_numpy(np.ascontiguousarray(self._array[self._start:self._start + self.window]))
+        self._buffer.copy_(frames.to(self.device, non_blocking=True))
+        self.num_loads += 1
+
+
+class MotionStore:
+    """
+    Motion clip backed by a memory-mappable on-disk layout, see :func:`convert_motion`.
+
+    Drop-in replacement of beyondMimic's ``MotionLoader`` for the NPC terms: the fields ``joint_pos``,
+    ``joint_vel``, ``body_pos_w``, ``body_quat_w``, ``body_lin_vel_w`` and ``body_ang_vel_w`` index
+    by time step like tensors, with the bodies already selected by ``body_indexes`` (no per-access
+    body gather).
+
+    Modes:
+
+    * ``"resident"``: every field is a device tensor, read once from the memory map.
+    * ``"stream"``: fields are :class:`StreamField` objects keeping ``window`` frames resident,
+      for clips too long to hold on the device.
+
+    ``target_fps`` resamples the clip at load (resident mode), e.g. to store a 120 fps capture at
+    30 fps and interpolate between frames at playback.
+
+    ``encoding="quantized"`` (resident mode) keeps the fields in the compact encoding of
+    :mod:`.quantization`, decoded on the gathered frames only.
+
+    Use :func:`get_motion_store` so that terms playing the same file share one instance.
+    """
+
+    def __init__(
+        self,
+        motion_file: str,
+        body_indexes: Sequence[int],
+        device: str | torch.device = "cpu",
+        mode: str = "resident",
+        window: int = 512,
+        target_fps: float | None = None,
+        encoding: str = "fp32",
+        cache_root: str | None = None,
+    ):
+        if mode not in MOTION_MODES:
+            raise ValueError(f"Unknown motion store mode '{mode}', expected one of {MOTION_MODES}.")
+        if encoding not in MOTION_ENCODINGS:
+            raise ValueError(f"Unknown motion encoding '{encoding}', expected one of {MOTION_ENCODINGS}.")
+        if encoding != "fp32" and mode == "stream":
+            raise ValueError("Quantized motion encoding is not supported in stream mode.")
+        self.motion_file = motion_file
+        self.mode = mode
+        self.encoding = encoding
+        self.device = device
+        self._body_indexes = [int(i) for i in body_indexes]
+        self._window = window
+        self._tables = {}
+        # frame bounds of the time step tensors, shared by the stream fields
+        self._time_bounds = TimeBounds()
+
+        cache_dir = self._cache_dir = convert_motion(motion_file, cache_root)
+        with open(os.path.join(cache_dir, "meta.json")) as f:
+            meta = json.load(f)
+        self.fps = meta["fps"]
+        self.time_step_total = meta["num_frames"]
+        if target_fps is not None and mode == "stream":
+            raise ValueError("Motion resampling is not supported in stream mode, convert the clip offline.")
+        resample = target_fps is not None and target_fps != self.fps
+
+        for field in MOTION_FIELDS:
+            # copy-on-write map: writable for torch, pages stay shared with other processes until written
+            array = np.load(os.path.join(cache_dir, f"{field}.npy"), mmap_mode="c")
+            if field in BODY_FIELDS:
+                if mode == "stream":
+                    # the body selection needs a copy, keep it on disk next to the full field
+                    array = self._selected_bodies(cache_dir, field, array)
+                else:
+                    array = array[:, self._body_indexes]
+            if resample:
+                array = resample_frames(array, self.fps, target_fps, is_quat=field == "body_quat_w")
+            if mode == "stream":
+                value = StreamField(array, window, device, self._time_bounds)
+            else:
+                value = torch.from_numpy(np.ascontiguousarray(array)).to(device)
+            setattr(self, field, value)
+        if resample:
+            self.time_step_total = resampled_length(self.time_step_total, self.fps, target_fps)
+            self.fps = target_fps
+        if encoding == "quantized":
+            quantize_fields(self)
+
+        # single clip view of the MotionLibrary playback interface
+        self.clip_offsets = torch.tensor([0, self.time_step_total], dtype=torch.long, device=device)
+        self.clip_lengths = self.clip_offsets[1:]
+        self.clip_fps = torch.tensor([self.fps], dtype=torch.float32, device=device)
+
+    @property
+    def num_clips(self) -> int:
+        return 1
+
+    def assign(self, num_envs: int, mode: str = "cycle", generator: torch.Generator | None = None) -> torch.Tensor:
+        return torch.zeros(num_envs, dtype=torch.long, device=self.device)
+
+    def sample_clips(self, num: int, generator: torch.Generator | None = None) -> torch.Tensor:
+        return torch.zeros(num, dtype=torch.long, device=self.device)
+
+    def advance(self, time_steps: torch.Tensor, clip_ids: torch.Tensor, end_mode: str = "loop",
+                steps: int | torch.Tensor = 1, generator: torch.Generator | None = None) -> torch.Tensor:
+        """Step ``time_steps`` in place, wrapping at the end of the clip. Returns the envs that wrapped."""
+        bounds = self._time_bounds.peek(time_steps) if isinstance(steps, int) else None
+        time_steps.add_(steps)
+        ended = time_steps >= self.time_step_total
+        time_steps.remainder_(self.time_step_total)
+        if bounds is not None and bounds[1] + steps < self.time_step_total:
+            # no env wrapped, the stream fields keep their bounds without a sync
+            self._time_bounds.set(time_steps, bounds[0] + steps, bounds[1] + steps)
+        return ended
+
+    """
+    Packed playback tables.
+    """
+
+    def root_state_table(self):
+        """(T, 13) root state (pos, quat, lin vel, ang vel) of the first selected body, packed once."""
+        return self._packed_table("root_state", [(field, 0) for field in BODY_FIELDS])
+
+    def joint_state_table(self):
+        """(T, 2 * J) joint positions then joint velocities, packed once."""
+        return self._packed_table("joint_state", [("joint_pos", None), ("joint_vel", None)])
+
+    def _packed_table(self, name: str, parts: list[tuple[str, int | None]]):
+        if name in self._tables:
+            return self._tables[name]
+        if self.encoding == "quantized":
+            # no fp32 copy, rows are decoded at gather time
+            table = PackedFieldTable([(getattr(self, field), body) for field, body in parts])
+        elif self.mode != "stream":
+            table = torch.cat([
+                getattr(self, field) if body is None else getattr(self, field)[:, body] for field, body in parts
+            ], dim=1).contiguous()
+        else:
+            arrays = [getattr(self, field)._array for field, _ in parts]
+            arrays = [array if body is None else array[:, body] for array, (_, body) in zip(arrays, parts)]
+            tag = "_".join(str(i) for i in self._body_indexes)
+            path = os.path.join(self._cache_dir, f"{name}.bodies_{tag}.npy")
+            if not os.path.isfile(path):
+                width = sum(array.shape[1] for array in arrays)
+                _save_selected_npy(path, (self.time_step_total, width), (
+                    (start, np.concatenate([array[start:start + 4096] for array in arrays], axis=1))
+                    for start in range(0, self.time_step_total, 4096)
+                ))
+            table = StreamField(np.load(path, mmap_mode="c"), self._window, self.device, self._time_bounds)
+        self._tables[name] = table
+        return table
+
+    def _selected_bodies(self, cache_dir: str, field: str, array: np.ndarray) -> np.ndarray:
+        tag = "_".join(str(i) for i in self._body_indexes)
+        path = os.path.join(cache_dir, f"{field}.bodies_{tag}.npy")
+        if not os.path.isfile(path):
+            # chunked copy, never holds the full clip in memory
+            _save_selected_npy(path, (array.shape[0], len(self._body_indexes)) + array.shape[2:], (
+                (start, array[start:start + 4096][:, self._body_indexes]) for start in range(0, array.shape[0], 4096)
+            ))
+        return np.load(path, mmap_mode="c")
+
+    def __repr__(self) -> str:
+        return (f"MotionStore(file={self.motion_file!r}, frames={self.time_step_total}, "
+                f"bodies={len(self._body_indexes)}, mode={self.mode!r}, encoding={self.encoding!r}, "
+                f"device={self.device})")
+
+
+_MOTION_STORES: dict[tuple, MotionStore] = {}
+_MOTION_STORES_LOCK = threading.Lock()
+
+
+def get_motion_store(
+    motion_file: str,
+    body_indexes: Sequence[int],
+    device: str | torch.device = "cpu",
+    mode: str = "resident",
+    window: int = 512,
+    target_fps: float | None = None,
+    encoding: str = "fp32",
+    cache_root: str | None = None,
+    consumer: str | None = None,
+) -> MotionStore:
+    """
+    Shared :class:`MotionStore` per (file, bodies, device, mode, window, fps, encoding), loaded on first use.
+
+    In stream mode the store is also keyed by ``consumer`` (e.g. the asset of the playing term): the
+    resident windows follow the frames of their consumer, consumers far apart in the clip would
+    otherwise reload a shared window on every gather.
+    """
+    body_indexes = tuple(int(i) for i in body_indexes)
+    key = (
+        os.path.realpath(motion_file), body_indexes, str(device), mode,
+        int(window) if mode == "stream" else None, target_fps, encoding,
+        consumer if mode == "stream" else None,
+    )
+    with _MOTION_STORES_LOCK:
+        store = _MOTION_STORES.get(key)
+        if store is None:
+            store = MotionStore(motion_file, body_indexes, device, mode, window, target_fps, encoding, cache_root)
+            _MOTION_STORES[key] = store
+        return store
+
+
+def clear_motion_stores():
+    with _MOTION_STORES_LOCK:
+        _MOTION_STORES.clear()
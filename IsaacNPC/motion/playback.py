@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import torch
+
+from .interpolation import interpolate_root_state, lerp_rows, quat_slerp
+
+PLAYBACK_MODES = ("frame", "time")
+
+
+class MotionPlayback:
+    """
+    Continuous time playback of a motion source (``MotionStore`` or ``MotionLibrary``) for N envs.
+
+    Every env keeps a clip, a time within the clip (s) and a playback speed. After each
+    :meth:`advance` the two bracketing global frames and the blend weight are refreshed, readers
+    then interpolate between them: lerp for positions, velocities and joints, slerp for
+    quaternions. Playback is decoupled from the stored fps, clips can be stored at a lower rate
+    than the control loop and played at any speed per env.
+    """
+
+    def __init__(self, motion, clip_ids: torch.Tensor, speed=1.0, end_mode: str = "loop"):
+        """
+        Args:
+            motion: Motion source with ``clip_offsets``, ``clip_lengths`` and ``clip_fps``.
+            clip_ids: Tensor (N,) long, initial clip per env.
+            speed: Playback speed, a float or a (min, max) range drawn uniformly per env.
+            end_mode: "loop" restarts the clip, "resample" draws a new clip.
+        """
+        self.motion = motion
+        self.end_mode = end_mode
+        self.clip_ids = clip_ids
+        self.num_envs = clip_ids.shape[0]
+        self.device = clip_ids.device
+        self.time = torch.zeros(self.num_envs, device=self.device)
+        if isinstance(speed, (tuple, list)):
+            self.speed = torch.empty(self.num_envs, device=self.device).uniform_(float(speed[0]), float(speed[1]))
+        else:
+            self.speed = torch.full((self.num_envs,), float(speed), device=self.device)
+        self._clip_duration = (motion.clip_lengths - 1).float() / motion.clip_fps
+
+        self.frame0 = torch.zeros(self.num_envs, dtype=torch.long, device=self.device)
+        self.frame1 = torch.zeros_like(self.frame0)
+        self.alpha = torch.zeros(self.num_envs, device=self.device)
+        self._update_frames()
+
+    def _update_frames(self):
+        clip_ids = self.clip_ids
+        u = self.time * self.motion.clip_fps[clip_ids]
+        last = self.motion.clip_lengths[clip_ids] - 1
+        local0 = torch.minimum(torch.floor(u).long(), last)
+        local1 = torch.minimum(local0 + 1, last)
+        start = self.motion.clip_offsets[clip_ids]
+        torch.add(start, local0, out=self.frame0)
+        torch.add(start, local1, out=self.frame1)
+        torch.clamp(u - local0, 0.0, 1.0, out=self.alpha)
+
+    def advance(self, dt: float) -> torch.Tensor:
+        """
+        Advance every env by ``dt * speed`` seconds.
+
+        Returns:
+            ended: Tensor (N,) bool, envs whose clip ended during this step
+        """
+        self.time.add_(self.speed * dt)
+        duration = self._clip_duration[self.clip_ids]
+        ended = self.time > duration
+        # carry the overshoot into the next lap
+        overshoot = torch.where(duration > 0, torch.fmod(self.time, duration.clamp(min=1e-6)), torch.zeros_like(self.time))
+        if self.end_mode == "resample":
+            new_clips = self.motion.sample_clips(self.num_envs)
+            self.clip_ids.copy_(torch.where(ended, new_clips, self.clip_ids))
+            overshoot = torch.minimum(overshoot, self._clip_duration[self.clip_ids])
+        self.time.copy_(torch.where(ended, overshoot, self.time))
+        self._update_frames()
+        return ended
+
+    def reset(self, env_ids=None, time: float = 0.0):
+        if env_ids is None:
+            self.time[:] = time
+        else:
+            self.time[env_ids] = time
+        self._update_frames()
+
+    """
+    Interpolated reads.
+    """
+
+    def root_state(self, out: torch.Tensor | None = None) -> torch.Tensor:
+        """(N, 13) interpolated root state from the packed root table, env frame."""
+        return interpolate_root_state(self.motion.root_state_table(), self.frame0, self.frame1, self.alpha, out)
+
+    def joint_state(self, out: torch.Tensor | None = None) -> torch.Tensor:
+        """(N, 2 * J) interpolated joint positions and velocities."""
+        state = lerp_rows(self.motion.joint_state_table(), self.frame0, self.frame1, self.alpha)
+        return out.copy_(state) if out is not None else state
+
+    def body_pos(self, body: int) -> torch.Tensor:
+        """(N, 3) interpolated position of one selected body."""
+        field = self.motion.body_pos_w
+        return torch.lerp(field[self.frame0, body], field[self.frame1, body], self.alpha.unsqueeze(1))
+
+    def body_quat(self, body: int) -> torch.Tensor:
+        """(N, 4) interpolated orientation of one selected body."""
+        field = self.motion.body_quat_w
+        return quat_slerp(field[self.frame0, body], field[self.frame1, body], self.alpha)
@@ -0,0 +1,197 @@
+from __future__ import annotations
+
+import math
+
+import torch
+
+MOTION_ENCODINGS = ("fp32", "quantized")
+# storage kind of every motion field in the quantized encoding
+QUANTIZED_KINDS = {
+    "joint_pos": "affine16",
+    "joint_vel": "fp16",
+    "body_pos_w": "affine16",
+    "body_quat_w": "quat",
+    "body_lin_vel_w": "fp16",
+    "body_ang_vel_w": "fp16",
+}
+
+_QUAT_BITS = 10
+_QUAT_LEVELS = (1 << _QUAT_BITS) - 1
+_QUAT_RANGE = 1.0 / math.sqrt(2.0)
+
+
+def encode_smallest_three(quat: torch.Tensor) -> torch.Tensor:
+    """
+    (..., 4) unit quaternions -> (...,) int32.
+
+    The largest component is dropped (recovered from the unit norm), its index takes 2 bits and
+    the other three components 10 bits each over [-1/sqrt(2), 1/sqrt(2)].
+    """
+    quat = quat / torch.norm(quat, dim=-1, keepdim=True).clamp(min=1e-8)
+    largest = quat.abs().argmax(dim=-1, keepdim=True)
+    # q and -q are the same rotation, make the dropped component positive
+    quat = quat * torch.where(quat.gather(-1, largest) < 0, -1.0, 1.0)
+    others = _others(quat.device)[largest.squeeze(-1)]
+    comps = quat.gather(-1, others)
+    levels = torch.round((comps / _QUAT_RANGE + 1.0) * 0.5 * _QUAT_LEVELS).clamp(0, _QUAT_LEVELS).long()
+    packed = (largest.squeeze(-1).long() << (3 * _QUAT_BITS)) | (levels[..., 0] << (2 * _QUAT_BITS)) \
+        | (levels[..., 1] << _QUAT_BITS) | levels[..., 2]
+    # keep the bit pattern, wrap into the signed int32 range
+    return torch.where(packed >= 2**31, packed - 2**32, packed).to(torch.int32)
+
+
+def decode_smallest_three(packed: torch.Tensor) -> torch.Tensor:
+    """(...,) int32 -> (..., 4) unit quaternions."""
+    bits = packed.long() & 0xFFFFFFFF
+    largest = bits >> (3 * _QUAT_BITS)
+    mask = _QUAT_LEVELS
+    levels = torch.stack([(bits >> (2 * _QUAT_BITS)) & mask, (bits >> _QUAT_BITS) & mask, bits & mask], dim=-1)
+    comps = (levels.float() / _QUAT_LEVELS * 2.0 - 1.0) * _QUAT_RANGE
+    missing = torch.sqrt((1.0 - comps.square().sum(dim=-1, keepdim=True)).clamp(min=0.0))
+    quat = torch.empty(packed.shape + (4,), device=packed.device)
+    quat.scatter_(-1, _others(packed.device)[largest], comps)
+    quat.scatter_(-1, largest.unsqueeze(-1), missing)
+    return quat
+
+
+_OTHERS_CACHE: dict[torch.device, torch.Tensor] = {}
+
+
+def _others(device) -> torch.Tensor:
+    device = torch.device(device)
+    if device not in _OTHERS_CACHE:
+        _OTHERS_CACHE[device] = torch.tensor([[1, 2, 3], [0, 2, 3], [0, 1, 3], [0, 1, 2]], device=device)
+    return _OTHERS_CACHE[device]
+
+
+class QuantizedField:
+    """
+    Compact storage of one (T, ...) motion field, decoded on the gathered rows only.
+
+    Kinds:
+
+    * ``"affine16"``: int16 with a per-channel scale and offset over the clip range.
+    * ``"quat"``: smallest-three quaternions packed in one int32.
+    * ``"fp16"``: half precision.
+
+    Indexes like the fp32 tensor it replaces (``field[time_steps]``, ``field[time_steps, body]``)
+    and returns float32.
+    """
+
+    def __init__(self, values: torch.Tensor, kind: str):
+        self.kind = kind
+        self.shape = tuple(values.shape)
+        values = values.float()
+        if kind == "affine16":
+            low = values.amin(dim=0)
+            high = values.amax(dim=0)
+            self.scale = ((high - low) / 65535.0).clamp(min=1e-12)
+            self.offset = low
+            levels = torch.round((values - low) / self.scale).clamp(0, 65535)
+            self.data = (levels - 32768.0).to(torch.int16)
+        elif kind == "quat":
+            self.data = encode_smallest_three(values)
+        elif kind == "fp16":
+            self.data = values.half()
+        else:
+            raise ValueError(f"Unknown quantized field kind '{kind}'.")
+
+    def __len__(self) -> int:
+        return self.shape[0]
+
+    @property
+    def nbytes(self) -> int:
+        extra = self.scale.nbytes + self.offset.nbytes if self.kind == "affine16" else 0
+        return self.data.nbytes + extra
+
+    def __getitem__(self, index) -> torch.Tensor:
+        data = self.data[index]
+        if self.kind == "affine16":
+            scale, offset = self.scale, self.offset
+            if isinstance(index, tuple) and len(index) > 1:
+                # channel dims indexed too, slice the per-channel parameters the same way
+                scale = scale[index[1:]]
+                offset = offset[index[1:]]
+            return (data.float() + 32768.0) * scale + offset
+        if self.kind == "quat":
+            return decode_smallest_three(data)
+        return data.float()
+
+
+class PackedFieldTable:
+    """
+    Packed (T, width) playback table assembled from quantized fields at gather time.
+
+    Stands in for the fp32 root / joint state tables: every segment is one field (optionally one
+    body of it), decoded only for the requested rows straight into its slice of the output.
+    """
+
+    def __init__(self, segments: list[tuple[QuantizedField, int | None]]):
+        self.segments = segments
+        self.widths = [field.shape[-1] for field, _ in segments]
+        self.shape = (segments[0][0].shape[0], sum(self.widths))
+
+    def index_select(self, index: torch.Tensor, out: torch.Tensor | None = None) -> torch.Tensor:
+        if out is None:
+            out = torch.empty(index.shape[0], self.shape[1], device=index.device)
+        start = 0
+        for (field, body), width in zip(self.segments, self.widths):
+            out[:, start:start + width] = field[index] if body is None else field[index, body]
+            start += width
+        return out
+
+    def __getitem__(self, index: torch.Tensor) -> torch.Tensor:
+        return self.index_select(index)
+
+
+def quantize_fields(source) -> dict[str, QuantizedField]:
+    """Replace the fp32 fields of a resident motion source by their quantized encoding, in place."""
+    quantized = {}
+    for field, kind in QUANTIZED_KINDS.items():
+        quantized[field] = QuantizedField(getattr(source, field), kind)
+        setattr(source, field, quantized[field])
+    return quantized
+
+
+def quantization_report(source) -> dict[str, dict[str, float]]:
+    """
+    Reconstruction error and memory of the quantized encoding for a fp32 motion source.
+
+    Returns per field the max / rms absolute error (the geodesic angle in degrees for
+    quaternions) and the fp32 and encoded sizes in bytes.
+    """
+    report = {}
+    for field, kind in QUANTIZED_KINDS.items():
+        values = getattr(source, field)
+        if not isinstance(values, torch.Tensor):
+            raise TypeError(f"Field '{field}' is not a fp32 tensor, build the report on an fp32 source.")
+        encoded = QuantizedField(values, kind)
+        decoded = encoded[torch.arange(values.shape[0], device=values.device)]
+        if kind == "quat":
+            reference = values / torch.norm(values, dim=-1, keepdim=True).clamp(min=1e-8)
+            dot = (reference * decoded).sum(dim=-1).abs().clamp(max=1.0)
+            error = torch.rad2deg(2.0 * torch.acos(dot))
+        else:
+            error = (decoded - values).abs()
+        report[field] = {
+            "kind": kind,
+            "max_err": error.max().item(),
+            "rms_err": error.square().mean().sqrt().item(),
+            "fp32_bytes": values.nbytes,
+            "encoded_bytes": encoded.nbytes,
+        }
+    return report
+
+
+def format_quantization_report(report: dict[str, dict[str, float]]) -> str:
+    lines = [f"{'field':<16}{'kind':>10}{'max_err':>14}{'rms_err':>14}{'ratio':>10}"]
+    total_fp32 = total_encoded = 0
+    for field, row in report.items():
+        unit = " deg" if row["kind"] == "quat" else ""
+        ratio = row["fp32_bytes"] / max(row["encoded_bytes"], 1)
+        lines.append(f"{field:<16}{row['kind']:>10}{row['max_err']:>14.3e}{row['rms_err']:>14.3e}{ratio:>9.2f}x{unit}")
+        total_fp32 += row["fp32_bytes"]
+        total_encoded += row["encoded_bytes"]
+    lines.append(f"total: {total_fp32 / 2**20:.2f} MiB fp32 -> {total_encoded / 2**20:.2f} MiB encoded "
+                 f"({total_fp32 / max(total_encoded, 1):.2f}x)")
+    return "\n".join(lines)
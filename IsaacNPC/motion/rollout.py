@@ -0,0 +1,274 @@
+from __future__ import annotations
+
+import atexit
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Sequence
+
+import numpy as np
+import torch
+
+from .motion_library import CLIP_ASSIGNMENTS, CLIP_END_MODES
+
+ROOT_STATE_DIM = 13
+
+
+def _chunk_path(directory: str, index: int) -> str:
+    return os.path.join(directory, f"chunk_{index:05d}.npy")
+
+
+class RolloutRecorder:
+    """
+    Append-only on-disk recorder of per-env root and joint states (a baked rollout).
+
+    Layout of ``directory``:
+
+    * ``chunk_00000.npy``, ``chunk_00001.npy``, ...: float32 ``(frames, envs, 13 + 2 * J)``, time
+      major, each row the env-frame root state (pos, quat, lin vel, ang vel) then joint positions
+      and joint velocities.
+    * ``meta.json``: fps, env / joint counts, joint names and the length of every chunk written so
+      far. Rewritten (write then rename) after each chunk, a rollout is readable while recording.
+
+    :meth:`record` copies one frame into a device staging chunk, nothing else happens on the hot
+    path. A full chunk is copied to host memory (pinned, asynchronous on CUDA) and saved by a
+    background thread while the next chunk fills the other staging buffer. Call :meth:`close` to
+    write the last partial chunk, it also runs at interpreter exit.
+
+    Replay with :class:`BakedRollout` / ``NPCActionReplay``.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        num_envs: int,
+        num_joints: int,
+        fps: float,
+        device: str | torch.device = "cpu",
+        chunk_frames: int = 256,
+        max_frames: int | None = None,
+        joint_names: Sequence[str] | None = None,
+    ):
+        if os.path.isfile(os.path.join(directory, "meta.json")):
+            raise FileExistsError(f"'{directory}' already holds a rollout, record into a new directory.")
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.num_envs = num_envs
+        self.num_joints = num_joints
+        self.fps = float(fps)
+        self.device = torch.device(device)
+        self.chunk_frames = int(chunk_frames)
+        self.max_frames = max_frames
+        self.joint_names = list(joint_names) if joint_names is not None else None
+        self.width = ROOT_STATE_DIM + 2 * num_joints
+        self.num_frames = 0
+        self.closed = False
+
+        # double buffered staging chunks, one filling while the other is copied out and saved
+        shape = (self.chunk_frames, num_envs, self.width)
+        self._staging = [torch.zeros(shape, device=self.device) for _ in range(2)]
+        self._cuda = self.device.type == "cuda"
+        self._host = [torch.zeros(shape, pin_memory=True) for _ in range(2)] if self._cuda else None
+        self._pending = [None, None]
+        self._slot = 0
+        self._row = 0
+        self._num_chunks = 0
+        self._chunk_lengths: list[int] = []
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="npc-rollout-writer")
+        self._write_meta(complete=False)
+        atexit.register(self.close)
+
+    def record(self, root_state: torch.Tensor, joint_pos: torch.Tensor, joint_vel: torch.Tensor,
+               origins: torch.Tensor | None = None):
+        """
+        Append one frame of every env.
+
+        Args:
+            root_state: Tensor (E, 13) world root state
+            joint_pos:  Tensor (E, J)
+            joint_vel:  Tensor (E, J)
+            origins:    Tensor (E, 3) optional env origins, subtracted to store env-frame positions
+        """
+        if self.closed:
+            return
+        row = self._staging[self._slot][self._row]
+        row[:, :ROOT_STATE_DIM].copy_(root_state)
+        if origins is not None:
+            row[:, :3].sub_(origins)
+        row[:, ROOT_STATE_DIM:ROOT_STATE_DIM + self.num_joints].copy_(joint_pos)
+        row[:, ROOT_STATE_DIM + self.num_joints:].copy_(joint_vel)
+        self._row += 1
+        self.num_frames += 1
+        if self._row == self.chunk_frames:
+            self._flush()
+        if self.max_frames is not None and self.num_frames >= self.max_frames:
+            self.close()
+
+    def _flush(self):
+        if self._row == 0:
+            return
+        slot, rows = self._slot, self._row
+        staging = self._staging[slot][:rows]
+        event = None
+        if self._cuda:
+            host = self._host[slot][:rows]
+            host.copy_(staging, non_blocking=True)
+            event = torch.cuda.Event()
+            event.record()
+        else:
+            host = staging
+        self._pending[slot] = self._writer.submit(self._write_chunk, self._num_chunks, host, event)
+        self._num_chunks += 1
+        # the next chunk fills the other buffer once its previous save is done
+        self._slot, self._row = 1 - slot, 0
+        if self._pending[self._slot] is not None:
+            self._pending[self._slot].result()
+            self._pending[self._slot] = None
+
+    def _write_chunk(self, index: int, host: torch.Tensor, event):
+        if event is not None:
+            event.synchronize()
+        path = _chunk_path(self.directory, index)
+        # write then rename, readers never see a partial chunk
+        np.save(path[:-len(".npy")] + ".tmp.npy", host.numpy())
+        os.replace(path[:-len(".npy")] + ".tmp.npy", path)
+        self._chunk_lengths.append(host.shape[0])
+        self._write_meta(complete=False)
+
+    def _write_meta(self, complete: bool):
+        meta = {
+            "fps": self.fps,
+            "num_envs": self.num_envs,
+            "num_joints": self.num_joints,
+            "joint_names": self.joint_names,
+            "chunk_lengths": list(self._chunk_lengths),
+            "num_frames": int(sum(self._chunk_lengths)),
+            "complete": complete,
+        }
+        meta_path = os.path.join(self.directory, "meta.json")
+        with open(meta_path + ".tmp", "w") as f:
+            json.dump(meta, f)
+        os.replace(meta_path + ".tmp", meta_path)
+
+    def close(self):
+        """Save the last partial chunk, wait for the writer and mark the rollout complete."""
+        if self.closed:
+            return
+        self.closed = True
+        self._flush()
+        self._writer.shutdown(wait=True)
+        self._write_meta(complete=True)
+        atexit.unregister(self.close)
+
+    def __repr__(self) -> str:
+        return (f"RolloutRecorder(dir={self.directory!r}, envs={self.num_envs}, joints={self.num_joints}, "
+                f"frames={self.num_frames}, closed={self.closed})")
+
+
+class BakedRollout:
+    """
+    Rollout recorded by :class:`RolloutRecorder`, exposed as a motion source of ``NPCActionFK``.
+
+    Every recorded env is one track, played like a clip of a ``MotionLibrary``: tracks are packed
+    track major into a ``(K * T, 13)`` root table and a ``(K * T, 2 * J)`` joint table, so that the
+    current frame of all envs is one gather whatever track each env plays. ``tracks`` loads a
+    subset of the recorded envs.
+
+    Chunks are read through their memory maps and packed once into device tensors.
+    """
+
+    def __init__(self, directory: str, device: str | torch.device = "cpu", tracks: Sequence[int] | None = None):
+        meta_path = os.path.join(directory, "meta.json")
+        if not os.path.isfile(meta_path):
+            raise FileNotFoundError(f"No baked rollout found in '{directory}'.")
+        with open(meta_path) as f:
+            meta = json.load(f)
+        chunk_lengths = meta["chunk_lengths"]
+        if len(chunk_lengths) == 0:
+            raise ValueError(f"Baked rollout '{directory}' holds no frames yet.")
+        self.directory = directory
+        self.device = device
+        self.fps = meta["fps"]
+        self.num_joints = meta["num_joints"]
+        self.joint_names = meta["joint_names"]
+        self.complete = meta["complete"]
+        tracks = list(range(meta["num_envs"])) if tracks is None else [int(t) for t in tracks]
+        num_frames = int(sum(chunk_lengths))
+
+        root = np.empty((len(tracks), num_frames, ROOT_STATE_DIM), dtype=np.float32)
+        joint = np.empty((len(tracks), num_frames, 2 * self.num_joints), dtype=np.float32)
+        start = 0
+        for index, length in enumerate(chunk_lengths):
+            chunk = np.load(_chunk_path(directory, index), mmap_mode="r")[:, tracks]   # (F, K, D)
+            root[:, start:start + length] = chunk[..., :ROOT_STATE_DIM].transpose(1, 0, 2)
+            joint[:, start:start + length] = chunk[..., ROOT_STATE_DIM:].transpose(1, 0, 2)
+            start += length
+        self._root_table = torch.from_numpy(root.reshape(-1, ROOT_STATE_DIM)).to(device)
+        self._joint_table = torch.from_numpy(joint.reshape(-1, 2 * self.num_joints)).to(device)
+
+        self.tracks = tracks
+        self.time_step_total = len(tracks) * num_frames
+        self.clip_lengths = torch.full((len(tracks),), num_frames, dtype=torch.long, device=device)
+        self.clip_offsets = torch.arange(len(tracks) + 1, device=device) * num_frames
+        self.clip_fps = torch.full((len(tracks),), float(self.fps), device=device)
+
+    @property
+    def num_clips(self) -> int:
+        return self.clip_lengths.shape[0]
+
+    def sample_clips(self, num: int, generator: torch.Generator | None = None) -> torch.Tensor:
+        return torch.randint(0, self.num_clips, (num,), generator=generator, device=self.device)
+
+    def assign(self, num_envs: int, mode: str = "cycle", generator: torch.Generator | None = None) -> torch.Tensor:
+        """Returns a track id per env: ``env % K`` for "cycle", uniform draw for "random"."""
+        if mode == "cycle":
+            return torch.arange(num_envs, device=self.device) % self.num_clips
+        if mode == "random":
+            return self.sample_clips(num_envs, generator)
+        raise ValueError(f"Unknown clip assignment '{mode}', expected one of {CLIP_ASSIGNMENTS}.")
+
+    def advance(self, time_steps: torch.Tensor, clip_ids: torch.Tensor, end_mode: str = "loop",
+                steps: int | torch.Tensor = 1, generator: torch.Generator | None = None) -> torch.Tensor:
+        """Step the global frame index of every env in place, see ``MotionLibrary.advance``."""
+        time_steps.add_(steps)
+        ended = time_steps >= self.clip_offsets[clip_ids + 1]
+        if end_mode == "resample":
+            clip_ids.copy_(torch.where(ended, self.sample_clips(clip_ids.shape[0], generator), clip_ids))
+        elif end_mode != "loop":
+            raise ValueError(f"Unknown clip end mode '{end_mode}', expected one of {CLIP_END_MODES}.")
+        time_steps.copy_(torch.where(ended, self.clip_offsets[clip_ids], time_steps))
+        return ended
+
+    def root_state_table(self) -> torch.Tensor:
+        """(K * T, 13) env-frame root state."""
+        return self._root_table
+
+    def joint_state_table(self) -> torch.Tensor:
+        """(K * T, 2 * J) joint positions then joint velocities."""
+        return self._joint_table
+
+    def __repr__(self) -> str:
+        return (f"BakedRollout(dir={self.directory!r}, tracks={self.num_clips}, "
+                f"frames={int(self.clip_lengths[0])}, joints={self.num_joints}, device={self.device})")
+
+
+_BAKED_ROLLOUTS: dict[tuple, BakedRollout] = {}
+_BAKED_ROLLOUTS_LOCK = threading.Lock()
+
+
+def get_baked_rollout(directory: str, device: str | torch.device = "cpu",
+                      tracks: Sequence[int] | None = None) -> BakedRollout:
+    """Shared :class:`BakedRollout` per (directory, device, tracks), loaded on first use."""
+    key = (os.path.realpath(directory), str(device), None if tracks is None else tuple(int(t) for t in tracks))
+    with _BAKED_ROLLOUTS_LOCK:
+        rollout = _BAKED_ROLLOUTS.get(key)
+        if rollout is None:
+            rollout = BakedRollout(directory, device, tracks)
+            _BAKED_ROLLOUTS[key] = rollout
+        return rollout
+
+
+def clear_baked_rollouts():
+    with _BAKED_ROLLOUTS_LOCK:
+        _BAKED_ROLLOUTS.clear()
@@ -0,0 +1,8 @@
+from .npc_index import NPCIndex, get_npc_index
+from .npc_observations import (
+    nearest_npc_heading,
+    nearest_npc_rel_pos,
+    nearest_npc_state,
+    nearest_npc_vel,
+    npc_count_in_radius,
+)
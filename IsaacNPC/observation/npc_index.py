@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+import torch
+from typing import TYPE_CHECKING, Sequence
+
+import isaaclab.utils.math as math_utils
+from isaaclab.assets import Articulation
+
+from IsaacNPC.planner.avoidance import SpatialHash
+
+if TYPE_CHECKING:
+    from isaaclab.envs import ManagerBasedEnv
+
+
+class NPCIndex:
+    """
+    Per-step snapshot of the NPC root states of every env, shared by all queries of a step.
+
+    The root states of the M NPC assets are gathered once into packed (N, M, ...) tensors (env
+    frame positions, yaw, world velocities). k-nearest queries run a per-env (N, M) distance and a
+    ``topk``, radius queries go through a :class:`SpatialHash` over all N * M agents (grouped by
+    env) that is built lazily on the first radius query of the step. The hash cell grows to the
+    largest radius queried (or requested with :meth:`reserve_radius`), so that 3 x 3 cells cover it.
+
+    Use :func:`get_npc_index` to share one index between observation terms. It is rebuilt at most
+    once per physics step, or after :meth:`invalidate` (called by the terms on reset).
+    """
+
+    def __init__(self, env: ManagerBasedEnv, asset_names: Sequence[str], hash_cell_size: float = 2.0):
+        self._env = env
+        self.asset_names = list(asset_names)
+        if len(self.asset_names) == 0:
+            raise ValueError("NPC index requires at least one NPC asset name.")
+        self.assets: list[Articulation] = [env.scene[name] for name in self.asset_names]
+        self.num_envs = env.num_envs
+        self.num_npcs = len(self.assets)
+        self.device = env.device
+
+        self.pos = torch.zeros(self.num_envs, self.num_npcs, 3, device=self.device)
+        self.yaw = torch.zeros(self.num_envs, self.num_npcs, device=self.device)
+        self.vel = torch.zeros(self.num_envs, self.num_npcs, 2, device=self.device)
+        self._env_ids = torch.arange(self.num_envs, device=self.device)
+        self._group = self._env_ids.repeat_interleave(self.num_npcs)
+        self._hash = SpatialHash(hash_cell_size, max_per_cell=max(8, self.num_npcs))
+        self._hash_valid = False
+        self._step = None
+        self.num_builds = 0
+
+    @staticmethod
+    def _step_counter(env) -> int:
+        return getattr(env, "_sim_step_counter", getattr(env, "common_step_counter", 0))
+
+    def invalidate(self):
+        self._step = None
+
+    def reserve_radius(self, radius: float):
+        """Grow the hash cell to at least ``radius``, the hash is rebuilt on the next radius query."""
+        if radius > self._hash.cell_size:
+            self._hash.cell_size = float(radius)
+            self._hash_valid = False
+
+    def update(self) -> NPCIndex:
+        """Gather the NPC root states, a no-op if already done for the current physics step."""
+        step = self._step_counter(self._env)
+        if step == self._step:
+            return self
+        origins = self._env.scene.env_origins.unsqueeze(1)
+        torch.stack([asset.data.root_pos_w for asset in self.assets], dim=1, out=self.pos)
+        self.pos.sub_(origins)
+        quat = torch.stack([asset.data.root_quat_w for asset in self.assets], dim=1)
+        _, _, yaw = math_utils.euler_xyz_from_quat(quat.flatten(0, 1))
+        self.yaw.copy_(yaw.view(self.num_envs, self.num_npcs))
+        torch.stack([asset.data.root_lin_vel_w[:, :2] for asset in self.assets], dim=1, out=self.vel)
+        self._hash_valid = False
+        self._step = step
+        self.num_builds += 1
+        return self
+
+    """
+    Queries.
+    """
+
+    def knn(self, query_pos: torch.Tensor, k: int, max_distance: float = float("inf")):
+        """
+        K nearest NPCs of each env to one query point per env.
+
+        Args:
+            query_pos: Tensor (N, 2) env-frame xy, e.g. the learning agent root
+            k: Number of neighbors, padded when the env has fewer NPCs
+            max_distance: NPCs further than this are reported invalid (m)
+
+        Returns:
+            idx:   Tensor (N, k) long, NPC slot within the env (0 where invalid)
+            dist:  Tensor (N, k)
+            valid: Tensor (N, k) bool, sorted nearest first
+        """
+        self.update()
+        dist = torch.norm(self.pos[..., :2] - query_pos.unsqueeze(1), dim=-1)          # (N, M)
+        num = min(k, self.num_npcs)
+        dist, idx = torch.topk(dist, num, dim=1, largest=False)
+        if num < k:
+            pad = k - num
+            dist = torch.cat([dist, dist.new_full((self.num_envs, pad), float("inf"))], dim=1)
+            idx = torch.cat([idx, idx.new_zeros((self.num_envs, pad))], dim=1)
+        valid = dist < max_distance
+        return idx, dist, valid
+
+    def radius(self, query_pos: torch.Tensor, radius: float):
+        """
+        All NPCs of the same env within ``radius`` of each query point.
+
+        Args:
+            query_pos: Tensor (N, 2) env-frame xy, one query per env
+
+        Returns:
+            idx:   Tensor (N, C) long, NPC slot within the env
+            valid: Tensor (N, C) bool
+            dist:  Tensor (N, C)
+        """
+        self.update()
+        self.reserve_radius(radius)
+        if not self._hash_valid:
+            self._hash.build(self.pos[..., :2].reshape(-1, 2), self._group)
+            self._hash_valid = True
+        ids, valid, _, dist = self._hash.neighbors(query_pos, radius, self._env_ids)
+        return ids - self._group[ids] * self.num_npcs, valid, dist
+
+    def gather(self, idx: torch.Tensor):
+        """Packed NPC states (pos (N, k, 3), yaw (N, k), vel (N, k, 2)) at per-env slots ``idx``."""
+        return (
+            self.pos.gather(1, idx.unsqueeze(-1).expand(-1, -1, 3)),
+            self.yaw.gather(1, idx),
+            self.vel.gather(1, idx.unsqueeze(-1).expand(-1, -1, 2)),
+        )
+
+
+def get_npc_index(env: ManagerBasedEnv, asset_names: Sequence[str], hash_cell_size: float | None = None) -> NPCIndex:
+    """
+    Shared :class:`NPCIndex` of ``env`` for ``asset_names``, created on first use.
+
+    ``hash_cell_size`` grows the hash cell of the shared index, so it ends up sized to the largest
+    radius of all the terms that use it.
+    """
+    indices = env.__dict__.setdefault("_npc_indices", {})
+    key = tuple(asset_names)
+    if key not in indices:
+        indices[key] = NPCIndex(env, key)
+    if hash_cell_size is not None:
+        indices[key].reserve_radius(hash_cell_size)
+    return indices[key]
@@ -0,0 +1,122 @@
+"""Observation terms on the K nearest NPCs of the learning agent.
+
+All terms of an env share one :class:`NPCIndex` per NPC asset list, so the NPC root states are
+gathered once per physics step however many terms query them. Quantities are expressed in the
+heading (yaw) frame of the observing robot and zeroed for missing neighbors (fewer NPCs than ``k``
+or further than ``max_distance``), nearest first.
+
+Example::
+
+    npc_state = ObsTerm(
+        func=nearest_npc_state,
+        params={"npc_asset_names": ["npc_0", "npc_1", "npc_2"], "k": 2, "max_distance": 5.0},
+    )
+"""
+
+from __future__ import annotations
+
+import torch
+from typing import TYPE_CHECKING, Sequence
+
+import isaaclab.utils.math as math_utils
+from isaaclab.managers import ManagerTermBase, SceneEntityCfg
+from isaaclab.managers import ObservationTermCfg as ObsTerm
+
+from .npc_index import get_npc_index
+
+if TYPE_CHECKING:
+    from isaaclab.envs import ManagerBasedEnv
+
+
+class _nearest_npc_term(ManagerTermBase):
+    """Shared k-NN query of the nearest NPC terms."""
+
+    def __init__(self, cfg: ObsTerm, env: ManagerBasedEnv):
+        super().__init__(cfg, env)
+        self.index = get_npc_index(env, cfg.params["npc_asset_names"])
+
+    def reset(self, env_ids=None):
+        # NPC states of reset envs are rewritten without a physics step
+        self.index.invalidate()
+
+    def _query(self, env: ManagerBasedEnv, asset_cfg: SceneEntityCfg, k: int, max_distance: float):
+        """Returns rel_pos (N, k, 2), rel_yaw (N, k), rel_vel (N, k, 2), valid (N, k) in the robot heading frame."""
+        robot = env.scene[asset_cfg.name]
+        pos = robot.data.root_pos_w[:, :2] - env.scene.env_origins[:, :2]
+        _, _, yaw = math_utils.euler_xyz_from_quat(robot.data.root_quat_w)
+
+        idx, _, valid = self.index.knn(pos, k, max_distance)
+        npc_pos, npc_yaw, npc_vel = self.index.gather(idx)
+
+        cos_yaw = torch.cos(yaw).unsqueeze(1)
+        sin_yaw = torch.sin(yaw).unsqueeze(1)
+
+        def to_heading_frame(v):
+            return torch.stack([cos_yaw * v[..., 0] + sin_yaw * v[..., 1], -sin_yaw * v[..., 0] + cos_yaw * v[..., 1]], dim=-1)
+
+        rel_pos = to_heading_frame(npc_pos[..., :2] - pos.unsqueeze(1))
+        rel_vel = to_heading_frame(npc_vel - robot.data.root_lin_vel_w[:, :2].unsqueeze(1))
+        rel_yaw = npc_yaw - yaw.unsqueeze(1)
+        return rel_pos, rel_yaw, rel_vel, valid
+
+
+class nearest_npc_rel_pos(_nearest_npc_term):
+    """Relative xy of the K nearest NPCs, (N, 2 * k)."""
+
+    def __call__(self, env: ManagerBasedEnv, npc_asset_names: Sequence[str], k: int = 4, max_distance: float = 5.0,
+                 asset_cfg: SceneEntityCfg = SceneEntityCfg("robot")) -> torch.Tensor:
+        rel_pos, _, _, valid = self._query(env, asset_cfg, k, max_distance)
+        return (rel_pos * valid.unsqueeze(-1)).flatten(1)
+
+
+class nearest_npc_heading(_nearest_npc_term):
+    """Relative heading (sin, cos) of the K nearest NPCs, (N, 2 * k)."""
+
+    def __call__(self, env: ManagerBasedEnv, npc_asset_names: Sequence[str], k: int = 4, max_distance: float = 5.0,
+                 asset_cfg: SceneEntityCfg = SceneEntityCfg("robot")) -> torch.Tensor:
+        _, rel_yaw, _, valid = self._query(env, asset_cfg, k, max_distance)
+        heading = torch.stack([torch.sin(rel_yaw), torch.cos(rel_yaw)], dim=-1)
+        return (heading * valid.unsqueeze(-1)).flatten(1)
+
+
+class nearest_npc_vel(_nearest_npc_term):
+    """Relative xy velocity of the K nearest NPCs, (N, 2 * k)."""
+
+    def __call__(self, env: ManagerBasedEnv, npc_asset_names: Sequence[str], k: int = 4, max_distance: float = 5.0,
+                 asset_cfg: SceneEntityCfg = SceneEntityCfg("robot")) -> torch.Tensor:
+        _, _, rel_vel, valid = self._query(env, asset_cfg, k, max_distance)
+        return (rel_vel * valid.unsqueeze(-1)).flatten(1)
+
+
+class nearest_npc_state(_nearest_npc_term):
+    """(rel x, rel y, sin, cos, rel vx, rel vy, valid) of the K nearest NPCs in one term, (N, 7 * k)."""
+
+    def __call__(self, env: ManagerBasedEnv, npc_asset_names: Sequence[str], k: int = 4, max_distance: float = 5.0,
+                 asset_cfg: SceneEntityCfg = SceneEntityCfg("robot")) -> torch.Tensor:
+        rel_pos, rel_yaw, rel_vel, valid = self._query(env, asset_cfg, k, max_distance)
+        mask = valid.unsqueeze(-1).to(rel_pos.dtype)
+        state = torch.cat([
+            rel_pos, torch.sin(rel_yaw).unsqueeze(-1), torch.cos(rel_yaw).unsqueeze(-1), rel_vel, torch.ones_like(mask)
+        ], dim=-1)
+        return (state * mask).flatten(1)
+
+
+class npc_count_in_radius(_nearest_npc_term):
+    """
+    Number of NPCs within ``radius`` of the robot, (N, 1).
+
+    The shared index hash cell is sized to ``hash_cell_size``, by default ``radius``.
+    """
+
+    def __init__(self, cfg: ObsTerm, env: ManagerBasedEnv):
+        super().__init__(cfg, env)
+        radius = cfg.params.get("radius", 2.0)
+        self.index = get_npc_index(env, cfg.params["npc_asset_names"], cfg.params.get("hash_cell_size", radius))
+
+    def __call__(self, env: ManagerBasedEnv, npc_asset_names: Sequence[str], radius: float = 2.0,
+                 hash_cell_size: float | None = None,
+                 asset_cfg: SceneEntityCfg = SceneEntityCfg("robot")) -> torch.Tensor:
+        robot = env.scene[asset_cfg.name]
+        pos = robot.data.root_pos_w[:, :2] - env.scene.env_origins[:, :2]
+        _, valid, _ = self.index.radius(pos, radius)
+        return valid.sum(dim=1, keepdim=True).float()
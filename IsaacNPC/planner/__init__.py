@@ -0,0 +1 @@
+from .behavior import BehaviorFSM
@@ -0,0 +1,2 @@
+from .spatial_hash import SpatialHash
+from .social_force import SocialForceAvoidance
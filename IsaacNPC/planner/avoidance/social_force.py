@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import torch
+
+from .spatial_hash import SpatialHash
+
+
+class SocialForceAvoidance:
+    """
+    Local NPC-NPC avoidance that corrects planner velocity commands (social force model).
+
+    Every agent is pushed away from the neighbors within ``influence_range`` with a magnitude that
+    grows exponentially as the gap between the two discs closes. Approaching neighbors also add a
+    sidestep to the right of the line between the agents, which breaks the symmetry of head-on
+    encounters so that both pass on the same side. Neighbors come from a :class:`SpatialHash`
+    rebuilt every call, so the cost is linear in the number of agents.
+
+    Corrections are velocity offsets in the env (world) frame, :meth:`adjust` rotates body-frame
+    commands in and out.
+    """
+
+    def __init__(
+        self,
+        agent_radius: float = 0.3,
+        influence_range: float = 1.5,
+        strength: float = 0.5,
+        falloff: float = 0.3,
+        sidestep: float = 0.5,
+        max_lin_vel: float = 1.0,
+        max_per_cell: int | None = 8,
+    ):
+        """
+        Args:
+            agent_radius: Disc radius of one agent (m).
+            influence_range: Neighbors further than this are ignored (m), also the hash cell size.
+            strength: Repulsive speed at contact (m/s).
+            falloff: Decay length of the repulsion with the gap between discs (m).
+            sidestep: Fraction of the repulsion applied sideways to approaching neighbors.
+            max_lin_vel: Speed cap of the corrected command (m/s).
+            max_per_cell: Neighbors gathered per hash cell, None sizes it to the most crowded cell.
+        """
+        self.agent_radius = float(agent_radius)
+        self.influence_range = float(influence_range)
+        self.strength = float(strength)
+        self.falloff = float(falloff)
+        self.sidestep = float(sidestep)
+        self.max_lin_vel = float(max_lin_vel)
+        self.spatial_hash = SpatialHash(self.influence_range, max_per_cell)
+
+    def velocity_offset(self, pos: torch.Tensor, vel: torch.Tensor, group: torch.Tensor | None = None,
+                        num_queries: int | None = None) -> torch.Tensor:
+        """
+        Avoidance velocity of the first ``num_queries`` agents against all agents.
+
+        Agents after ``num_queries`` only act as obstacles (e.g. NPCs driven by other terms).
+
+        Args:
+            pos:   Tensor (N, 2) env-frame positions
+            vel:   Tensor (N, 2) env-frame velocities
+            group: Tensor (N,) long, agents only avoid agents of the same group (env id)
+
+        Returns:
+            offset: Tensor (Q, 2) env-frame velocity correction
+        """
+        num_queries = pos.shape[0] if num_queries is None else num_queries
+        query_ids = torch.arange(num_queries, device=pos.device)
+        query_group = None if group is None else group[:num_queries]
+        self.spatial_hash.build(pos, group)
+        ids, valid, diff, dist = self.spatial_hash.neighbors(
+            pos[:num_queries], self.influence_range, query_group, query_ids
+        )
+
+        normal = diff / (dist.unsqueeze(-1) + 1e-6)                               # (Q, K, 2), away from neighbor
+        gap = dist - 2.0 * self.agent_radius
+        magnitude = self.strength * torch.exp(-gap.clamp(min=0.0) / self.falloff) * valid
+
+        # closing speed along the normal, > 0 when approaching
+        rel_vel = vel[:num_queries].unsqueeze(1) - vel[ids]
+        closing = -(rel_vel * normal).sum(dim=-1)
+        side = torch.clamp(closing / (self.max_lin_vel + 1e-6), 0.0, 1.0) * self.sidestep
+        # right hand side of the direction toward the neighbor
+        tangent = torch.stack([-normal[..., 1], normal[..., 0]], dim=-1)
+        force = (normal + tangent * side.unsqueeze(-1)) * magnitude.unsqueeze(-1)
+        return force.sum(dim=1)
+
+    def adjust(self, cmd: torch.Tensor, yaw: torch.Tensor, pos: torch.Tensor, vel: torch.Tensor,
+               group: torch.Tensor | None = None) -> torch.Tensor:
+        """
+        Corrected body-frame commands for the first ``cmd.shape[0]`` agents.
+
+        Args:
+            cmd:   Tensor (Q, 3) body-frame (vx, vy, yaw rate) from the planner
+            yaw:   Tensor (Q,)   heading of the commanded agents
+            pos:   Tensor (N, 2) env-frame positions, commanded agents first
+            vel:   Tensor (N, 2) env-frame velocities, commanded agents first
+            group: Tensor (N,)   long, optional group id per agent
+
+        Returns:
+            cmd: Tensor (Q, 3)
+        """
+        cos_yaw = torch.cos(yaw)
+        sin_yaw = torch.sin(yaw)
+        vx = cos_yaw * cmd[:, 0] - sin_yaw * cmd[:, 1]
+        vy = sin_yaw * cmd[:, 0] + cos_yaw * cmd[:, 1]
+        offset = self.velocity_offset(pos, vel, group, cmd.shape[0])
+        v_world = torch.stack([vx, vy], dim=1) + offset
+        speed = torch.norm(v_world, dim=1, keepdim=True)
+        v_world = v_world * torch.clamp(self.max_lin_vel / (speed + 1e-8), max=1.0)
+        vx, vy = v_world[:, 0], v_world[:, 1]
+        return torch.stack([cos_yaw * vx + sin_yaw * vy, -sin_yaw * vx + cos_yaw * vy, cmd[:, 2]], dim=1)
@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+import warnings
+
+import torch
+
+# 3 x 3 cell neighborhood
+_CELL_OFFSETS = ((-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 0), (0, 1), (1, -1), (1, 0), (1, 1))
+
+
+class SpatialHash:
+    """
+    Uniform grid spatial hash built with one sort, for batched neighbor queries on CPU or GPU.
+
+    Agents are bucketed by ``(group, cell_x, cell_y)`` into an exact integer key (the grid is
+    bounded by the agents of the current build, so keys never collide). Sorting the keys gives a
+    CSR layout: ``sorted_ids[cell_start[c]:cell_start[c] + cell_count[c]]`` are the agents of cell
+    ``c``. A query looks up the 3 x 3 cells around each point with ``searchsorted`` and gathers at
+    most ``max_per_cell`` agents per cell, so its cost is O(Q * 9 * max_per_cell) and never O(N^2).
+
+    Agents past the cap of a crowded cell are not returned by queries: every build counts them in
+    :attr:`num_overflow` and the first overflow emits a warning. With ``max_per_cell=None`` the
+    cap follows the most crowded cell of each build and nothing is dropped.
+
+    ``group`` separates agents that must not see each other, typically the env id.
+    """
+
+    def __init__(self, cell_size: float, max_per_cell: int | None = 8):
+        """
+        Args:
+            cell_size: Cell edge (m), at least the query radius so that 3 x 3 cells cover it.
+            max_per_cell: Agents gathered per cell by a query, extra agents of crowded cells are skipped
+                and counted in :attr:`num_overflow`. None derives it from the max cell occupancy of each build.
+        """
+        self.cell_size = float(cell_size)
+        self._fixed_cap = None if max_per_cell is None else int(max_per_cell)
+        self.max_per_cell = 1 if max_per_cell is None else int(max_per_cell)
+        # occupancy of the most crowded cell and agents past the cap, of the last build
+        self.max_occupancy = 0
+        self.num_overflow = 0
+        self._num_overflow_builds = 0
+        self._slots = None
+
+    def _cell_coords(self, pos: torch.Tensor) -> tuple[torch.Tensor, torch.Tensor]:
+        cell = torch.floor(pos / self.cell_size).long()
+        return cell[:, 0], cell[:, 1]
+
+    def _key(self, group: torch.Tensor, cx: torch.Tensor, cy: torch.Tensor) -> torch.Tensor:
+        # one cell of padding on each side keeps the neighbor cells of every agent inside the bounds
+        return (group * self._width + (cx - self._min_x + 1)) * self._height + (cy - self._min_y + 1)
+
+    def build(self, pos: torch.Tensor, group: torch.Tensor | None = None) -> SpatialHash:
+        """
+        Args:
+            pos:   Tensor (N, 2) agent xy positions
+            group: Tensor (N,)   long, optional group id per agent (e.g. env id)
+        """
+        if group is None:
+            group = torch.zeros(pos.shape[0], dtype=torch.long, device=pos.device)
+        cx, cy = self._cell_coords(pos)
+        # bounds as python ints, first sync of the build
+        self._min_x, max_x, self._min_y, max_y = torch.stack([cx.min(), cx.max(), cy.min(), cy.max()]).tolist()
+        self._width = max_x - self._min_x + 3
+        self._height = max_y - self._min_y + 3
+
+        keys = self._key(group, cx, cy)
+        sorted_keys, self.sorted_ids = torch.sort(keys)
+        self.cell_keys, self.cell_count = torch.unique_consecutive(sorted_keys, return_counts=True)
+        self.cell_start = torch.cumsum(self.cell_count, dim=0) - self.cell_count
+        self.pos = pos
+        self.group = group
+
+        # second sync of the build, sizes the query or reports the dropped agents
+        self.max_occupancy = int(self.cell_count.max())
+        if self._fixed_cap is None:
+            self.max_per_cell = self.max_occupancy
+            self.num_overflow = 0
+        elif self.max_occupancy > self.max_per_cell:
+            self.num_overflow = int((self.cell_count - self.max_per_cell).clamp(min=0).sum())
+            if self._num_overflow_builds == 0:
+                warnings.warn(f"Spatial hash cell holds {self.max_occupancy} agents, more than max_per_cell="
+                              f"{self.max_per_cell}: {self.num_overflow} agents are skipped by queries. Raise "
+                              f"'max_per_cell' or pass None to derive it from the occupancy.")
+            self._num_overflow_builds += 1
+        else:
+            self.num_overflow = 0
+        if self._slots is None or self._slots.device != pos.device or self._slots.shape[0] != self.max_per_cell:
+            self._slots = torch.arange(self.max_per_cell, device=pos.device)
+            self._offsets = torch.tensor(_CELL_OFFSETS, dtype=torch.long, device=pos.device)
+        return self
+
+    def candidates(self, query_pos: torch.Tensor, query_group: torch.Tensor | None = None):
+        """
+        Agents in the 3 x 3 cells around every query point.
+
+        Args:
+            query_pos:   Tensor (Q, 2)
+            query_group: Tensor (Q,) long, only agents of the same group are returned
+
+        Returns:
+            ids:   Tensor (Q, 9 * max_per_cell) long, agent indices (0 where invalid)
+            valid: Tensor (Q, 9 * max_per_cell) bool
+        """
+        if query_group is None:
+            query_group = torch.zeros(query_pos.shape[0], dtype=torch.long, device=query_pos.device)
+        cx, cy = self._cell_coords(query_pos)
+        # queries outside the build bounds clamp onto the padding ring, which holds no agents
+        cx = cx.clamp(self._min_x - 1, self._min_x + self._width - 2).unsqueeze(1) + self._offsets[:, 0]
+        cy = cy.clamp(self._min_y - 1, self._min_y + self._height - 2).unsqueeze(1) + self._offsets[:, 1]
+        keys = self._key(query_group.unsqueeze(1), cx, cy)                    # (Q, 9)
+
+        cell = torch.searchsorted(self.cell_keys, keys).clamp(max=self.cell_keys.shape[0] - 1)
+        found = self.cell_keys[cell] == keys
+        start = self.cell_start[cell]
+        count = torch.where(found, self.cell_count[cell], torch.zeros_like(cell))
+
+        slot = start.unsqueeze(2) + self._slots                                # (Q, 9, K)
+        valid = self._slots < count.unsqueeze(2)
+        ids = self.sorted_ids[slot.clamp(max=self.sorted_ids.shape[0] - 1)]
+        ids = torch.where(valid, ids, torch.zeros_like(ids))
+        return ids.flatten(1), valid.flatten(1)
+
+    def neighbors(self, query_pos: torch.Tensor, radius: float, query_group: torch.Tensor | None = None,
+                  query_ids: torch.Tensor | None = None):
+        """
+        Agents within ``radius`` of each query point.
+
+        Args:
+            query_ids: Tensor (Q,) long, optional agent index of each query, excluded from its own result
+
+        Returns:
+            ids:   Tensor (Q, 9 * max_per_cell) long
+            valid: Tensor (Q, 9 * max_per_cell) bool
+            diff:  Tensor (Q, 9 * max_per_cell, 2), query_pos - neighbor_pos
+            dist:  Tensor (Q, 9 * max_per_cell)
+        """
+        ids, valid = self.candidates(query_pos, query_group)
+        diff = query_pos.unsqueeze(1) - self.pos[ids]
+        dist = torch.norm(diff, dim=-1)
+        valid = valid & (dist < radius)
+        if query_ids is not None:
+            valid = valid & (ids != query_ids.unsqueeze(1))
+        return ids, valid, diff, dist
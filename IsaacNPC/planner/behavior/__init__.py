@@ -0,0 +1 @@
+from .behavior_fsm import BEHAVIOR_PARAMS, BEHAVIOR_STATES, IDLE, TURN, WAIT, WALK, BehaviorFSM
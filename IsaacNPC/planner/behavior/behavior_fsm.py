@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+import torch
+
+WALK, WAIT, TURN, IDLE = 0, 1, 2, 3
+BEHAVIOR_STATES = ("walk", "wait", "turn", "idle")
+BEHAVIOR_PARAMS = (
+    "wait_prob", "wait_min", "wait_max",
+    "turn_prob", "turn_min", "turn_max", "turn_rate",
+    "idle_rate", "idle_min", "idle_max",
+    "switch_prob",
+)
+
+
+class BehaviorFSM:
+    """
+    Batched finite-state machine of NPC behaviors on top of a routine planner.
+
+    Every agent holds a state id (``WALK``, ``WAIT``, ``TURN``, ``IDLE``), a timer (s) and its own
+    copy of the parameters below, so populations can mix behaviors. :meth:`step` evaluates the
+    transitions of all agents with masked tensor ops, a fixed number of kernels whatever the
+    number of agents and without host syncs:
+
+    * ``WALK`` -> ``WAIT`` with ``wait_prob`` on waypoint arrival, for U(wait_min, wait_max) s.
+    * ``WALK`` -> ``TURN`` with ``turn_prob`` on waypoint arrival: a look-around, turning in place
+      at +/- ``turn_rate`` for U(turn_min, turn_max) s.
+    * ``WALK`` -> ``IDLE`` at ``idle_rate`` per second anywhere along the route, for
+      U(idle_min, idle_max) s.
+    * ``WAIT`` / ``TURN`` / ``IDLE`` -> ``WALK`` once the timer runs out.
+
+    On arrival, agents also request a route switch with ``switch_prob``, which the caller applies
+    (see ``NPCActionRoutine``). :meth:`command` masks the planner commands by state.
+    """
+
+    def __init__(
+        self,
+        num_agents: int,
+        device: str | torch.device = "cpu",
+        wait_prob: float = 0.3,
+        wait_time: tuple[float, float] = (1.0, 3.0),
+        turn_prob: float = 0.2,
+        turn_time: tuple[float, float] = (1.0, 2.0),
+        turn_rate: float = 0.8,
+        idle_rate: float = 0.02,
+        idle_time: tuple[float, float] = (2.0, 6.0),
+        switch_prob: float = 0.0,
+        generator: torch.Generator | None = None,
+    ):
+        """
+        Args:
+            num_agents: Number of agents.
+            wait_prob: Probability to wait at a reached waypoint.
+            wait_time: (min, max) wait duration (s).
+            turn_prob: Probability to look around at a reached waypoint.
+            turn_time: (min, max) look-around duration (s).
+            turn_rate: Yaw rate of the look-around (rad/s), direction drawn per turn.
+            idle_rate: Rate of idle stops while walking (1/s).
+            idle_time: (min, max) idle duration (s).
+            switch_prob: Probability to switch to another route at a reached waypoint.
+            generator: Optional random generator, for reproducible populations.
+        """
+        self.num_agents = num_agents
+        self.device = device
+        self.generator = generator
+        self.state = torch.full((num_agents,), WALK, dtype=torch.long, device=device)
+        self.timer = torch.zeros(num_agents, device=device)
+        self.turn_sign = torch.ones(num_agents, device=device)
+        self.switch = torch.zeros(num_agents, dtype=torch.bool, device=device)
+        values = dict(
+            wait_prob=wait_prob, wait_min=wait_time[0], wait_max=wait_time[1],
+            turn_prob=turn_prob, turn_min=turn_time[0], turn_max=turn_time[1], turn_rate=turn_rate,
+            idle_rate=idle_rate, idle_min=idle_time[0], idle_max=idle_time[1],
+            switch_prob=switch_prob,
+        )
+        # per-agent parameters, (N,) each
+        for name in BEHAVIOR_PARAMS:
+            setattr(self, name, torch.full((num_agents,), float(values[name]), device=device))
+
+    def set_params(self, agent_ids: torch.Tensor | None = None, **params):
+        """Override parameters (see :data:`BEHAVIOR_PARAMS`) of ``agent_ids`` (all if None), scalars or (len(ids),) tensors."""
+        rows = slice(None) if agent_ids is None else agent_ids
+        for name, value in params.items():
+            if name not in BEHAVIOR_PARAMS:
+                raise KeyError(f"Unknown behavior parameter '{name}', expected one of {BEHAVIOR_PARAMS}.")
+            getattr(self, name)[rows] = torch.as_tensor(value, dtype=torch.float32, device=self.device)
+
+    def reset(self, agent_ids: torch.Tensor | None = None):
+        rows = slice(None) if agent_ids is None else agent_ids
+        self.state[rows] = WALK
+        self.timer[rows] = 0.0
+        self.switch[rows] = False
+
+    def _rand(self) -> torch.Tensor:
+        return torch.rand(self.num_agents, generator=self.generator, device=self.device)
+
+    def step(self, dt: float, arrived: torch.Tensor | None = None) -> torch.Tensor:
+        """
+        Advance the timers by ``dt`` and apply the transitions of every agent.
+
+        Args:
+            dt: Time since the last step (s).
+            arrived: Tensor (N,) bool, agents that reached a waypoint this step (None: no arrivals).
+
+        Returns:
+            state: Tensor (N,) long, the updated state ids
+        """
+        self.timer.sub_(dt)
+        walk = self.state == WALK
+        arrival = walk & arrived if arrived is not None else torch.zeros_like(walk)
+
+        # one draw decides what an arriving agent does next
+        choice = self._rand()
+        to_wait = arrival & (choice < self.wait_prob)
+        to_turn = arrival & ~to_wait & (choice < self.wait_prob + self.turn_prob)
+        to_idle = walk & ~arrival & (self._rand() < self.idle_rate * dt)
+        done = ~walk & (self.timer <= 0.0)
+        torch.logical_and(arrival, self._rand() < self.switch_prob, out=self.switch)
+
+        # timers of the entered states
+        span = self._rand()
+        wait_time = self.wait_min + span * (self.wait_max - self.wait_min)
+        turn_time = self.turn_min + span * (self.turn_max - self.turn_min)
+        idle_time = self.idle_min + span * (self.idle_max - self.idle_min)
+        self.timer.copy_(torch.where(to_wait, wait_time, torch.where(to_turn, turn_time, torch.where(to_idle, idle_time, self.timer))))
+        self.turn_sign.copy_(torch.where(to_turn, torch.where(self._rand() < 0.5, -1.0, 1.0), self.turn_sign))
+
+        state = torch.where(done, WALK, self.state)
+        state = torch.where(to_wait, WAIT, state)
+        state = torch.where(to_turn, TURN, state)
+        self.state.copy_(torch.where(to_idle, IDLE, state))
+        return self.state
+
+    def command(self, cmd: torch.Tensor) -> torch.Tensor:
+        """Planner commands (N, 3) while walking, zero while waiting / idling, a yaw rate only while turning."""
+        walk = (self.state == WALK).unsqueeze(1)
+        turn_rate = torch.where(self.state == TURN, self.turn_sign * self.turn_rate, 0.0)
+        out = torch.where(walk, cmd, torch.zeros_like(cmd))
+        out[:, 2] += turn_rate
+        return out
+
+    def state_counts(self) -> torch.Tensor:
+        """(4,) number of agents per state, in :data:`BEHAVIOR_STATES` order."""
+        return torch.bincount(self.state, minlength=len(BEHAVIOR_STATES))
+
+    def __repr__(self) -> str:
+        return f"BehaviorFSM(agents={self.num_agents}, device={self.device})"
@@ -0,0 +1 @@
+from .flow_field_planner import FlowFieldPlanner
@@ -0,0 +1,265 @@
+from __future__ import annotations
+
+import math
+import os
+
+import numpy as np
+import torch
+
+# 8-connected neighborhood (d_row, d_col) and step costs in cells
+_NEIGHBORS = ((-1, 0), (1, 0), (0, -1), (0, 1), (-1, -1), (-1, 1), (1, -1), (1, 1))
+_COSTS = (1.0, 1.0, 1.0, 1.0, math.sqrt(2.0), math.sqrt(2.0), math.sqrt(2.0), math.sqrt(2.0))
+
+
+def _shift(x: torch.Tensor, d_row: int, d_col: int, fill: float) -> torch.Tensor:
+    """out[..., i, j] = x[..., i + d_row, j + d_col], ``fill`` outside the grid."""
+    out = torch.full_like(x, fill)
+    H, W = x.shape[-2:]
+    out[..., max(0, -d_row):H - max(0, d_row), max(0, -d_col):W - max(0, d_col)] = \
+        x[..., max(0, d_row):H - max(0, -d_row), max(0, d_col):W - max(0, -d_col)]
+    return out
+
+
+class FlowFieldPlanner:
+    """
+    Shared flow-field navigation for many agents heading to a few common goals.
+
+    For every goal a travel distance field is computed once over a 2D occupancy grid (8-connected
+    shortest paths, relaxed in parallel on the device until convergence) and turned into a field of
+    unit directions pointing to the cheapest neighbor. Agents then read their desired direction with
+    one batched bilinear lookup, whatever their number.
+
+    Fields are cached and only recomputed after :meth:`set_grid` or :meth:`set_goals`.
+
+    Grid convention: ``occupancy[row, col]`` is True for blocked cells, rows follow +y and columns
+    follow +x, cell (0, 0) has its lower-left corner at ``origin``.
+    """
+
+    def __init__(
+        self,
+        occupancy,
+        resolution: float,
+        origin=(0.0, 0.0),
+        goals=None,
+        max_lin_vel: float = 0.5,
+        max_yaw_vel: float = 1.0,
+        goal_tol: float = 0.2,
+        clearance: float = 0.0,
+        clearance_cost: float = 3.0,
+        body_frame: bool = True,
+        device: str | torch.device = "cpu",
+    ):
+        """
+        Args:
+            occupancy: (H, W) bool-like grid, True where blocked.
+            resolution: Cell size (m).
+            origin: Env-frame (x, y) of the grid lower-left corner.
+            goals: Optional (G, 2) env-frame goal positions.
+            max_lin_vel: Maximum linear speed (m/s)
+            max_yaw_vel: Maximum yaw angular speed (rad/s)
+            goal_tol: Distance at which an agent counts as arrived (m)
+            clearance: Free cells closer than this to an obstacle are costlier to cross (m), keeps
+                paths off the walls
+            clearance_cost: Step cost multiplier inside the clearance band
+            body_frame: Rotate the xy command into the robot heading frame
+        """
+        self.device = torch.device(device)
+        self.resolution = float(resolution)
+        self.origin = torch.tensor(origin, dtype=torch.float32, device=self.device)
+        self.max_lin_vel = float(max_lin_vel)
+        self.max_yaw_vel = float(max_yaw_vel)
+        self.goal_tol = float(goal_tol)
+        self.clearance = float(clearance)
+        self.clearance_cost = float(clearance_cost)
+        self.body_frame = bool(body_frame)
+
+        self.goals = torch.zeros(0, 2, device=self.device)
+        self.distance_field: torch.Tensor | None = None   # (G, H, W)
+        self.direction_field: torch.Tensor | None = None  # (G * H * W, 2)
+        self._step_ok: list[torch.Tensor] = []            # (H, W) per neighbor, allowed moves
+        self._dirty = True
+        self.num_builds = 0
+
+        self.set_grid(occupancy)
+        if goals is not None:
+            self.set_goals(goals)
+
+    @classmethod
+    def from_file(cls, path: str, resolution: float, **kwargs) -> FlowFieldPlanner:
+        """Load the occupancy grid from a .npy file, or the ``occupancy`` key of a .npz file."""
+        if not os.path.isfile(path):
+            raise FileNotFoundError(f"Occupancy grid '{path}' does not exist.")
+        data = np.load(path)
+        occupancy = data["occupancy"] if isinstance(data, np.lib.npyio.NpzFile) else data
+        return cls(occupancy, resolution, **kwargs)
+
+    """
+    Grid and goals.
+    """
+
+    @property
+    def grid_shape(self) -> tuple[int, int]:
+        return tuple(self.occupancy.shape)
+
+    @property
+    def num_goals(self) -> int:
+        return self.goals.shape[0]
+
+    def set_grid(self, occupancy):
+        self.occupancy = torch.as_tensor(np.asarray(occupancy), device=self.device).bool()
+        if self.occupancy.dim() != 2:
+            raise ValueError(f"Occupancy grid must be 2D, got shape {tuple(self.occupancy.shape)}.")
+        self._dirty = True
+
+    def set_goals(self, goals):
+        self.goals = torch.as_tensor(goals, dtype=torch.float32, device=self.device).reshape(-1, 2)
+        self._dirty = True
+
+    def world_to_cell(self, pos: torch.Tensor) -> torch.Tensor:
+        """(N, 2) env-frame xy -> (N, 2) long (row, col), clamped to the grid."""
+        H, W = self.grid_shape
+        col = torch.floor((pos[:, 0] - self.origin[0]) / self.resolution).long().clamp(0, W - 1)
+        row = torch.floor((pos[:, 1] - self.origin[1]) / self.resolution).long().clamp(0, H - 1)
+        return torch.stack([row, col], dim=1)
+
+    """
+    Field construction.
+    """
+
+    def update(self):
+        """Rebuild the fields if the grid or the goals changed since the last build."""
+        if not self._dirty:
+            return
+        if self.num_goals == 0:
+            raise ValueError("Flow field planner has no goals.")
+        self.distance_field = self._compute_distance()
+        self.direction_field = self._compute_direction(self.distance_field)
+        self._dirty = False
+        self.num_builds += 1
+
+    def _compute_distance(self) -> torch.Tensor:
+        G = self.num_goals
+        H, W = self.grid_shape
+        inf = float("inf")
+        free = ~self.occupancy
+        goal_cells = self.world_to_cell(self.goals)
+        if self.occupancy[goal_cells[:, 0], goal_cells[:, 1]].any():
+            raise ValueError("A flow field goal lies in a blocked cell.")
+
+        dist = torch.full((G, H, W), inf, device=self.device)
+        dist[torch.arange(G, device=self.device), goal_cells[:, 0], goal_cells[:, 1]] = 0.0
+
+        # diagonal moves are only allowed when both adjacent orthogonal cells are free (no corner cutting)
+        step_ok = []
+        for d_row, d_col in _NEIGHBORS:
+            ok = _shift(free, d_row, d_col, False) & free
+            if d_row != 0 and d_col != 0:
+                ok = ok & _shift(free, d_row, 0, False) & _shift(free, 0, d_col, False)
+            step_ok.append(ok)
+        # the direction field follows the same moves
+        self._step_ok = step_ok
+
+        # cost multiplier of crossing each cell
+        cell_cost = torch.ones(H, W, device=self.device)
+        radius = int(math.ceil(self.clearance / self.resolution))
+        if radius > 0:
+            near_wall = torch.nn.functional.max_pool2d(
+                self.occupancy.float()[None, None], 2 * radius + 1, stride=1, padding=radius
+            )[0, 0].bool()
+            cell_cost[near_wall] = self.clearance_cost
+
+        # parallel relaxation (Bellman-Ford on the grid), converges after the longest shortest path
+        for _ in range(H * W):
+            relaxed = dist
+            for (d_row, d_col), cost, ok in zip(_NEIGHBORS, _COSTS, step_ok):
+                candidate = _shift(dist, d_row, d_col, inf) + cost * cell_cost
+                relaxed = torch.minimum(relaxed, torch.where(ok, candidate, relaxed))
+            if torch.equal(relaxed, dist):
+                break
+            dist = relaxed
+        return dist * self.resolution
+
+    def _compute_direction(self, dist: torch.Tensor) -> torch.Tensor:
+        G, H, W = dist.shape
+        inf = float("inf")
+        best = dist.clone()
+        direction = torch.zeros(G, H, W, 2, device=self.device)
+        for (d_row, d_col), ok in zip(_NEIGHBORS, self._step_ok):
+            neighbor = _shift(dist, d_row, d_col, inf)
+            better = (neighbor < best) & ok
+            best = torch.where(better, neighbor, best)
+            step = torch.tensor([d_col, d_row], dtype=torch.float32, device=self.device)
+            direction[better] = step / step.norm()
+        # blocked cells carry no direction, so bilinear reads next to walls only blend free cells
+        direction[:, self.occupancy] = 0.0
+        return direction.reshape(G * H * W, 2)
+
+    """
+    Queries.
+    """
+
+    def sample_direction(self, pos: torch.Tensor, goal_ids: torch.Tensor) -> torch.Tensor:
+        """Batched bilinear lookup of the unit direction field, (N, 2) env-frame xy -> (N, 2)."""
+        self.update()
+        H, W = self.grid_shape
+        # continuous cell coordinates relative to cell centers
+        u = (pos[:, 0] - self.origin[0]) / self.resolution - 0.5
+        v = (pos[:, 1] - self.origin[1]) / self.resolution - 0.5
+        col0 = torch.floor(u).clamp(0, W - 1)
+        row0 = torch.floor(v).clamp(0, H - 1)
+        wu = (u - col0).clamp(0, 1).unsqueeze(1)
+        wv = (v - row0).clamp(0, 1).unsqueeze(1)
+        col0 = col0.long()
+        row0 = row0.long()
+        col1 = (col0 + 1).clamp(max=W - 1)
+        row1 = (row0 + 1).clamp(max=H - 1)
+
+        base = goal_ids * (H * W)
+        field = self.direction_field
+        direction = (
+            field[base + row0 * W + col0] * (1 - wu) * (1 - wv)
+            + field[base + row0 * W + col1] * wu * (1 - wv)
+            + field[base + row1 * W + col0] * (1 - wu) * wv
+            + field[base + row1 * W + col1] * wu * wv
+        )
+        norm = torch.norm(direction, dim=1, keepdim=True)
+        # opposite corner directions can cancel out (ridges of the distance field), fall back to the own cell
+        cell = self.world_to_cell(pos)
+        own = field[base + cell[:, 0] * W + cell[:, 1]]
+        return torch.where(norm > 1e-3, direction / (norm + 1e-8), own)
+
+    def compute_cmd(self, pos: torch.Tensor, yaw: torch.Tensor, goal_ids: torch.Tensor):
+        """
+        Velocity commands toward each agent's goal, same interface as ``BatchVelocityPlanner``.
+
+        Args:
+            pos:      Tensor (N, 2) Current env-frame xy positions
+            yaw:      Tensor (N,)   Current yaw angles
+            goal_ids: Tensor (N,)   long, goal index per agent
+
+        Returns:
+            cmd_vel: Tensor (N, 3)
+            arrived: Tensor (N,) bool
+        """
+        direction = self.sample_direction(pos, goal_ids)
+        to_goal = self.goals[goal_ids] - pos
+        goal_dist = torch.norm(to_goal, dim=1)
+        # inside the goal cell neighborhood steer straight to the goal point
+        near = (goal_dist < 1.5 * self.resolution).unsqueeze(1)
+        direction = torch.where(near, to_goal / (goal_dist.unsqueeze(1) + 1e-8), direction)
+
+        arrived = goal_dist < self.goal_tol
+        moving = (~arrived).to(pos.dtype)
+        speed = torch.clamp(goal_dist, max=self.max_lin_vel) * moving
+        vx = direction[:, 0] * speed
+        vy = direction[:, 1] * speed
+        heading = torch.atan2(direction[:, 1], direction[:, 0])
+        if self.body_frame:
+            cos_yaw = torch.cos(yaw)
+            sin_yaw = torch.sin(yaw)
+            vx, vy = cos_yaw * vx + sin_yaw * vy, -sin_yaw * vx + cos_yaw * vy
+
+        yaw_diff = heading - yaw
+        yaw_error = torch.atan2(torch.sin(yaw_diff), torch.cos(yaw_diff))
+        yaw_rate = torch.clamp(yaw_error, -self.max_yaw_vel, self.max_yaw_vel) * moving
+        return torch.stack([vx, vy, yaw_rate], dim=1), arrived
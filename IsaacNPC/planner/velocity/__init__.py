@@ -0,0 +1,10 @@
+from .velocity_planner_2d import (
+    BatchVelocityPlanner,
+    RoutineStepBuffers,
+    fused_planner_step,
+    fused_routine_step,
+    fused_routine_step_,
+    get_planner_kernel,
+)
+from .routine_table import RoutineTable
+from .path_table import ArcLengthPathTable
@@ -0,0 +1,205 @@
+from __future__ import annotations
+
+import math
+
+import numpy as np
+import torch
+
+from .routine_table import RoutineTable
+
+
+class ArcLengthPathTable:
+    """
+    Routines precomputed into arc-length sampled closed paths (CSR layout, like :class:`RoutineTable`).
+
+    Every routine is treated as a closed polyline through its waypoints (the routine loops back to
+    its first point) and resampled at a uniform arc-length spacing. Each sample stores the position,
+    a smoothed path heading and a speed limit derived from the local curvature
+    (``v <= sqrt(max_lat_acc / |kappa|)``), then limited by ``max_lin_acc`` along the path.
+
+    At run time an agent only keeps a progress index into its path, see :meth:`follow`. Waypoint yaws
+    are not used, the heading follows the path.
+    """
+
+    def __init__(
+        self,
+        routine_table: RoutineTable,
+        resolution: float = 0.05,
+        max_lin_vel: float = 0.5,
+        max_lat_acc: float = 0.5,
+        max_lin_acc: float = 0.5,
+        min_lin_vel: float = 0.1,
+        lookahead: float = 0.5,
+        smoothing: float = 0.3,
+    ):
+        """
+        Args:
+            routine_table: Waypoint routines to convert.
+            resolution: Target arc-length spacing of the samples (m).
+            max_lin_vel: Speed cap on straight segments (m/s).
+            max_lat_acc: Lateral acceleration limit used for the curvature speed limit (m/s^2).
+            max_lin_acc: Acceleration / deceleration limit along the path (m/s^2).
+            min_lin_vel: Lower bound of the speed profile, keeps agents moving through sharp corners.
+            lookahead: Distance ahead of the progress point that agents steer toward (m).
+            smoothing: Arc-length window used to smooth headings and estimate curvature (m).
+        """
+        self.device = routine_table.device
+        self.max_lin_vel = max_lin_vel
+
+        points = routine_table.points[:, :2].cpu().numpy().astype(np.float64)
+        offsets = routine_table.offsets.cpu().numpy()
+
+        positions, headings, speeds, lengths, spacings, lookaheads = [], [], [], [], [], []
+        for r in range(routine_table.num_routines):
+            vertices = points[offsets[r]:offsets[r + 1]]
+            pos, heading, spacing = self._resample(vertices, resolution)
+            window = max(1, int(round(smoothing / max(spacing, 1e-6))))
+            heading, kappa = self._smooth_heading(heading, spacing, window)
+            speed = self._speed_profile(kappa, spacing, max_lin_vel, max_lat_acc, max_lin_acc, min_lin_vel)
+            if spacing == 0.0:
+                # single waypoint routine: hold in place at the waypoint yaw
+                speed[:] = 0.0
+                heading[:] = routine_table.points[offsets[r], 2].item()
+            positions.append(pos)
+            headings.append(heading)
+            speeds.append(speed)
+            lengths.append(pos.shape[0])
+            spacings.append(spacing)
+            lookaheads.append(min(pos.shape[0] - 1, int(math.ceil(lookahead / spacing))) if spacing > 0 else 0)
+
+        self.positions = torch.tensor(np.concatenate(positions), dtype=torch.float32, device=self.device)
+        self.headings = torch.tensor(np.concatenate(headings), dtype=torch.float32, device=self.device)
+        self.speeds = torch.tensor(np.concatenate(speeds), dtype=torch.float32, device=self.device)
+        self.lengths = torch.tensor(lengths, dtype=torch.long, device=self.device)
+        self.offsets = torch.cat([torch.zeros(1, dtype=torch.long, device=self.device), self.lengths.cumsum(0)])
+        self.spacings = torch.tensor(spacings, dtype=torch.float32, device=self.device)
+        self.lookahead_samples = torch.tensor(lookaheads, dtype=torch.long, device=self.device)
+        # progress search window, covers the longest lookahead
+        self._window = torch.arange(max(lookaheads) + 1, device=self.device)
+
+    """
+    Load time construction.
+    """
+
+    @staticmethod
+    def _resample(vertices: np.ndarray, resolution: float) -> tuple[np.ndarray, np.ndarray, float]:
+        closed = np.concatenate([vertices, vertices[:1]], axis=0)
+        seg = closed[1:] - closed[:-1]
+        seg_len = np.linalg.norm(seg, axis=1)
+        total = seg_len.sum()
+        if total < 1e-9:
+            return vertices[:1].copy(), np.zeros(1), 0.0
+
+        num_samples = max(2, int(math.ceil(total / resolution)))
+        spacing = total / num_samples
+        s = np.arange(num_samples) * spacing
+        cum = np.concatenate([[0.0], np.cumsum(seg_len)])
+        seg_idx = np.clip(np.searchsorted(cum, s, side="right") - 1, 0, len(seg_len) - 1)
+        # skip zero length segments (repeated waypoints)
+        t = (s - cum[seg_idx]) / np.maximum(seg_len[seg_idx], 1e-9)
+        pos = closed[seg_idx] + seg[seg_idx] * t[:, None]
+        heading = np.arctan2(seg[seg_idx, 1], seg[seg_idx, 0])
+        return pos, heading, spacing
+
+    @staticmethod
+    def _smooth_heading(heading: np.ndarray, spacing: float, window: int) -> tuple[np.ndarray, np.ndarray]:
+        n = heading.shape[0]
+        if n < 3 or spacing == 0.0:
+            return heading, np.zeros(n)
+        # average unit tangents over a centered, cyclic window
+        kernel = np.ones(2 * window + 1) / (2 * window + 1)
+        tangent = np.stack([np.cos(heading), np.sin(heading)], axis=1)
+        padded = np.concatenate([tangent[-window:], tangent, tangent[:window]], axis=0)
+        smooth = np.stack([np.convolve(padded[:, i], kernel, mode="valid") for i in range(2)], axis=1)
+        smooth_heading = np.arctan2(smooth[:, 1], smooth[:, 0])
+        # curvature from the heading change across the window
+        dh = np.roll(smooth_heading, -window) - np.roll(smooth_heading, window)
+        dh = np.arctan2(np.sin(dh), np.cos(dh))
+        kappa = dh / (2 * window * spacing)
+        return smooth_heading, kappa
+
+    @staticmethod
+    def _speed_profile(kappa, spacing, max_lin_vel, max_lat_acc, max_lin_acc, min_lin_vel) -> np.ndarray:
+        speed = np.minimum(max_lin_vel, np.sqrt(max_lat_acc / np.maximum(np.abs(kappa), 1e-6)))
+        speed = np.maximum(speed, min(min_lin_vel, max_lin_vel))
+        if spacing == 0.0 or max_lin_acc <= 0.0:
+            return speed
+        # acceleration limit along the closed path: forward then backward sweeps, twice to wrap around
+        dv2 = 2.0 * max_lin_acc * spacing
+        n = speed.shape[0]
+        for _ in range(2):
+            for i in range(n):
+                speed[i] = min(speed[i], math.sqrt(speed[i - 1] ** 2 + dv2))
+            for i in range(n - 1, -1, -1):
+                speed[i] = min(speed[i], math.sqrt(speed[(i + 1) % n] ** 2 + dv2))
+        return speed
+
+    """
+    Run time.
+    """
+
+    def agent_params(self, routine_ids: torch.Tensor) -> tuple[torch.Tensor, torch.Tensor, torch.Tensor, torch.Tensor]:
+        """Per-agent (start, length, spacing, lookahead samples) for the given routine ids."""
+        return (
+            self.offsets[routine_ids],
+            self.lengths[routine_ids],
+            self.spacings[routine_ids],
+            self.lookahead_samples[routine_ids],
+        )
+
+    def follow(
+        self,
+        pos: torch.Tensor,
+        yaw: torch.Tensor,
+        progress: torch.Tensor,
+        start: torch.Tensor,
+        length: torch.Tensor,
+        spacing: torch.Tensor,
+        lookahead: torch.Tensor,
+        max_yaw_vel: float,
+        body_frame: bool = True,
+    ) -> torch.Tensor:
+        """
+        Progress update and path lookup for a batch of agents.
+
+        The progress index moves to the sample closest to the agent within the next ``lookahead``
+        samples (it never moves backward), then the command steers toward the sample ``lookahead``
+        ahead at the speed stored for the current sample.
+
+        Args:
+            pos:       Tensor (N, 2) Current xy positions
+            yaw:       Tensor (N,)   Current yaw angles
+            progress:  Tensor (N,)   long, sample index within each agent's path, updated in place
+            start, length, spacing, lookahead: per-agent parameters from :meth:`agent_params`
+            max_yaw_vel: Maximum yaw angular speed (rad/s)
+            body_frame: Rotate the xy command into the robot heading frame
+
+        Returns:
+            cmd_vel: Tensor (N, 3)
+        """
+        # windowed nearest sample search ahead of the current progress, (N, W)
+        candidates = (progress.unsqueeze(1) + self._window).remainder(length.unsqueeze(1))
+        dist2 = (self.positions[start.unsqueeze(1) + candidates] - pos.unsqueeze(1)).square().sum(dim=-1)
+        dist2.masked_fill_(self._window > lookahead.unsqueeze(1), float("inf"))
+        # among samples the agent already stands on, take the furthest one (out-and-back routines)
+        on_sample = dist2 <= (0.5 * spacing.unsqueeze(1)).square()
+        dist2 = torch.where(on_sample, -1.0 - self._window.to(dist2.dtype), dist2)
+        progress.copy_(candidates.gather(1, dist2.argmin(dim=1, keepdim=True)).squeeze(1))
+
+        idx = start + progress
+        target_idx = start + (progress + lookahead).remainder(length)
+        diff = self.positions[target_idx] - pos
+        dist = torch.norm(diff, dim=1)
+        speed = torch.minimum(self.speeds[idx], dist)
+        gain = speed / (dist + 1e-8)
+        vx = diff[:, 0] * gain
+        vy = diff[:, 1] * gain
+        if body_frame:
+            cos_yaw = torch.cos(yaw)
+            sin_yaw = torch.sin(yaw)
+            vx, vy = cos_yaw * vx + sin_yaw * vy, -sin_yaw * vx + cos_yaw * vy
+
+        yaw_diff = self.headings[target_idx] - yaw
+        yaw_error = torch.atan2(torch.sin(yaw_diff), torch.cos(yaw_diff))
+        yaw_rate = torch.clamp(yaw_error, -max_yaw_vel, max_yaw_vel)
+        return torch.stack([vx, vy, yaw_rate], dim=1)
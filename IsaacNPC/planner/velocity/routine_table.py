@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+import csv
+import os
+from typing import Sequence
+
+import numpy as np
+import torch
+
+ROUTINE_ASSIGNMENTS = ("cycle", "random")
+
+
+def _is_number(value: str) -> bool:
+    try:
+        float(value)
+    except ValueError:
+        return False
+    return True
+
+
+class RoutineTable:
+    """
+    Packed table of ragged waypoint routines (CSR layout).
+
+    All routines are concatenated into one ``points`` tensor (P, 3) of (x, y, yaw), routine ``r``
+    spans ``points[offsets[r]:offsets[r + 1]]``. Agents keep a routine id, a start index and a
+    length, so the current waypoint of every agent is a single gather ``points[start + ptr]``.
+
+    File formats accepted by :meth:`from_file`:
+
+    * ``.npz`` with ``points`` (P, 3) and either ``offsets`` (R + 1,) or ``lengths`` (R,).
+    * ``.csv`` with the columns ``routine_id, x, y, yaw`` (header optional), rows of a routine
+      are contiguous and in visiting order. Blank and ``#`` lines are skipped, any other row that
+      does not parse raises with its line number.
+    """
+
+    def __init__(self, points: torch.Tensor, offsets: torch.Tensor, device: str | torch.device = "cpu"):
+        self.points = torch.as_tensor(points, dtype=torch.float32, device=device).reshape(-1, 3)
+        self.offsets = torch.as_tensor(offsets, dtype=torch.long, device=device).reshape(-1)
+        self.lengths = self.offsets[1:] - self.offsets[:-1]
+        if self.offsets[0] != 0 or self.offsets[-1] != self.points.shape[0]:
+            raise ValueError("Routine offsets must start at 0 and end at the number of points.")
+        if (self.lengths <= 0).any():
+            raise ValueError("Every routine needs at least one waypoint.")
+        self.device = self.points.device
+
+    @property
+    def num_routines(self) -> int:
+        return self.lengths.shape[0]
+
+    @property
+    def num_points(self) -> int:
+        return self.points.shape[0]
+
+    """
+    Construction.
+    """
+
+    @classmethod
+    def from_routines(cls, routines: Sequence[Sequence[Sequence[float]]], device="cpu") -> RoutineTable:
+        """Build the table from a list of routines, each a list of (x, y, yaw)."""
+        lengths = [len(routine) for routine in routines]
+        points = [tuple(point) for routine in routines for point in routine]
+        offsets = np.concatenate([[0], np.cumsum(lengths)])
+        return cls(torch.tensor(points, dtype=torch.float32), torch.from_numpy(offsets), device)
+
+    @classmethod
+    def from_points(cls, points, device="cpu") -> RoutineTable:
+        """
+        Build the table from inline config points.
+
+        A flat list of (x, y, yaw) is a single routine shared by every agent, a list of such
+        lists gives one routine per entry.
+        """
+        if len(points) > 0 and isinstance(points[0][0], (list, tuple)):
+            return cls.from_routines(points, device)
+        return cls.from_routines([points], device)
+
+    @classmethod
+    def from_file(cls, path: str, device="cpu") -> RoutineTable:
+        if not os.path.isfile(path):
+            raise FileNotFoundError(f"Routine file '{path}' does not exist.")
+        ext = os.path.splitext(path)[1].lower()
+        if ext == ".npz":
+            data = np.load(path)
+            points = data["points"]
+            if "offsets" in data:
+                offsets = data["offsets"]
+            elif "lengths" in data:
+                offsets = np.concatenate([[0], np.cumsum(data["lengths"])])
+            else:
+                raise KeyError(f"Routine file '{path}' needs 'offsets' or 'lengths' next to 'points'.")
+            return cls(torch.from_numpy(points), torch.from_numpy(offsets), device)
+        if ext == ".csv":
+            return cls._from_csv(path, device)
+        raise ValueError(f"Unsupported routine file '{path}', expected .npz or .csv.")
+
+    @classmethod
+    def _from_csv(cls, path: str, device="cpu") -> RoutineTable:
+        routine_ids, points = [], []
+        first_row = True
+        with open(path, newline="") as f:
+            for line, row in enumerate(csv.reader(f), start=1):
+                if not row or not "".join(row).strip() or row[0].strip().startswith("#"):
+                    continue
+                try:
+                    if len(row) < 4:
+                        raise ValueError
+                    values = [float(v) for v in row[:4]]
+                    if not values[0].is_integer():
+                        raise ValueError
+                except ValueError:
+                    # only the first row may be a header, recognized by its non numeric routine id
+                    if first_row and len(row) >= 4 and not _is_number(row[0]):
+                        first_row = False
+                        continue
+                    raise ValueError(f"Routine file '{path}', line {line}: expected 'routine_id, x, y, yaw', "
+                                     f"got {row}.") from None
+                first_row = False
+                routine_ids.append(int(values[0]))
+                points.append(values[1:4])
+        routine_ids = np.asarray(routine_ids)
+        if routine_ids.size == 0:
+            raise ValueError(f"Routine file '{path}' has no waypoints.")
+        # a new routine starts wherever the id changes
+        starts = np.flatnonzero(np.diff(routine_ids)) + 1
+        offsets = np.concatenate([[0], starts, [routine_ids.size]])
+        if np.unique(routine_ids[offsets[:-1]]).size != offsets.size - 1:
+            raise ValueError(f"Rows of each routine must be contiguous in '{path}'.")
+        return cls(torch.tensor(points, dtype=torch.float32), torch.from_numpy(offsets), device)
+
+    @classmethod
+    def from_cfg(cls, cfg, device="cpu") -> RoutineTable:
+        """Build the table from ``cfg.routine_file`` if set, else from ``cfg.routine_points``."""
+        if getattr(cfg, "routine_file", None) is not None:
+            return cls.from_file(cfg.routine_file, device)
+        if cfg.routine_points is None:
+            raise ValueError("Either 'routine_points' or 'routine_file' must be set.")
+        return cls.from_points(cfg.routine_points, device)
+
+    """
+    Agent assignment.
+    """
+
+    def assign(self, num_agents: int, mode: str = "cycle", generator: torch.Generator | None = None) -> torch.Tensor:
+        """Returns a routine id per agent: ``agent % R`` for "cycle", uniform for "random"."""
+        if mode == "cycle":
+            return torch.arange(num_agents, device=self.device) % self.num_routines
+        if mode == "random":
+            return torch.randint(0, self.num_routines, (num_agents,), device=self.device, generator=generator)
+        raise ValueError(f"Unknown routine assignment '{mode}', expected one of {ROUTINE_ASSIGNMENTS}.")
+
+    def gather(self, start: torch.Tensor, ptr: torch.Tensor) -> torch.Tensor:
+        """Current waypoints (N, 3) for per-agent ``start`` offsets and local pointers."""
+        return self.points[start + ptr]
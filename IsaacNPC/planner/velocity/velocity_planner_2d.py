@@ -1,18 +1,229 @@
+import math
+from typing import Tuple
+
 import torch
 
+PLANNER_BACKENDS = ("eager", "script", "compile")
+
+
+def fused_planner_step(
+    pos: torch.Tensor,
+    yaw: torch.Tensor,
+    goal_pos: torch.Tensor,
+    goal_yaw: torch.Tensor,
+    max_lin_vel: float,
+    max_yaw_vel: float,
+    pos_tol: float,
+    yaw_tol: float,
+    body_frame: bool,
+) -> Tuple[torch.Tensor, torch.Tensor]:
+    """
+    Single pass arrival check and velocity command.
+
+    The distance, yaw error and heading trigonometry are evaluated once and shared by the arrival
+    flags and the command.
+
+    Returns:
+        cmd_vel: Tensor (N, 3), zero for arrived envs
+        arrived: Tensor (N,) bool
+    """
+    diff = goal_pos - pos
+    dist = torch.norm(diff, dim=1)
+
+    # signed smallest yaw difference
+    yaw_diff = goal_yaw - yaw
+    yaw_error = torch.atan2(torch.sin(yaw_diff), torch.cos(yaw_diff))
+
+    arrived = (dist < pos_tol) & (torch.abs(yaw_error) < yaw_tol)
+    moving = (~arrived).to(pos.dtype)
+
+    # proportional speed with clamp along the unit direction
+    gain = torch.clamp(dist, max=max_lin_vel) / (dist + 1e-8) * moving
+    vx = diff[:, 0] * gain
+    vy = diff[:, 1] * gain
+    if body_frame:
+        cos_yaw = torch.cos(yaw)
+        sin_yaw = torch.sin(yaw)
+        vx, vy = cos_yaw * vx + sin_yaw * vy, -sin_yaw * vx + cos_yaw * vy
+
+    # yaw tracking
+    yaw_rate = torch.clamp(yaw_error, -max_yaw_vel, max_yaw_vel) * moving
+    return torch.stack([vx, vy, yaw_rate], dim=1), arrived
+
+
+def fused_routine_step(
+    pos: torch.Tensor,
+    yaw: torch.Tensor,
+    routine_points: torch.Tensor,
+    routine_start: torch.Tensor,
+    target_ptr: torch.Tensor,
+    routine_length: torch.Tensor,
+    max_lin_vel: float,
+    max_yaw_vel: float,
+    pos_tol: float,
+    yaw_tol: float,
+    body_frame: bool,
+) -> Tuple[torch.Tensor, torch.Tensor, torch.Tensor]:
+    """
+    Single pass routine step: arrival check, pointer advance and the command toward the new goal.
+
+    The arrival test only needs the squared distance and the cosine of the yaw error
+    (``|wrap(e)| < tol`` iff ``cos(e) > cos(tol)``), so the norm and ``atan2`` are evaluated once,
+    for the command. Arrived envs already steer toward their next waypoint.
+
+    Returns:
+        cmd_vel:    Tensor (N, 3)
+        arrived:    Tensor (N,) bool, arrivals at the waypoint of the previous pointer
+        target_ptr: Tensor (N,) long, advanced pointers (new tensor)
+    """
+    goals = routine_points[routine_start + target_ptr]
+    diff = goals[:, :2] - pos
+    arrived = ((diff * diff).sum(dim=1) < pos_tol * pos_tol) & (torch.cos(goals[:, 2] - yaw) > math.cos(yaw_tol))
+    target_ptr = torch.remainder(target_ptr + arrived.long(), routine_length)
+    goals = routine_points[routine_start + target_ptr]
+    cmd, _ = fused_planner_step(
+        pos, yaw, goals[:, :2], goals[:, 2], max_lin_vel, max_yaw_vel, pos_tol, yaw_tol, body_frame
+    )
+    return cmd, arrived, target_ptr
+
+
+class RoutineStepBuffers:
+    """
+    Preallocated outputs and temporaries of :func:`fused_routine_step_`, for ``num_envs`` agents.
+
+    ``cmd`` and ``arrived`` are the outputs, overwritten on every step. Thresholds are compared
+    against cached 0-dim tensors, python scalars would be wrapped into a new tensor by each op.
+    """
+
+    def __init__(self, num_envs: int, device: str | torch.device = "cpu", dtype: torch.dtype = torch.float32):
+        self.num_envs = num_envs
+        self.index = torch.zeros(num_envs, dtype=torch.long, device=device)
+        self.goals = torch.zeros(num_envs, 3, dtype=dtype, device=device)
+        self.diff = torch.zeros(num_envs, 2, dtype=dtype, device=device)
+        self.diff_sq = torch.zeros(num_envs, 2, dtype=dtype, device=device)
+        self.dist = torch.zeros(num_envs, dtype=dtype, device=device)
+        self.gain = torch.zeros(num_envs, dtype=dtype, device=device)
+        self.sin = torch.zeros(num_envs, dtype=dtype, device=device)
+        self.cos = torch.zeros(num_envs, dtype=dtype, device=device)
+        self.yaw_error = torch.zeros(num_envs, dtype=dtype, device=device)
+        self.vel = torch.zeros(num_envs, 2, dtype=dtype, device=device)
+        self.flag = torch.zeros(num_envs, dtype=torch.bool, device=device)
+        self.arrived_goal = torch.zeros(num_envs, dtype=torch.bool, device=device)
+        self.moving = torch.zeros(num_envs, dtype=dtype, device=device)
+        self.advance = torch.zeros(num_envs, dtype=torch.long, device=device)
+        self.cmd = torch.zeros(num_envs, 3, dtype=dtype, device=device)
+        self.arrived = torch.zeros(num_envs, dtype=torch.bool, device=device)
+        self._scalars: dict[float, torch.Tensor] = {}
+
+    def scalar(self, value: float) -> torch.Tensor:
+        tensor = self._scalars.get(value)
+        if tensor is None:
+            tensor = self._scalars[value] = torch.tensor(value, dtype=self.cmd.dtype, device=self.cmd.device)
+        return tensor
+
+
+def fused_routine_step_(
+    buffers: RoutineStepBuffers,
+    pos: torch.Tensor,
+    yaw: torch.Tensor,
+    routine_points: torch.Tensor,
+    routine_start: torch.Tensor,
+    target_ptr: torch.Tensor,
+    routine_length: torch.Tensor,
+    max_lin_vel: float,
+    max_yaw_vel: float,
+    pos_tol: float,
+    yaw_tol: float,
+    body_frame: bool,
+) -> Tuple[torch.Tensor, torch.Tensor, torch.Tensor]:
+    """
+    :func:`fused_routine_step` written into ``buffers`` (eager only): no tensor is allocated, the
+    pointers are advanced in place. Returns ``(buffers.cmd, buffers.arrived, target_ptr)``.
+    """
+    b = buffers
+    # arrival at the current waypoint, squared distance and yaw error cosine
+    torch.add(routine_start, target_ptr, out=b.index)
+    torch.index_select(routine_points, 0, b.index, out=b.goals)
+    torch.sub(b.goals[:, :2], pos, out=b.diff)
+    torch.mul(b.diff, b.diff, out=b.diff_sq)
+    torch.sum(b.diff_sq, dim=1, out=b.dist)
+    torch.lt(b.dist, b.scalar(pos_tol * pos_tol), out=b.arrived)
+    torch.sub(b.goals[:, 2], yaw, out=b.yaw_error)
+    torch.cos(b.yaw_error, out=b.cos)
+    torch.gt(b.cos, b.scalar(math.cos(yaw_tol)), out=b.flag)
+    b.arrived.logical_and_(b.flag)
+    target_ptr.add_(b.advance.copy_(b.arrived)).remainder_(routine_length)
+
+    # command toward the (new) waypoint
+    torch.add(routine_start, target_ptr, out=b.index)
+    torch.index_select(routine_points, 0, b.index, out=b.goals)
+    torch.sub(b.goals[:, :2], pos, out=b.diff)
+    torch.linalg.vector_norm(b.diff, dim=1, out=b.dist)
+    torch.sub(b.goals[:, 2], yaw, out=b.yaw_error)
+    torch.sin(b.yaw_error, out=b.sin)
+    torch.cos(b.yaw_error, out=b.cos)
+    torch.atan2(b.sin, b.cos, out=b.yaw_error)
+    torch.lt(b.dist, b.scalar(pos_tol), out=b.arrived_goal)
+    torch.abs(b.yaw_error, out=b.gain)
+    torch.lt(b.gain, b.scalar(yaw_tol), out=b.flag)
+    b.moving.copy_(b.arrived_goal.logical_and_(b.flag).logical_not_())
+
+    torch.clamp(b.dist, max=b.scalar(max_lin_vel), out=b.gain)
+    b.gain.div_(b.dist.add_(b.scalar(1e-8))).mul_(b.moving)
+    torch.mul(b.diff, b.gain.unsqueeze(1), out=b.vel)
+    vx, vy = b.vel[:, 0], b.vel[:, 1]
+    if body_frame:
+        torch.cos(yaw, out=b.cos)
+        torch.sin(yaw, out=b.sin)
+        torch.mul(b.cos, vx, out=b.cmd[:, 0])
+        b.cmd[:, 0].addcmul_(b.sin, vy)
+        torch.mul(b.cos, vy, out=b.cmd[:, 1])
+        b.cmd[:, 1].addcmul_(b.sin, vx, value=-1.0)
+    else:
+        b.cmd[:, :2].copy_(b.vel)
+    torch.clamp(b.yaw_error, b.scalar(-max_yaw_vel), b.scalar(max_yaw_vel), out=b.cmd[:, 2])
+    b.cmd[:, 2].mul_(b.moving)
+    return b.cmd, b.arrived, target_ptr
+
+
+_BACKEND_KERNELS = {("eager", fused_planner_step): fused_planner_step, ("eager", fused_routine_step): fused_routine_step}
+
+
+def get_planner_kernel(backend: str = "eager", kernel=fused_planner_step):
+    """Returns ``kernel`` (:func:`fused_planner_step` or :func:`fused_routine_step`) for ``backend``, compiled once per process."""
+    if backend not in PLANNER_BACKENDS:
+        raise ValueError(f"Unknown planner backend '{backend}', expected one of {PLANNER_BACKENDS}.")
+    key = (backend, kernel)
+    if key not in _BACKEND_KERNELS:
+        if backend == "script":
+            _BACKEND_KERNELS[key] = torch.jit.script(kernel)
+        else:
+            _BACKEND_KERNELS[key] = torch.compile(kernel, dynamic=True)
+    return _BACKEND_KERNELS[key]
+
+
 class BatchVelocityPlanner:
-    def __init__(self, max_lin_vel=0.5, max_yaw_vel=1.0, pos_tol=0.05, yaw_tol=0.05):
+    def __init__(self, max_lin_vel=0.5, max_yaw_vel=1.0, pos_tol=0.05, yaw_tol=0.05, body_frame=True, backend="eager"):
         """
         Args:
             max_lin_vel: Maximum linear speed (m/s)
             max_yaw_vel: Maximum yaw angular speed (rad/s)
             pos_tol: Position tolerance for arrival detection
             yaw_tol: Yaw tolerance for arrival detection
+            body_frame: Rotate the xy command into the robot heading frame (what the locomotion
+                policies consume), otherwise commands stay in the env frame
+            backend: "eager", "script" (TorchScript) or "compile" (torch.compile) for the fused kernel
         """
-        self.max_lin_vel = max_lin_vel
-        self.max_yaw_vel = max_yaw_vel
-        self.pos_tol = pos_tol
-        self.yaw_tol = yaw_tol
+        self.max_lin_vel = float(max_lin_vel)
+        self.max_yaw_vel = float(max_yaw_vel)
+        self.pos_tol = float(pos_tol)
+        self.yaw_tol = float(yaw_tol)
+        self.body_frame = bool(body_frame)
+        self.backend = backend
+        self._kernel = get_planner_kernel(backend)
+        self._routine_kernel = get_planner_kernel(backend, fused_routine_step)
+        # start / length of a single shared routine (no ``routine_start``), cached per (N, K)
+        self._single_routine = None
 
     def check_arrival(self, pos, yaw, goal_pos, goal_yaw):
         """
@@ -48,31 +259,54 @@ class BatchVelocityPlanner:
             cmd_vel: Tensor (N, 3)
             arrived: Tensor (N,) bool
         """
-        diff = goal_pos - pos
-        dist = torch.norm(diff, dim=1)
-
-        # direction unit vector
-        direction = diff / (dist.unsqueeze(1) + 1e-8)
+        return self._kernel(
+            pos, yaw, goal_pos, goal_yaw,
+            self.max_lin_vel, self.max_yaw_vel, self.pos_tol, self.yaw_tol, self.body_frame,
+        )
 
-        # proportional speed with clamp
-        speed = torch.clamp(dist, max=self.max_lin_vel)
-        v_xy = direction * speed.unsqueeze(1)
+    def step_routine(self, pos, yaw, routine_points, target_ptr, routine_start=None, routine_length=None,
+                     out: RoutineStepBuffers | None = None):
+        """
+        Fused routine step: arrival flags, advanced pointers and commands (see :func:`fused_routine_step`).
 
-        # yaw tracking
-        yaw_error = torch.atan2(
-            torch.sin(goal_yaw - yaw),
-            torch.cos(goal_yaw - yaw),
-        )
-        yaw_rate = torch.clamp(yaw_error, -self.max_yaw_vel, self.max_yaw_vel)
+        Envs that arrive this step have their pointer advanced and already steer toward the next
+        waypoint, in the same pass (no host sync). ``arrived`` reports the arrivals of this step,
+        e.g. for the behavior FSM of ``NPCActionRoutine``.
 
-        # arrival detection
-        arrived = self.check_arrival(pos, yaw, goal_pos, goal_yaw)
+        Args:
+            pos:            Tensor (N, 2) Current xy positions
+            yaw:            Tensor (N,)   Current yaw angles
+            routine_points: Tensor (K, 3) Waypoints (x, y, yaw), or the packed points of a
+                            :class:`RoutineTable` when ``routine_start`` is given
+            target_ptr:     Tensor (N,)   long, index of the current waypoint within the routine,
+                            advanced in place
+            routine_start:  Tensor (N,)   long, optional per-env routine offset into ``routine_points``
+            routine_length: Tensor (N,)   long, per-env routine length, required with ``routine_start``
+            out:            Optional :class:`RoutineStepBuffers`, runs :func:`fused_routine_step_` (eager,
+                            allocation free) and returns its buffers whatever the backend
 
-        # assemble command
-        cmd = torch.zeros((pos.size(0), 3), device=pos.device, dtype=pos.dtype)
-        cmd[:, 0:2] = v_xy
-        cmd[:, 2] = yaw_rate
+        Returns:
+            cmd_vel:    Tensor (N, 3)
+            arrived:    Tensor (N,) bool
+            target_ptr: Tensor (N,) the same tensor, advanced for arrived envs
+        """
+        if routine_start is None:
+            routine_start, routine_length = self._single_routine_params(target_ptr, routine_points.shape[0])
+        if out is not None:
+            return fused_routine_step_(
+                out, pos, yaw, routine_points, routine_start, target_ptr, routine_length,
+                self.max_lin_vel, self.max_yaw_vel, self.pos_tol, self.yaw_tol, self.body_frame,
+            )
+        cmd, arrived, next_ptr = self._routine_kernel(
+            pos, yaw, routine_points, routine_start, target_ptr, routine_length,
+            self.max_lin_vel, self.max_yaw_vel, self.pos_tol, self.yaw_tol, self.body_frame,
+        )
+        target_ptr.copy_(next_ptr)
+        return cmd, arrived, target_ptr
 
-        # zero velocity if arrived
-        cmd[arrived] = 0.0
-        return cmd, arrived
+    def _single_routine_params(self, target_ptr: torch.Tensor, num_points: int):
+        key = (target_ptr.shape[0], num_points, target_ptr.device)
+        if self._single_routine is None or self._single_routine[0] != key:
+            start = torch.zeros_like(target_ptr)
+            self._single_routine = (key, start, torch.full_like(target_ptr, num_points))
+        return self._single_routine[1:]
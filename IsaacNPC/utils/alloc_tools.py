@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import torch
+
+
+class AllocationCounter:
+    """
+    Counts tensor allocations issued inside a ``with`` block.
+
+    On CUDA this reads the caching allocator statistics, so every allocation request is counted even
+    when it is served from the cache. On CPU the block runs under the profiler with memory tracking
+    and every op that allocated is counted once, which makes the CPU path a diagnostic tool rather
+    than something to keep enabled.
+
+    ``exclude`` lists :func:`torch.profiler.record_function` scope prefixes whose allocations are
+    not counted, e.g. third party code called from the block (see :func:`allocation_scope`). Both
+    CPU and CUDA then go through the profiler, which attributes every allocation to its op.
+
+    Example::
+
+        term.apply_actions()  # warm up
+        with AllocationCounter(env.device) as counter:
+            term.apply_actions()
+        assert counter.count == 0
+    """
+
+    def __init__(self, device: str | torch.device, exclude: tuple[str, ...] = ()):
+        self.device = torch.device(device)
+        self.exclude = tuple(exclude)
+        self.count = 0
+        self.bytes = 0
+        self._profiler = None
+
+    def _use_profiler(self) -> bool:
+        return self.device.type != "cuda" or bool(self.exclude)
+
+    def _excluded(self, event) -> bool:
+        parent = event.cpu_parent
+        while parent is not None:
+            if parent.name.startswith(self.exclude):
+                return True
+            parent = parent.cpu_parent
+        return False
+
+    def __enter__(self) -> AllocationCounter:
+        if not self._use_profiler():
+            torch.cuda.synchronize(self.device)
+            stats = torch.cuda.memory_stats(self.device)
+            self._start_count = stats.get("allocation.all.allocated", 0)
+            self._start_bytes = stats.get("allocated_bytes.all.allocated", 0)
+        else:
+            from torch.profiler import ProfilerActivity, profile
+
+            activities = [ProfilerActivity.CPU] + ([ProfilerActivity.CUDA] if self.device.type == "cuda" else [])
+            self._profiler = profile(activities=activities, profile_memory=True)
+            self._profiler.__enter__()
+        return self
+
+    def __exit__(self, *exc):
+        if not self._use_profiler():
+            torch.cuda.synchronize(self.device)
+            stats = torch.cuda.memory_stats(self.device)
+            self.count = stats.get("allocation.all.allocated", 0) - self._start_count
+            self.bytes = stats.get("allocated_bytes.all.allocated", 0) - self._start_bytes
+        else:
+            self._profiler.__exit__(*exc)
+            allocations = []
+            for event in self._profiler.events():
+                usage = event.self_cpu_memory_usage + getattr(event, "self_device_memory_usage", 0)
+                if usage > 0 and not (self.exclude and self._excluded(event)):
+                    allocations.append(usage)
+            self.count = len(allocations)
+            self.bytes = sum(allocations)
+            self._profiler = None
+        return False
+
+    def __repr__(self) -> str:
+        return f"AllocationCounter(device={self.device}, count={self.count}, bytes={self.bytes})"
+
+
+def allocation_scope(fn, name: str):
+    """Wrap ``fn`` so that its calls run inside the ``record_function(name)`` scope, see ``exclude``."""
+    from torch.profiler import record_function
+
+    def scoped(*args, **kwargs):
+        with record_function(name):
+            return fn(*args, **kwargs)
+
+    return scoped
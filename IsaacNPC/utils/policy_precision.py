@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import time
+
+import torch
+
+POLICY_PRECISIONS = ("fp32", "bf16", "int8")
+"""Supported inference precisions for low level policies."""
+
+PRECISION_DTYPES = {
+    "fp32": None,
+    "bf16": torch.bfloat16,
+    "int8": torch.qint8,
+}
+"""Registry key dtype for each precision, ``None`` keeps the checkpoint as saved."""
+
+
+class PrecisionPolicy(torch.nn.Module):
+    """
+    Runs a reduced precision policy behind the fp32 interface of the NPC terms.
+
+    Observations are cast to the policy dtype on the way in and actions are cast back to fp32,
+    so callers keep writing into their fp32 action buffers.
+    """
+
+    def __init__(self, policy: torch.nn.Module, precision: str, input_dtype: torch.dtype = torch.float32):
+        super().__init__()
+        self.policy = policy
+        self.precision = precision
+        self.input_dtype = input_dtype
+
+    def forward(self, obs: torch.Tensor) -> torch.Tensor:
+        return self.policy(obs.to(self.input_dtype)).float()
+
+
+def check_precision(precision: str, device: str | torch.device):
+    if precision not in POLICY_PRECISIONS:
+        raise ValueError(f"Unknown policy precision '{precision}', expected one of {POLICY_PRECISIONS}.")
+    if precision == "int8" and torch.device(device).type != "cpu":
+        raise ValueError("Dynamic int8 quantization is only supported for policies running on CPU.")
+
+
+def convert_policy(policy: torch.nn.Module, precision: str, device: str | torch.device) -> torch.nn.Module:
+    """
+    Convert a freshly loaded fp32 policy to the requested precision.
+
+    The conversion happens in place for ``bf16``, callers must pass a module nobody else holds.
+    ``int8`` applies dynamic quantization to the Linear layers (weights int8, activations quantized
+    on the fly), which is CPU only.
+    """
+    check_precision(precision, device)
+    if precision == "fp32":
+        return policy
+    if precision == "bf16":
+        return PrecisionPolicy(policy.to(torch.bfloat16), precision, input_dtype=torch.bfloat16).eval()
+
+    # int8
+    if isinstance(policy, torch.jit.ScriptModule):
+        from torch.ao.quantization import default_dynamic_qconfig, quantize_dynamic_jit
+
+        quantized = quantize_dynamic_jit(policy, {"": default_dynamic_qconfig})
+    else:
+        quantized = torch.ao.quantization.quantize_dynamic(policy, {torch.nn.Linear}, dtype=torch.qint8)
+    return PrecisionPolicy(quantized, precision).eval()
+
+
+@torch.inference_mode()
+def compare_policy_precisions(
+    policy_path: str,
+    observations: torch.Tensor | str,
+    device: str | torch.device = "cpu",
+    precisions: tuple[str, ...] = ("bf16", "int8"),
+    num_timing_iters: int = 20,
+) -> dict[str, dict[str, float]]:
+    """
+    Accuracy check of reduced precision policies against fp32.
+
+    Args:
+        policy_path: Path to the low level policy (.pt files).
+        observations: Recorded low level observations (B, obs_dim), or a path to a tensor saved with
+            :func:`torch.save`.
+        device: Device the policies run on.
+        precisions: Precisions to compare against fp32. ``int8`` is skipped on non-CPU devices.
+        num_timing_iters: Number of forwards used to time each precision.
+
+    Returns:
+        Per precision: max / mean absolute action error, error relative to the fp32 action range,
+        and the mean forward time in milliseconds.
+    """
+    from .policy_registry import load_policy
+
+    if isinstance(observations, str):
+        observations = torch.load(observations, map_location=device)
+    observations = observations.to(device=device, dtype=torch.float32).reshape(-1, observations.shape[-1])
+
+    def _time_forward(policy) -> float:
+        policy(observations)
+        if torch.device(device).type == "cuda":
+            torch.cuda.synchronize(device)
+        start = time.perf_counter()
+        for _ in range(num_timing_iters):
+            policy(observations)
+        if torch.device(device).type == "cuda":
+            torch.cuda.synchronize(device)
+        return (time.perf_counter() - start) / num_timing_iters * 1e3
+
+    reference_policy = load_policy(policy_path, device)
+    reference = reference_policy(observations).float()
+    action_range = (reference.max() - reference.min()).clamp(min=1e-8)
+
+    report = {
+        "fp32": {"max_abs_err": 0.0, "mean_abs_err": 0.0, "rel_err": 0.0, "forward_ms": _time_forward(reference_policy)}
+    }
+    for precision in precisions:
+        if precision == "fp32":
+            continue
+        if precision == "int8" and torch.device(device).type != "cpu":
+            continue
+        policy = load_policy(policy_path, device, precision=precision)
+        err = (policy(observations).float() - reference).abs()
+        report[precision] = {
+            "max_abs_err": err.max().item(),
+            "mean_abs_err": err.mean().item(),
+            "rel_err": (err.max() / action_range).item(),
+            "forward_ms": _time_forward(policy),
+        }
+    return report
+
+
+def format_precision_report(report: dict[str, dict[str, float]]) -> str:
+    lines = [f"{'precision':<10}{'max_abs_err':>14}{'mean_abs_err':>14}{'rel_err':>10}{'forward_ms':>12}"]
+    for precision, row in report.items():
+        lines.append(
+            f"{precision:<10}{row['max_abs_err']:>14.5f}{row['mean_abs_err']:>14.5f}"
+            f"{row['rel_err']:>10.4f}{row['forward_ms']:>12.3f}"
+        )
+    return "\n".join(lines)
@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import hashlib
+import io
+import os
+import threading
+
+import torch
+
+from isaaclab.utils.assets import check_file_path, read_file
+
+from .policy_precision import PRECISION_DTYPES, check_precision, convert_policy
+
+
+class PolicyRegistry:
+    """
+    Process-wide cache of low level policies.
+
+    Each checkpoint is deserialized and moved to the device once, every term asking for the same
+    (resolved path, file hash, device, dtype) gets the same module back. The dtype follows the
+    requested precision (see :mod:`IsaacNPC.utils.policy_precision`). Policies are shared in eval
+    mode, so stateful (recurrent) TorchScript modules must not rely on per-term internal state.
+
+    Requests are looked up by resolved path first, local files together with their mtime and size,
+    so a hit neither reads nor hashes the file. The file is only fetched and hashed on a miss. A
+    remote (nucleus) file is fetched once per process, call :meth:`clear` to pick up a new version.
+    """
+
+    def __init__(self):
+        self._policies: dict[tuple, torch.nn.Module] = {}
+        # (path key, device, dtype) -> key of the loaded policy
+        self._requests: dict[tuple, tuple] = {}
+        self._lock = threading.Lock()
+        self.num_requests = 0
+        self.num_loads = 0
+
+    @property
+    def saved_loads(self) -> int:
+        """Number of ``torch.jit.load`` calls avoided by sharing."""
+        return self.num_requests - self.num_loads
+
+    def _resolve(self, policy_path: str) -> tuple[str, tuple]:
+        """Returns the resolved path and the key identifying its current version without reading it."""
+        path_type = check_file_path(policy_path)
+        if not path_type:
+            raise FileNotFoundError(f"Policy file '{policy_path}' does not exist.")
+        if path_type == 1:
+            resolved_path = os.path.realpath(policy_path)
+            stat = os.stat(resolved_path)
+            return resolved_path, (resolved_path, stat.st_mtime_ns, stat.st_size)
+        return policy_path, (policy_path,)
+
+    def _lookup(self, policy_path: str, device: str | torch.device, precision: str) -> tuple:
+        """Returns the request key, the policy key if the request was seen before, and the resolved path."""
+        resolved_path, path_key = self._resolve(policy_path)
+        request_key = path_key + (str(torch.device(device)), PRECISION_DTYPES[precision])
+        return request_key, self._requests.get(request_key), resolved_path
+
+    def make_key(self, policy_path: str, device: str | torch.device, precision: str = "fp32") -> tuple:
+        with self._lock:
+            request_key, key, resolved_path = self._lookup(policy_path, device, precision)
+        if key is not None:
+            return key
+        digest = hashlib.sha1(read_file(resolved_path).getvalue()).hexdigest()
+        return (resolved_path, digest) + request_key[-2:]
+
+    def load(self, policy_path: str, device: str | torch.device, precision: str = "fp32") -> torch.nn.Module:
+        check_precision(precision, device)
+        with self._lock:
+            self.num_requests += 1
+            request_key, key, resolved_path = self._lookup(policy_path, device, precision)
+            if key is not None:
+                return self._policies[key]
+
+            # miss: fetch and hash, the same content under this path may already be loaded
+            file_bytes = read_file(resolved_path).getvalue()
+            key = (resolved_path, hashlib.sha1(file_bytes).hexdigest()) + request_key[-2:]
+            if key not in self._policies:
+                policy = torch.jit.load(io.BytesIO(file_bytes), map_location=device).to(device).eval()
+                self._policies[key] = convert_policy(policy, precision, device)
+                self.num_loads += 1
+            self._requests[request_key] = key
+            return self._policies[key]
+
+    def stats(self) -> dict:
+        return {
+            "policies": len(self._policies),
+            "requests": self.num_requests,
+            "loads": self.num_loads,
+            "saved_loads": self.saved_loads,
+        }
+
+    def clear(self):
+        with self._lock:
+            self._policies.clear()
+            self._requests.clear()
+            self.num_requests = 0
+            self.num_loads = 0
+
+    def __repr__(self) -> str:
+        stats = self.stats()
+        return (
+            f"PolicyRegistry({stats['policies']} policies, {stats['requests']} requests, "
+            f"{stats['loads']} loads, {stats['saved_loads']} saved)"
+        )
+
+
+_POLICY_REGISTRY = PolicyRegistry()
+
+
+def get_policy_registry() -> PolicyRegistry:
+    return _POLICY_REGISTRY
+
+
+def load_policy(policy_path: str, device: str | torch.device, precision: str = "fp32") -> torch.nn.Module:
+    """Load a TorchScript policy through the process-wide registry."""
+    return _POLICY_REGISTRY.load(policy_path, device, precision)
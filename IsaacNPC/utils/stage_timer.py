@@ -0,0 +1,192 @@
+from __future__ import annotations
+
+import json
+import os
+import time
+
+import numpy as np
+import torch
+
+
+class _NullStage:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+class _Stage:
+    """Reusable timing context of one named stage, samples kept in a fixed size ring buffer."""
+
+    def __init__(self, timer: StageTimer, name: str, capacity: int):
+        self.timer = timer
+        self.name = name
+        self.starts = np.zeros(capacity, dtype=np.int64)      # ns since the timer origin
+        self.durations = np.zeros(capacity, dtype=np.int64)   # ns
+        self.count = 0
+        self.parent: str | None = None
+        self._start = 0
+
+    def __enter__(self):
+        active = self.timer._active
+        if active and self.parent is None:
+            self.parent = active[-1].name
+        active.append(self)
+        self.timer._synchronize()
+        self._start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        self.timer._synchronize()
+        end = time.perf_counter_ns()
+        self.timer._active.pop()
+        self.add(self._start, end - self._start)
+        return False
+
+    def add(self, start_ns: int, duration_ns: int):
+        """Store one sample, ``start_ns`` on the ``time.perf_counter_ns`` clock."""
+        slot = self.count % self.starts.shape[0]
+        self.starts[slot] = start_ns - self.timer.origin_ns
+        self.durations[slot] = duration_ns
+        self.count += 1
+
+    def samples(self) -> tuple[np.ndarray, np.ndarray]:
+        """(starts, durations) in ns of the retained samples, oldest first."""
+        capacity = self.starts.shape[0]
+        if self.count <= capacity:
+            return self.starts[:self.count], self.durations[:self.count]
+        order = np.roll(np.arange(capacity), -(self.count % capacity))
+        return self.starts[order], self.durations[order]
+
+
+class StageTimer:
+    """
+    Opt-in per-stage wall clock timer for the NPC action terms.
+
+    Each stage (``"obs"``, ``"policy"``, ...) keeps its last ``capacity`` samples in a ring buffer.
+    On CUDA the device is synchronized on entry and exit of every stage, so a sample covers the
+    kernels launched inside it; this serializes the step, keep it for profiling runs. Stages may
+    nest (the command is evaluated inside the observation assembly): every stage reports inclusive
+    times and records the stage it was first entered in as its ``parent``, so that nested stages
+    are not summed twice.
+
+    A disabled timer hands out a shared no-op context, the instrumented code then costs one method
+    call per stage.
+
+    Example::
+
+        with timer.stage("policy"):
+            actions = policy(obs)
+        print(format_stage_summary(timer.summary()))
+        timer.export_chrome_trace("npc_trace.json")
+    """
+
+    def __init__(self, device: str | torch.device = "cpu", capacity: int = 1024, enabled: bool = True,
+                 name: str = "npc"):
+        self.device = torch.device(device)
+        self.capacity = capacity
+        self.enabled = enabled
+        self.name = name
+        self.origin_ns = time.perf_counter_ns()
+        self._stages: dict[str, _Stage] = {}
+        self._active: list[_Stage] = []
+        self._sync = self.device.type == "cuda"
+
+    def stage(self, name: str):
+        if not self.enabled:
+            return _NULL_STAGE
+        stage = self._stages.get(name)
+        if stage is None:
+            stage = self._stages[name] = _Stage(self, name, self.capacity)
+        return stage
+
+    def record(self, name: str, start_ns: int, duration_ns: int):
+        """
+        Add a sample measured elsewhere, e.g. on a worker thread or with CUDA events.
+
+        Stages are entered and left on the thread that owns the timer; work running concurrently on
+        another thread reports its timing back through here, as a top level stage.
+        """
+        if self.enabled:
+            self.stage(name).add(start_ns, duration_ns)
+
+    def _synchronize(self):
+        if self._sync:
+            torch.cuda.synchronize(self.device)
+
+    def clear(self):
+        self._stages.clear()
+        self._active.clear()
+        self.origin_ns = time.perf_counter_ns()
+
+    @property
+    def stage_names(self) -> list[str]:
+        return list(self._stages.keys())
+
+    def summary(self) -> dict[str, dict[str, float]]:
+        """Per stage: parent stage (None at top level), total sample count and mean / p50 / p99 / max (ms)
+        over the retained samples. Times are inclusive of the nested stages."""
+        summary = {}
+        for name, stage in self._stages.items():
+            _, durations = stage.samples()
+            if durations.shape[0] == 0:
+                continue
+            durations_ms = durations / 1e6
+            summary[name] = {
+                "parent": stage.parent,
+                "count": stage.count,
+                "mean_ms": float(durations_ms.mean()),
+                "p50_ms": float(np.percentile(durations_ms, 50)),
+                "p99_ms": float(np.percentile(durations_ms, 99)),
+                "max_ms": float(durations_ms.max()),
+            }
+        return summary
+
+    def chrome_trace_events(self, pid: int = 0) -> list[dict]:
+        """Retained samples as complete ("X") Chrome trace events, one thread row per timer."""
+        events = []
+        for name, stage in self._stages.items():
+            starts, durations = stage.samples()
+            for start, duration in zip(starts.tolist(), durations.tolist()):
+                events.append({
+                    "name": name, "cat": self.name, "ph": "X", "pid": pid, "tid": self.name,
+                    "ts": start / 1e3, "dur": duration / 1e3,
+                })
+        events.sort(key=lambda event: event["ts"])
+        return events
+
+    def export_chrome_trace(self, path: str, pid: int = 0):
+        """Write the samples as a Chrome trace JSON (chrome://tracing, Perfetto)."""
+        export_chrome_trace([self], path, pid)
+
+    def __repr__(self) -> str:
+        return f"StageTimer(name={self.name!r}, enabled={self.enabled}, stages={self.stage_names})"
+
+
+def export_chrome_trace(timers, path: str, pid: int = 0):
+    """Merge several timers (e.g. one per NPC term) into one Chrome trace JSON file."""
+    events = []
+    for timer in timers:
+        events.extend(timer.chrome_trace_events(pid))
+    events.sort(key=lambda event: event["ts"])
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w") as f:
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+
+
+def format_stage_summary(summary: dict[str, dict[str, float]]) -> str:
+    """Table of :meth:`StageTimer.summary`, nested stages shown as ``parent/stage`` (already included in the parent)."""
+    lines = [f"{'stage':<24}{'count':>8}{'mean_ms':>10}{'p50_ms':>10}{'p99_ms':>10}{'max_ms':>10}"]
+    for name, row in summary.items():
+        label = name if row.get("parent") is None else f"{row['parent']}/{name}"
+        lines.append(
+            f"{label:<24}{row['count']:>8}{row['mean_ms']:>10.3f}{row['p50_ms']:>10.3f}"
+            f"{row['p99_ms']:>10.3f}{row['max_ms']:>10.3f}"
+        )
+    return "\n".join(lines)
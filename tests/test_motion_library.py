@@ -0,0 +1,80 @@
+import numpy as np
+import pytest
+import torch
+
+from IsaacNPC.motion.motion_library import MotionLibrary
+
+NUM_JOINTS = 2
+NUM_BODIES = 3
+
+
+def _write_clip(path, num_frames: int, fps: float = 50.0, value: float = 0.0) -> str:
+    quat = np.zeros((num_frames, NUM_BODIES, 4), dtype=np.float32)
+    quat[..., 0] = 1.0
+    np.savez(
+        path,
+        fps=np.array([fps]),
+        joint_pos=np.full((num_frames, NUM_JOINTS), value, dtype=np.float32),
+        joint_vel=np.zeros((num_frames, NUM_JOINTS), dtype=np.float32),
+        body_pos_w=np.arange(num_frames * NUM_BODIES * 3, dtype=np.float32).reshape(num_frames, NUM_BODIES, 3),
+        body_quat_w=quat,
+        body_lin_vel_w=np.zeros((num_frames, NUM_BODIES, 3), dtype=np.float32),
+        body_ang_vel_w=np.zeros((num_frames, NUM_BODIES, 3), dtype=np.float32),
+    )
+    return str(path)
+
+
+@pytest.fixture
+def library(tmp_path):
+    files = [_write_clip(tmp_path / "a.npz", 4, value=1.0), _write_clip(tmp_path / "b.npz", 6, value=2.0)]
+    return MotionLibrary(files, body_indexes=[0, 2], cache_root=str(tmp_path / "cache"))
+
+
+def test_clips_are_packed(library):
+    assert library.clip_offsets.tolist() == [0, 4, 10]
+    assert library.time_step_total == 10
+    assert library.body_pos_w.shape == (10, 2, 3)
+    assert library.joint_pos[:4].eq(1.0).all() and library.joint_pos[4:].eq(2.0).all()
+
+
+def test_advance_loops_to_the_clip_start(library):
+    clip_ids = torch.tensor([0, 1, 1])
+    time_steps = torch.tensor([2, 8, 4])
+    ended = library.advance(time_steps, clip_ids, "loop")
+    assert ended.tolist() == [False, False, False]
+    assert time_steps.tolist() == [3, 9, 5]
+    ended = library.advance(time_steps, clip_ids, "loop")
+    assert ended.tolist() == [True, True, False]
+    assert time_steps.tolist() == [0, 4, 6]
+    assert clip_ids.tolist() == [0, 1, 1]
+
+
+def test_advance_with_several_steps(library):
+    clip_ids = torch.tensor([0, 1])
+    time_steps = torch.tensor([0, 4])
+    ended = library.advance(time_steps, clip_ids, "loop", steps=torch.tensor([5, 2]))
+    assert ended.tolist() == [True, False]
+    assert time_steps.tolist() == [0, 6]
+
+
+def test_advance_resample_switches_only_ended_envs(library):
+    clip_ids = torch.tensor([0, 1])
+    time_steps = torch.tensor([3, 5])
+    # only clip 1 can be drawn
+    library.clip_weights = torch.tensor([0.0, 1.0])
+    ended = library.advance(time_steps, clip_ids, "resample", generator=torch.Generator().manual_seed(0))
+    assert ended.tolist() == [True, False]
+    assert clip_ids.tolist() == [1, 1]
+    assert time_steps.tolist() == [4, 6]
+    assert library.local_time(time_steps, clip_ids).tolist() == [0, 2]
+
+
+def test_advance_rejects_unknown_end_mode(library):
+    with pytest.raises(ValueError, match="end mode"):
+        library.advance(torch.tensor([0]), torch.tensor([0]), "bounce")
+
+
+def test_assign_cycle(library):
+    assert library.assign(5, "cycle").tolist() == [0, 1, 0, 1, 0]
+    with pytest.raises(ValueError):
+        library.assign(2, "shuffle")
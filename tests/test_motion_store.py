@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+import torch
+
+from IsaacNPC.motion.motion_store import MotionStore
+
+NUM_FRAMES = 40
+
+
+@pytest.fixture
+def clip(tmp_path):
+    path = tmp_path / "clip.npz"
+    quat = np.zeros((NUM_FRAMES, 2, 4), dtype=np.float32)
+    quat[..., 0] = 1.0
+    np.savez(
+        path,
+        fps=np.array([50.0]),
+        joint_pos=np.arange(NUM_FRAMES * 3, dtype=np.float32).reshape(NUM_FRAMES, 3),
+        joint_vel=np.zeros((NUM_FRAMES, 3), dtype=np.float32),
+        body_pos_w=np.arange(NUM_FRAMES * 6, dtype=np.float32).reshape(NUM_FRAMES, 2, 3),
+        body_quat_w=quat,
+        body_lin_vel_w=np.zeros((NUM_FRAMES, 2, 3), dtype=np.float32),
+        body_ang_vel_w=np.zeros((NUM_FRAMES, 2, 3), dtype=np.float32),
+    )
+    return str(path)
+
+
+def _stores(clip, tmp_path, window: int = 8):
+    cache = str(tmp_path / "cache")
+    resident = MotionStore(clip, [0, 1], cache_root=cache)
+    stream = MotionStore(clip, [0, 1], mode="stream", window=window, cache_root=cache)
+    return resident, stream
+
+
+def test_stream_matches_resident_across_reloads(clip, tmp_path):
+    resident, stream = _stores(clip, tmp_path)
+    time_steps = torch.tensor([0, 3, 5])
+    for _ in range(NUM_FRAMES - 5):
+        assert torch.equal(stream.joint_pos[time_steps], resident.joint_pos[time_steps])
+        assert torch.equal(stream.body_pos_w[time_steps, 1], resident.body_pos_w[time_steps, 1])
+        assert torch.equal(stream.root_state_table()[time_steps], resident.root_state_table()[time_steps])
+        stream.advance(time_steps, None)
+    assert stream.joint_pos.num_loads > 1
+    assert stream.joint_pos.num_direct_reads == 0
+
+
+def test_advance_carries_the_frame_bounds(clip, tmp_path):
+    _, stream = _stores(clip, tmp_path)
+    time_steps = torch.tensor([2, 6])
+    stream.joint_pos[time_steps]
+    assert stream._time_bounds.peek(time_steps) == (2, 6)
+    stream.advance(time_steps, None, steps=3)
+    assert stream._time_bounds.peek(time_steps) == (5, 9)
+    # a wrap or an external write drops the bounds, the next gather syncs them again
+    stream.advance(time_steps, None, steps=NUM_FRAMES - 9)
+    assert stream._time_bounds.peek(time_steps) is None
+    time_steps[0] = 7
+    stream.joint_pos[time_steps]
+    assert stream._time_bounds.peek(time_steps) == (0, 7)
+
+
+def test_oversized_request_warns_and_reads_the_memory_map(clip, tmp_path):
+    resident, stream = _stores(clip, tmp_path)
+    time_steps = torch.tensor([0, NUM_FRAMES - 1])
+    with pytest.warns(UserWarning, match="motion_window"):
+        frames = stream.joint_pos[time_steps]
+    assert torch.equal(frames, resident.joint_pos[time_steps])
+    assert stream.joint_pos.num_direct_reads == 1
@@ -0,0 +1,63 @@
+import pytest
+import torch
+
+from IsaacNPC.action.npc_action.npc_obs_history import NPCObsHistory
+
+
+def _frame(step: int, num_envs: int = 3, obs_dim: int = 2) -> torch.Tensor:
+    # value encodes (step, env, column)
+    env = torch.arange(num_envs).unsqueeze(1) * 10.0
+    column = torch.arange(obs_dim).unsqueeze(0) * 0.1
+    return step * 100.0 + env + column
+
+
+def test_frame_layout_is_oldest_first():
+    history = NPCObsHistory(3, 2, history_length=3)
+    for step in range(5):
+        out = history.push(_frame(step))
+    assert out.shape == (3, 6)
+    assert torch.allclose(out, torch.cat([_frame(2), _frame(3), _frame(4)], dim=1))
+    assert torch.allclose(history.frames()[:, -1], _frame(4))
+
+
+def test_first_push_fills_the_whole_window():
+    history = NPCObsHistory(3, 2, history_length=4)
+    out = history.push(_frame(7))
+    assert torch.allclose(out, _frame(7).repeat(1, 4))
+
+
+def test_term_layout_groups_each_term_over_frames():
+    history = NPCObsHistory(2, 3, history_length=2, layout="term", term_dims=(1, 2))
+    history.push(_frame(0, 2, 3))
+    out = history.push(_frame(1, 2, 3))
+    old, new = _frame(0, 2, 3), _frame(1, 2, 3)
+    expected = torch.cat([old[:, :1], new[:, :1], old[:, 1:], new[:, 1:]], dim=1)
+    assert torch.allclose(out, expected)
+
+
+def test_reset_refills_only_the_reset_rows():
+    history = NPCObsHistory(3, 2, history_length=3)
+    for step in range(3):
+        history.push(_frame(step))
+    history.reset(torch.tensor([1]))
+    out = history.push(_frame(3)).view(3, 3, 2)
+    assert torch.allclose(out[1], _frame(3)[1].expand(3, 2))
+    for env in (0, 2):
+        assert torch.allclose(out[env], torch.stack([_frame(step)[env] for step in (1, 2, 3)]))
+
+
+def test_full_reset_refills_every_row():
+    history = NPCObsHistory(3, 2, history_length=2)
+    history.push(_frame(0))
+    history.push(_frame(1))
+    history.reset()
+    assert torch.allclose(history.push(_frame(2)), _frame(2).repeat(1, 2))
+
+
+def test_invalid_arguments():
+    with pytest.raises(ValueError):
+        NPCObsHistory(1, 2, history_length=0)
+    with pytest.raises(ValueError):
+        NPCObsHistory(1, 2, history_length=2, layout="stacked")
+    with pytest.raises(ValueError):
+        NPCObsHistory(1, 3, history_length=2, layout="term", term_dims=(1, 1))
@@ -0,0 +1,77 @@
+import torch
+
+from IsaacNPC.motion.quantization import PackedFieldTable, QuantizedField, decode_smallest_three, encode_smallest_three
+
+
+def _random_quats(shape, seed: int = 0) -> torch.Tensor:
+    quat = torch.randn(*shape, 4, generator=torch.Generator().manual_seed(seed))
+    return quat / torch.norm(quat, dim=-1, keepdim=True)
+
+
+def _angle_deg(a: torch.Tensor, b: torch.Tensor) -> torch.Tensor:
+    dot = (a * b).sum(dim=-1).abs().clamp(max=1.0)
+    return torch.rad2deg(2.0 * torch.acos(dot))
+
+
+def test_smallest_three_round_trip():
+    quat = _random_quats((1000,))
+    packed = encode_smallest_three(quat)
+    assert packed.dtype == torch.int32
+    decoded = decode_smallest_three(packed)
+    assert torch.allclose(torch.norm(decoded, dim=-1), torch.ones(1000), atol=1e-5)
+    # 10 bits per component over [-1/sqrt(2), 1/sqrt(2)]
+    assert _angle_deg(quat, decoded).max() < 0.25
+
+
+def test_smallest_three_sign_and_largest_component():
+    quat = torch.tensor([[0.0, 0.0, 0.0, -1.0], [1.0, 0.0, 0.0, 0.0], [0.5, 0.5, -0.5, -0.5]])
+    decoded = decode_smallest_three(encode_smallest_three(quat))
+    # q and -q are the same rotation, the dropped component comes back positive
+    assert _angle_deg(quat, decoded).max() < 0.25
+    assert decoded[0, 3] > 0
+
+
+def test_smallest_three_keeps_batch_shape():
+    quat = _random_quats((7, 3))
+    assert encode_smallest_three(quat).shape == (7, 3)
+    assert decode_smallest_three(encode_smallest_three(quat)).shape == (7, 3, 4)
+
+
+def test_affine16_tuple_indexing_slices_channel_parameters():
+    values = torch.linspace(-3.0, 5.0, 10 * 4 * 3).reshape(10, 4, 3)
+    values[:, 2] *= 100.0   # per channel ranges differ
+    field = QuantizedField(values, "affine16")
+    time_steps = torch.tensor([0, 9, 4])
+    full = field[time_steps]
+    assert full.shape == (3, 4, 3)
+    body = field[time_steps, 2]
+    assert body.shape == (3, 3)
+    assert torch.allclose(body, full[:, 2])
+    step = (values[:, 2].amax(0) - values[:, 2].amin(0)) / 65535.0
+    assert ((body - values[time_steps, 2]).abs() <= step).all()
+
+
+def test_quat_and_fp16_fields():
+    quats = _random_quats((6, 2))
+    field = QuantizedField(quats, "quat")
+    assert field[torch.tensor([1, 5]), 1].shape == (2, 4)
+    assert _angle_deg(field[torch.arange(6)], quats).max() < 0.25
+
+    vel = torch.randn(6, 3)
+    half = QuantizedField(vel, "fp16")
+    assert half[torch.tensor([2])].dtype == torch.float32
+    assert torch.allclose(half[torch.arange(6)], vel, atol=1e-2)
+    assert half.nbytes == vel.nbytes // 2
+
+
+def test_packed_table_matches_concatenated_fields():
+    pos = torch.randn(8, 2, 3)
+    vel = torch.randn(8, 3)
+    table = PackedFieldTable([(QuantizedField(pos, "affine16"), 1), (QuantizedField(vel, "fp16"), None)])
+    assert table.shape == (8, 6)
+    index = torch.tensor([7, 0, 3])
+    rows = table[index]
+    reference = torch.cat([pos[index, 1], vel[index]], dim=1)
+    assert torch.allclose(rows, reference, atol=1e-2)
+    out = torch.empty(3, 6)
+    assert table.index_select(index, out=out) is out
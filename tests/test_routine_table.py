@@ -0,0 +1,77 @@
+import numpy as np
+import pytest
+import torch
+
+from IsaacNPC.planner.velocity.routine_table import RoutineTable
+
+
+def _write_csv(tmp_path, text: str) -> str:
+    path = tmp_path / "routines.csv"
+    path.write_text(text)
+    return str(path)
+
+
+def test_csv_header_comments_and_blank_lines(tmp_path):
+    path = _write_csv(tmp_path, "# two routines\nroutine_id,x,y,yaw\n0,1,2,0\n0,2,2,0.5\n\n1,3,3,0\n")
+    table = RoutineTable.from_file(path)
+    assert table.offsets.tolist() == [0, 2, 3]
+    assert table.lengths.tolist() == [2, 1]
+    assert torch.allclose(table.points[1], torch.tensor([2.0, 2.0, 0.5]))
+
+
+def test_csv_without_header(tmp_path):
+    table = RoutineTable.from_file(_write_csv(tmp_path, "0,1,2,0\n1,3,3,0\n"))
+    assert table.num_routines == 2
+    assert table.num_points == 2
+
+
+@pytest.mark.parametrize("text, line", [
+    ("0,1,2\n", 1),                                      # short row
+    ("0,1,a,0\n", 1),                                    # non numeric value, not a header
+    ("0.5,1,2,0\n", 1),                                  # non integer routine id
+    ("routine_id,x,y,yaw\n0,1,2,0\nfoo,1,2,3\n", 3),     # second header-like row
+    ("routine_id,x,y\n0,1,2,0\n", 1),                    # short header
+])
+def test_csv_malformed_rows_raise_with_line(tmp_path, text, line):
+    path = _write_csv(tmp_path, text)
+    with pytest.raises(ValueError, match=f"line {line}"):
+        RoutineTable.from_file(path)
+
+
+def test_csv_non_contiguous_routine_raises(tmp_path):
+    with pytest.raises(ValueError, match="contiguous"):
+        RoutineTable.from_file(_write_csv(tmp_path, "0,1,2,0\n1,3,3,0\n0,2,2,0\n"))
+
+
+def test_csv_without_waypoints_raises(tmp_path):
+    with pytest.raises(ValueError, match="no waypoints"):
+        RoutineTable.from_file(_write_csv(tmp_path, "# nothing\nroutine_id,x,y,yaw\n"))
+
+
+def test_npz_lengths_and_offsets(tmp_path):
+    points = np.arange(15, dtype=np.float32).reshape(5, 3)
+    np.savez(tmp_path / "lengths.npz", points=points, lengths=np.array([2, 3]))
+    np.savez(tmp_path / "offsets.npz", points=points, offsets=np.array([0, 2, 5]))
+    for name in ("lengths.npz", "offsets.npz"):
+        table = RoutineTable.from_file(str(tmp_path / name))
+        assert table.offsets.tolist() == [0, 2, 5]
+
+
+def test_csr_gather():
+    table = RoutineTable.from_routines([[(0, 0, 0), (1, 0, 0)], [(5, 5, 1), (6, 5, 1), (7, 5, 1)]])
+    routine_ids = table.assign(4, "cycle")
+    assert routine_ids.tolist() == [0, 1, 0, 1]
+    start = table.offsets[routine_ids]
+    ptr = torch.tensor([1, 2, 0, 1])
+    goals = table.gather(start, ptr)
+    assert goals[:, 0].tolist() == [1.0, 7.0, 0.0, 6.0]
+
+
+def test_from_points_single_and_multiple_routines():
+    assert RoutineTable.from_points([(0, 0, 0), (1, 0, 0)]).num_routines == 1
+    assert RoutineTable.from_points([[(0, 0, 0)], [(1, 0, 0)]]).num_routines == 2
+
+
+def test_empty_routine_rejected():
+    with pytest.raises(ValueError, match="at least one waypoint"):
+        RoutineTable(torch.zeros(2, 3), torch.tensor([0, 0, 2]))